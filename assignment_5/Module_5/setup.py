@@ -11,6 +11,7 @@ setup(
     install_requires=[
         "Flask",
         "psycopg",
+        "numpy",
         "beautifulsoup4",
         "urllib3",
         "certifi",
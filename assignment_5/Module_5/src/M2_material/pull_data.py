@@ -7,7 +7,10 @@ Flow:
 3) Clean raw HTML into structured records.
 4) Standardize program/university with the local LLM.
 5) Normalize fields and insert into Postgres.
-6) Write progress to JSON for the UI and finalize status.
+6) Record progress and the final status on the pull_jobs row.
+
+The pull holds the advisory lock from db/pull_jobs.py on its connection
+for its whole run, so web workers on any host can tell it is running.
 """
 
 # pylint: disable=line-too-long,wrong-import-position,too-many-arguments,too-many-positional-arguments,broad-exception-caught,global-statement,too-many-locals,too-many-branches,too-many-statements,raise-missing-from,unused-argument
@@ -22,6 +25,7 @@ import urllib.request
 import urllib.error
 
 import psycopg
+from psycopg import sql
 
 try:
     from .scrape import scrape_data, get_last_stop_reason, get_last_attempted_id, get_latest_survey_id
@@ -47,14 +51,15 @@ from config import (
 DATA_PATH = os.path.join(ROOT_DIR, "M3_material", "data", "extra_llm_applicant_data.json")
 STATE_PATH = os.path.join(DB_DIR, "last_scraped_id.txt")
 LAST_ENTRIES_PATH = os.path.join(DB_DIR, "last_100_entries.json")
-DONE_PATH = os.path.join(DB_DIR, "pull_data.done")
 LATEST_SURVEY_PATH = os.path.join(DB_DIR, "latest_survey_id.txt")
-PROGRESS_PATH = os.path.join(DB_DIR, "pull_progress.json")
 
 from db.db_config import get_db_config
 from db.migrate import migrate
 from db.normalize import normalize_record
-from db.import_extra_data import seed_base_dataset
+from db.pull_jobs import acquire_pull_lock, fail_claim
+from db.import_extra_data import COLUMNS, seed_base_dataset
+from db.atomic_io import atomic_write_json, atomic_write_text
+from M3_material.query_data import apply_analytics_delta, reconcile_analytics_summary
 
 USE_LLM = os.getenv("USE_LLM", "1") == "1"
 _LLM_AVAILABLE = None
@@ -99,9 +104,7 @@ def _read_last_scraped_id() -> Optional[int]:
 
 def _write_last_scraped_id(value: int) -> None:
     """Persist the last attempted ID to disk."""
-    os.makedirs(DB_DIR, exist_ok=True)
-    with open(STATE_PATH, "w", encoding="utf-8") as file_handle:
-        file_handle.write(str(value))
+    atomic_write_text(STATE_PATH, str(value))
 
 
 def _infer_last_id_from_file() -> Optional[int]:
@@ -133,12 +136,7 @@ def _get_max_entry_id_from_db(conn) -> Optional[int]:
     """Primary source of truth: max result ID already in the database."""
     try:
         with conn.cursor() as cur:
-            cur.execute("""
-                SELECT MAX(SUBSTRING(url FROM '/(\\d+)$')::int)
-                FROM applicants
-                WHERE url ~ '/\\d+$'
-                LIMIT 1
-            """)
+            cur.execute("SELECT MAX(result_id) FROM applicants")
             value = cur.fetchone()[0]
             return int(value) if value is not None else None
     except Exception:
@@ -151,29 +149,33 @@ def ensure_table(conn):
     migrate()
 
 
+def _batch_insert_sql(row_count):
+    """Build a multi-row INSERT that skips URL conflicts and returns inserted p_ids."""
+    row = sql.SQL("({})").format(sql.SQL(", ").join(sql.Placeholder() for _ in COLUMNS))
+    return sql.SQL(
+        "INSERT INTO applicants ({fields}) VALUES {rows} "
+        "ON CONFLICT (url) DO NOTHING RETURNING p_id"
+    ).format(
+        fields=sql.SQL(", ").join(sql.Identifier(col) for col in COLUMNS),
+        rows=sql.SQL(", ").join(row for _ in range(row_count)),
+    )
+
+
 def insert_new_records(conn, records):
-    """Insert new records into the DB, skipping duplicates by URL."""
-    inserted = 0
-    duplicates = 0
-    with conn.cursor() as cur:
-        for r in records:
-            url = r.get("url")
-            if url:
-                cur.execute("SELECT 1 FROM applicants WHERE url = %s LIMIT 1", (url,))
-                if cur.fetchone():
-                    duplicates += 1
-                    continue
-            cur.execute("""
-                INSERT INTO applicants (
-                    program, comments, date_added, acceptance_date, url, status, term, us_or_international, gpa, gre, gre_v, gre_aw,
-                    degree, llm_generated_program, llm_generated_university
-                ) VALUES (
-                    %(program)s, %(comments)s, %(date_added)s, %(acceptance_date)s, %(url)s, %(status)s, %(term)s, %(us_or_international)s, %(gpa)s, %(gre)s, %(gre_v)s, %(gre_aw)s,
-                    %(degree)s, %(llm_generated_program)s, %(llm_generated_university)s
-                )
-            """, r)
-            inserted += 1
-    return inserted, duplicates
+    """Insert a batch in one round trip, skipping duplicates by URL.
+
+    The inserted rows are folded into the analytics summary in the same
+    transaction, so the dashboard stays current without a full recompute.
+    """
+    if not records:
+        return 0, 0
+    params = [r.get(col) for r in records for col in COLUMNS]
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute(_batch_insert_sql(len(records)), params)
+            p_ids = [row[0] for row in cur.fetchall()]
+        apply_analytics_delta(conn, p_ids)
+    return len(p_ids), len(records) - len(p_ids)
 
 
 def url_exists(conn, url):
@@ -185,6 +187,34 @@ def url_exists(conn, url):
         return cur.fetchone() is not None
 
 
+def _load_existing_ids(conn, start_entry, end_entry):
+    """Return result IDs already stored in [start_entry, end_entry) in one query."""
+    query = "SELECT result_id FROM applicants WHERE result_id >= %s"
+    params = [start_entry]
+    if end_entry is not None:
+        query += " AND result_id < %s"
+        params.append(end_entry)
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return {row[0] for row in cur.fetchall()}
+
+
+def _is_known_entry(conn, existing_ids, url):
+    """Check the prefetched ID window, querying only for non-standard URLs."""
+    entry_id = _extract_entry_id(url)
+    if entry_id is not None:
+        return entry_id in existing_ids
+    return url_exists(conn, url)
+
+
+def _remember_entries(existing_ids, records):
+    """Add a written batch to the in-memory ID window (inserted or duplicate)."""
+    for record in records:
+        entry_id = _extract_entry_id(record.get("url"))
+        if entry_id is not None:
+            existing_ids.add(entry_id)
+
+
 def write_last_entries(conn, path, limit=100):
     """Write the newest N entries to disk for debugging."""
     limit = _clamp_limit(limit)
@@ -193,30 +223,7 @@ def write_last_entries(conn, path, limit=100):
         rows = cur.fetchall()
         columns = [desc[0] for desc in cur.description]
     entries = [dict(zip(columns, row)) for row in rows]
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as file_handle:
-        json.dump(entries, file_handle, indent=2, default=str)
-
-
-def _write_progress(status, inserted, duplicates, processed, target, started_at, last_attempted=None):
-    """Write progress for UI polling and ETA estimates."""
-    try:
-        os.makedirs(DB_DIR, exist_ok=True)
-        payload = {
-            "status": status,
-            "inserted": inserted,
-            "duplicates": duplicates,
-            "processed": processed,
-            "target": target,
-            "started_at": started_at,
-            "updated_at": time.time(),
-            "elapsed_seconds": int(time.time() - started_at),
-            "last_attempted": last_attempted,
-        }
-        with open(PROGRESS_PATH, "w", encoding="utf-8") as file_handle:
-            json.dump(payload, file_handle)
-    except OSError:
-        pass
+    atomic_write_json(path, entries, indent=2)
 
 
 def _log_event(event: str, **fields) -> None:
@@ -228,9 +235,22 @@ def _log_event(event: str, **fields) -> None:
         print(f"[event:{event}] {fields}")
 
 
-def _init_pull_job(conn, target):
-    """Insert a pull job row and return its id."""
+def _init_pull_job(conn, target, job_id=None):
+    """Mark the job running with ``target`` and return its id.
+
+    ``job_id`` is the row the web app claimed; without one (a pull started
+    from the command line) a new row is inserted.
+    """
     with conn.cursor() as cur:
+        if job_id is not None:
+            cur.execute(
+                "UPDATE pull_jobs SET status = %s, target = %s, updated_at = NOW() "
+                "WHERE id = %s RETURNING id",
+                ("running", target, job_id),
+            )
+            row = cur.fetchone()
+            if row:
+                return row[0]
         cur.execute(
             "INSERT INTO pull_jobs (status, target) VALUES (%s, %s) RETURNING id",
             ("running", target),
@@ -238,8 +258,12 @@ def _init_pull_job(conn, target):
         return cur.fetchone()[0]
 
 
-def _update_pull_job(conn, job_id, status, inserted, duplicates, processed, last_attempted=None, error=None):
-    """Update pull job status/metrics in the database."""
+def _update_pull_job(conn, job_id, status, inserted, duplicates, processed, last_attempted=None, error=None, target=None):
+    """Update pull job status/metrics (the pull's heartbeat).
+
+    ``target`` replaces the stored target when given. Returns True when the
+    web app asked the pull to stop.
+    """
     with conn.cursor() as cur:
         cur.execute(
             """
@@ -250,11 +274,15 @@ def _update_pull_job(conn, job_id, status, inserted, duplicates, processed, last
                    duplicates = %s,
                    processed = %s,
                    last_attempted = %s,
-                   error = %s
+                   error = %s,
+                   target = COALESCE(%s, target)
              WHERE id = %s
+            RETURNING cancel_requested
             """,
-            (status, inserted, duplicates, processed, last_attempted, error, job_id),
+            (status, inserted, duplicates, processed, last_attempted, error, target, job_id),
         )
+        row = cur.fetchone()
+    return bool(row and row[0])
 
 
 def _standardize_with_llm_batch(rows: list[dict]) -> list[dict]:
@@ -316,33 +344,45 @@ def _standardize_with_llm_batch(rows: list[dict]) -> list[dict]:
         raise RuntimeError(f"LLM standardization failed: {e}")
 
 
+def _reconcile_analytics():
+    """Publish or reconcile the analytics summary; a failure must not fail the pull."""
+    try:
+        reconcile_analytics_summary()
+    except Exception as exc:
+        print(f"Analytics refresh failed: {exc}")
+        _log_event("analytics_refresh_failed", error=str(exc))
+
+
 def main():
     """End-to-end pull for one batch of new records."""
     parser = argparse.ArgumentParser()
-    parser.add_argument("--lock", dest="lock_path", default=None)
+    parser.add_argument("--job-id", dest="job_id", type=int, default=None)
     args = parser.parse_args()
 
-    lock_path = args.lock_path
     status = "unknown"
     inserted_total = 0
     duplicates_total = 0
     processed_total = 0
     last_attempted = None
     latest_id = None
-    started_at = time.time()
     target_new = TARGET_NEW_RECORDS
-    job_id = None
-    if lock_path:
-        try:
-            with open(lock_path, "w", encoding="utf-8") as file_handle:
-                file_handle.write(str(os.getpid()))
-        except OSError:
-            lock_path = None
+    job_id = args.job_id
+    lock_held = False
 
     conn: psycopg.Connection | None = None
     try:
         conn = psycopg.connect(**get_db_config(), autocommit=True)
         ensure_table(conn)
+        # Held until this connection closes, so a crashed pull releases it too.
+        if not acquire_pull_lock(conn):
+            print("Another pull is already running; not starting a second one.")
+            if job_id:
+                # Close out the claim here; the finally block leaves it alone.
+                fail_claim(conn, job_id, "another pull holds the pull lock")
+                job_id = None
+            return
+        lock_held = True
+        job_id = _init_pull_job(conn, target_new, job_id)
         seed_base_dataset()
 
         last_id = _get_max_entry_id_from_db(conn)
@@ -355,9 +395,7 @@ def main():
 
         latest_id = get_latest_survey_id()
         if latest_id is not None:
-            os.makedirs(DB_DIR, exist_ok=True)
-            with open(LATEST_SURVEY_PATH, "w", encoding="utf-8") as file_handle:
-                file_handle.write(str(latest_id))
+            atomic_write_text(LATEST_SURVEY_PATH, str(latest_id))
 
         if latest_id is not None and last_id >= latest_id:
             print(f"No new entries: latest survey id is {latest_id}, already scraped up to {last_id}.")
@@ -372,12 +410,14 @@ def main():
 
         reached_target = False
 
-        job_id = _init_pull_job(conn, target_new)
+        # Duplicate checks in the page loop become in-memory lookups.
+        existing_ids = _load_existing_ids(conn, start_entry, end_entry)
+
         _log_event("pull_started", target=target_new, start_id=last_id + 1, latest_id=latest_id)
-        _write_progress("running", inserted_total, duplicates_total, processed_total, target_new, started_at)
-        _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted)
+        _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted, target=target_new)
 
         any_pages = False
+        cancelled = False
         batch = []
         for page in scrape_data(
             start_entry,
@@ -390,13 +430,12 @@ def main():
             cleaned_row = cleaned[0]
             processed_total += 1
             last_attempted = get_last_attempted_id()
-            _write_progress("running", inserted_total, duplicates_total, processed_total, target_new, started_at, last_attempted)
-            if job_id:
-                _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted)
+            if job_id and _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted):
+                cancelled = True
+                break
 
-            if url_exists(conn, cleaned_row.get("url")):
+            if _is_known_entry(conn, existing_ids, cleaned_row.get("url")):
                 duplicates_total += 1
-                _write_progress("running", inserted_total, duplicates_total, processed_total, target_new, started_at)
                 if job_id:
                     _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted)
                 continue
@@ -406,23 +445,30 @@ def main():
                 standardized_rows = _standardize_with_llm_batch(batch)
                 normalized = [normalize_record(r) for r in standardized_rows]
                 inserted, duplicates = insert_new_records(conn, normalized)
+                _remember_entries(existing_ids, normalized)
                 inserted_total += inserted
                 duplicates_total += duplicates
                 batch = []
-                _write_progress("running", inserted_total, duplicates_total, processed_total, target_new, started_at)
 
                 if inserted_total >= target_new:
                     reached_target = True
                     break
 
+        if cancelled:
+            # Rows already inserted stay; the unsent batch is dropped.
+            print(f"Pull cancelled after {inserted_total} new records.")
+            status = "cancelled"
+            write_last_entries(conn, LAST_ENTRIES_PATH)
+            return
+
         if batch and not reached_target:
             standardized_rows = _standardize_with_llm_batch(batch)
             normalized = [normalize_record(r) for r in standardized_rows]
             inserted, duplicates = insert_new_records(conn, normalized)
+            _remember_entries(existing_ids, normalized)
             inserted_total += inserted
             duplicates_total += duplicates
             batch = []
-            _write_progress("running", inserted_total, duplicates_total, processed_total, target_new, started_at)
             if job_id:
                 _update_pull_job(conn, job_id, "running", inserted_total, duplicates_total, processed_total, last_attempted)
 
@@ -445,7 +491,6 @@ def main():
             last_attempted = get_last_attempted_id()
             if last_attempted is not None:
                 _write_last_scraped_id(last_attempted)
-            _write_progress(status, inserted_total, duplicates_total, processed_total, target_new, started_at)
             if job_id:
                 _update_pull_job(conn, job_id, status, inserted_total, duplicates_total, processed_total, last_attempted)
             return
@@ -480,31 +525,17 @@ def main():
         print(f"Pull failed: {e}")
         _log_event("pull_failed", error=str(e))
     finally:
-        try:
-            os.makedirs(DB_DIR, exist_ok=True)
-            with open(DONE_PATH, "w", encoding="utf-8") as file_handle:
-                json.dump(
-                    {
-                        "status": status,
-                        "inserted": inserted_total,
-                        "duplicates": duplicates_total,
-                        "last_attempted": last_attempted,
-                    },
-                    file_handle,
-                )
-        except OSError:
-            pass
-        _write_progress(status, inserted_total, duplicates_total, processed_total, target_new, started_at)
+        if lock_held:
+            # Inserts already updated the summary; this only publishes a
+            # missing one or runs the periodic full reconcile. Done before
+            # the final status so the UI never reads stale numbers.
+            _reconcile_analytics()
         if conn is not None and job_id:
             try:
                 _update_pull_job(conn, job_id, status, inserted_total, duplicates_total, processed_total, last_attempted, error=None if status != "error" else "error")
             except Exception:
                 pass
-        if lock_path and os.path.exists(lock_path):
-            try:
-                os.remove(lock_path)
-            except OSError:
-                pass
+        # Closing the connection releases the advisory lock.
         if conn is not None:
             try:
                 conn.close()  # pylint: disable=no-member
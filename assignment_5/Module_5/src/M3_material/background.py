@@ -0,0 +1,97 @@
+"""
+Coalescing background worker for slow dashboard jobs.
+
+A ``CoalescingWorker`` runs one job at a time on a daemon thread. Requests
+made while a run is in progress collapse into a single follow-up run, so N
+clicks on "Update Analysis" during a recompute cost one extra recompute,
+not N. ``status()`` reports what the worker is doing for the job-status
+endpoint.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class CoalescingWorker:
+    """Run submitted jobs one at a time, coalescing requests made mid-run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._target = None
+        self._thread = None
+        self._pending = False
+        self._stats = {
+            "requested": 0,
+            "runs": 0,
+            "coalesced": 0,
+            "started_at": None,
+            "finished_at": None,
+            "duration": None,
+            "error": None,
+        }
+
+    def _snapshot(self) -> dict:
+        """Return the status dict; the caller holds the lock."""
+        return {
+            "state": "idle" if self._thread is None else "running",
+            "pending": self._pending,
+            **self._stats,
+        }
+
+    def status(self) -> dict:
+        """Return the worker state and counters for the last run."""
+        with self._lock:
+            return self._snapshot()
+
+    def submit(self, target) -> dict:
+        """Run ``target`` now, or once more after the current run finishes.
+
+        The most recent ``target`` wins when several requests coalesce.
+        """
+        with self._lock:
+            self._target = target
+            self._stats["requested"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            elif self._pending:
+                self._stats["coalesced"] += 1
+            else:
+                self._pending = True
+            return self._snapshot()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the worker is idle; return False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._thread is None, timeout)
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                target = self._target
+                started = time.time()
+                self._stats["started_at"] = started
+            error = None
+            try:
+                target()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # Reported through status(); the last good results stay in place.
+                error = f"{type(exc).__name__}: {exc}"
+            with self._lock:
+                finished = time.time()
+                self._stats.update(
+                    runs=self._stats["runs"] + 1,
+                    finished_at=finished,
+                    duration=round(finished - started, 3),
+                    error=error,
+                )
+                if self._pending:
+                    self._pending = False
+                    continue
+                self._thread = None
+                self._idle.notify_all()
+                return
@@ -3,27 +3,66 @@ Flask routes for Module 3 pages.
 
 Responsibilities:
 - Render the analysis dashboard and PDF link.
-- Start/track/cancel the pull-data subprocess.
-- Expose a small JSON status endpoint for the UI timer and LLM readiness.
+- Start/track/cancel the pull-data subprocess (coordinated through the
+  database, see ``db/pull_jobs.py``, so any worker process sees the pull).
+- Recompute analysis on a coalescing background worker.
+- Expose a small JSON status endpoint and a Server-Sent Events progress
+  stream for the UI timer and LLM readiness.
 """
 
 # pylint: disable=line-too-long,cyclic-import,protected-access,broad-exception-caught,global-statement,too-many-return-statements,too-many-branches,too-many-locals,too-many-statements,consider-using-with,unused-variable,missing-function-docstring
 
+import hashlib
 import json
 import os
 import subprocess
 import sys
+import threading
 import time
 import urllib.error
 import urllib.request
+from datetime import datetime, timezone
 from urllib.parse import urlsplit, urlunsplit
 
-import psycopg
-from flask import current_app, jsonify, redirect, render_template, request, url_for
-
-from config import LLM_HOST, LLM_PORT, TARGET_NEW_RECORDS
-from db.db_config import get_db_config
-from M3_material.query_data import build_analysis_results, get_latest_db_id
+from flask import (
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    url_for,
+)
+from werkzeug.http import is_resource_modified
+
+from config import (
+    LLM_HOST,
+    LLM_PORT,
+    LLM_STATUS_INTERVAL,
+    LLM_STATUS_MAX_BACKOFF,
+    LLM_STATUS_TTL,
+    PAGE_SNAPSHOT_TTL,
+    PULL_STATE_TTL,
+    TARGET_NEW_RECORDS,
+)
+from db import pull_jobs
+from db.pool import connection
+from M3_material.query_data import (
+    build_analysis_results,
+    data_version,
+    fetch_distributions,
+    get_latest_db_id,
+    reconcile_analytics_summary,
+    refresh_analytics_summary,
+)
+from M3_material import result_cache
+from M3_material.background import CoalescingWorker
+from M3_material.llm_monitor import ReadinessMonitor
+from M3_material.page_cache import PageCache, TimedState
+from M3_material.progress_watcher import StateWatcher
 from M3_material.reporting import generate_pdf_report
 from db.import_extra_data import seed_base_dataset
 from . import bp
@@ -31,26 +70,17 @@ from . import bp
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 PULL_SCRIPT = os.path.join(BASE_DIR, "M2_material", "pull_data.py")
 LOG_PATH = os.path.join(BASE_DIR, "db", "pull_data.log")
-LOCK_PATH = os.path.join(BASE_DIR, "db", "pull_data.lock")
-DONE_PATH = os.path.join(BASE_DIR, "db", "pull_data.done")
-PROGRESS_PATH = os.path.join(BASE_DIR, "db", "pull_progress.json")
 LATEST_SURVEY_PATH = os.path.join(BASE_DIR, "db", "latest_survey_id.txt")
-LOCK_STALE_SECONDS = 900
 MAX_NEW_RECORDS = TARGET_NEW_RECORDS
 REPORT_PATH = os.path.join(BASE_DIR, "static", "reports", "module_3_report.pdf")
 ANALYSIS_CACHE_PATH = os.path.join(BASE_DIR, "db", "analysis_cache.json")
 
-PULL_PROCESS = None
-PULL_LAST_EXIT = None
-
-
-def _pid_running(pid):
-    """Return True if the OS reports the PID is still alive."""
-    try:
-        os.kill(pid, 0)
-    except OSError:
-        return False
-    return True
+UPDATE_WORKER = CoalescingWorker("analysis-update")
+PROGRESS_INTERVAL = 1.0
+SSE_HEARTBEAT = 15.0
+_WATCHER_LOCK = threading.Lock()
+# Result keys that change whenever the analysed rows do.
+_METRIC_KEYS = ("total_applicants", "year_2026", "all_time")
 
 
 def _llm_status_url():
@@ -78,6 +108,15 @@ def _is_llm_ready():
         return False
 
 
+# Request handlers read readiness from this monitor; only its thread probes.
+LLM_MONITOR = ReadinessMonitor(
+    _is_llm_ready,
+    interval=LLM_STATUS_INTERVAL,
+    ttl=LLM_STATUS_TTL,
+    max_backoff=LLM_STATUS_MAX_BACKOFF,
+)
+
+
 def _cfg(name, default):
     """Return app config override if set."""
     try:
@@ -88,7 +127,7 @@ def _cfg(name, default):
 
 
 def _llm_ready():
-    checker = _cfg("LLM_READY_CHECK", _is_llm_ready)
+    checker = _cfg("LLM_READY_CHECK", LLM_MONITOR.ready)
     return checker()
 
 
@@ -110,50 +149,70 @@ def _report_path():
     return _cfg("REPORT_PATH", REPORT_PATH)
 
 
-def _read_progress():
-    """Read pull progress for UI status/ETA."""
-    if not os.path.exists(PROGRESS_PATH):
-        return None
+def _pull_jobs(action, default=None):
+    """Run ``action(conn)`` from db.pull_jobs on a pooled connection.
+
+    Returns ``default`` when the database cannot be reached.
+    """
     try:
-        with open(PROGRESS_PATH, "r", encoding="utf-8") as file_handle:
-            return json.load(file_handle)
-    except (OSError, json.JSONDecodeError):
-        return None
+        with connection() as conn:
+            return action(conn)
+    except Exception:
+        return default
 
 
-def _compute_results():
-    """Compute all stats for both 2026 cohort and all-time."""
-    compute = _cfg("COMPUTE_RESULTS", build_analysis_results)
-    if not _cfg("TESTING", False):
-        seed_base_dataset()
-    return compute()
+def _read_progress():
+    """Read the newest pull job's counters for UI status/ETA."""
+    return _pull_jobs(pull_jobs.read_progress)
+
+
+def _compute_results(refresh=False, previous=None):
+    """Compute all stats for both 2026 cohort and all-time.
+
+    Page loads read the published analytics summary. ``refresh`` (Update
+    Analysis) reconciles it when stale; a seed that inserted rows bypasses
+    the incremental path, so it forces a full recompute. Score
+    distributions are added under ``"distributions"`` so they are cached
+    with the rest. They take a full scan, so the ones in ``previous`` (the
+    last cached results) are kept unless a full recompute ran or the
+    metrics show that rows changed.
+    """
+    compute = _cfg("COMPUTE_RESULTS", None)
+    full = False
+    if not _cfg("TESTING", False) and seed_base_dataset():
+        results, full = (compute or refresh_analytics_summary)(), True
+    elif compute is not None:
+        results = compute()
+    elif refresh:
+        results, full = reconcile_analytics_summary()
+    else:
+        results = build_analysis_results()
+    if "distributions" not in results:
+        kept = None if full or not previous else previous.get("distributions")
+        if kept is not None and all(previous.get(key) == results.get(key) for key in _METRIC_KEYS):
+            results = {**results, "distributions": kept}
+        else:
+            distributions = _cfg("COMPUTE_DISTRIBUTIONS", fetch_distributions)
+            results = {**results, "distributions": distributions()}
+    return results
 
 
-def _read_cached_results():
-    """Load cached analysis JSON if present and valid."""
-    cache_path = _analysis_cache_path()
-    if not os.path.exists(cache_path):
-        return None
+def _data_version():
+    """Return the current data-version token, or None if it cannot be read."""
     try:
-        with open(cache_path, "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-            if not isinstance(data, dict):
-                return None
-            if "year_2026" in data and "all_time" in data:
-                return data
-            return None
-    except (OSError, json.JSONDecodeError):
+        return _cfg("DATA_VERSION", data_version)()
+    except Exception:
         return None
 
 
-def _write_cached_results(results):
-    """Persist analysis results to disk for fast page loads."""
-    cache_path = _analysis_cache_path()
-    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-    with open(cache_path, "w", encoding="utf-8") as file_handle:
-        payload = dict(results)
-        payload["_meta"] = {"updated_at": time.time()}
-        json.dump(payload, file_handle, indent=2)
+def _read_cached_results(version=None):
+    """Load cached analysis results computed for ``version`` (any if None)."""
+    return result_cache.read(_analysis_cache_path(), version)
+
+
+def _write_cached_results(results, version=None):
+    """Persist analysis results for ``version`` for fast page loads."""
+    return result_cache.write(_analysis_cache_path(), results, version)
 
 
 def _read_latest_survey_id():
@@ -170,173 +229,98 @@ def _read_latest_survey_id():
 
 def _read_last_pull_job():
     """Return the most recent pull job status from the DB."""
-    try:
-        with psycopg.connect(**get_db_config()) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT status, inserted, processed, updated_at, error
-                    FROM pull_jobs
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                    """
-                )
-                row = cur.fetchone()
-                if not row:
-                    return None
-                return {
-                    "status": row[0],
-                    "inserted": row[1],
-                    "processed": row[2],
-                    "updated_at": row[3],
-                    "error": row[4],
-                }
-    except Exception:
-        return None
+    return _pull_jobs(pull_jobs.last_job)
 
 
 def _is_pull_running():
-    """Determine whether a pull is currently running."""
-    global PULL_PROCESS, PULL_LAST_EXIT
-    if PULL_PROCESS is None:
-        if os.path.exists(DONE_PATH):
-            if os.path.exists(LOCK_PATH):
-                try:
-                    os.remove(LOCK_PATH)
-                except OSError:
-                    pass
-            return False
-        if os.path.exists(LOCK_PATH):
-            try:
-                with open(LOCK_PATH, "r", encoding="utf-8") as file_handle:
-                    pid_text = file_handle.read().strip()
-                if not pid_text:
-                    os.remove(LOCK_PATH)
-                    return False
-                if pid_text == "starting":
-                    age = time.time() - os.path.getmtime(LOCK_PATH)
-                    if age > 10:
-                        os.remove(LOCK_PATH)
-                        return False
-                    return True
-                if pid_text.isdigit() and not _pid_running(int(pid_text)):
-                    os.remove(LOCK_PATH)
-                    return False
-            except OSError:
-                pass
-            try:
-                age = time.time() - os.path.getmtime(LOCK_PATH)
-            except OSError:
-                return True
-            if age > LOCK_STALE_SECONDS:
-                try:
-                    os.remove(LOCK_PATH)
-                except OSError:
-                    pass
-                return False
-            return True
-        return False
-    if PULL_PROCESS.poll() is None:
-        return True
-    PULL_LAST_EXIT = PULL_PROCESS.returncode
-    PULL_PROCESS = None
-    return False
+    """Return True while any process holds the pull lock or is starting one."""
+    return _pull_jobs(pull_jobs.pull_running, False)
 
 
 def _clear_pull_state():
-    """Terminate any running pull and clear lock/progress files."""
-    global PULL_PROCESS, PULL_LAST_EXIT
-    if PULL_PROCESS is not None and PULL_PROCESS.poll() is None:
-        try:
-            PULL_PROCESS.terminate()
-            PULL_PROCESS.wait(timeout=3)
-        except Exception:
-            try:
-                PULL_PROCESS.kill()
-            except Exception:
-                pass
-    PULL_PROCESS = None
-    PULL_LAST_EXIT = None
-    for path in (LOCK_PATH, DONE_PATH, PROGRESS_PATH):
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except OSError:
-            pass
+    """Ask the running pull to stop at its next page."""
+    cancelled = _pull_jobs(pull_jobs.request_cancel, False)
+    _pull_changed()
+    return cancelled
 
 
 def _start_pull():
-    """Start the pull subprocess and register it in the lock file."""
-    global PULL_PROCESS, PULL_LAST_EXIT
-    if _pull_running():
-        return False
+    """Claim the pull in the database, then start the pull subprocess."""
     if not _llm_ready():
         return False
+    job_id = _pull_jobs(lambda conn: pull_jobs.claim_pull(conn, MAX_NEW_RECORDS))
+    if job_id is None:
+        return False
 
     os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
     log_file = open(LOG_PATH, "a", encoding="utf-8")
     try:
-        os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
-        with open(LOCK_PATH, "w", encoding="utf-8") as file_handle:
-            file_handle.write("starting")
-    except OSError:
-        pass
-    try:
-        PULL_PROCESS = subprocess.Popen(
-            [sys.executable, PULL_SCRIPT, "--lock", LOCK_PATH],
+        process = subprocess.Popen(
+            [sys.executable, PULL_SCRIPT, "--job-id", str(job_id)],
             cwd=BASE_DIR,
             stdout=log_file,
             stderr=log_file
         )
-        # Overwrite lock with PID once started so it isn't stuck at "starting"
-        try:
-            with open(LOCK_PATH, "w", encoding="utf-8") as file_handle:
-                file_handle.write(str(PULL_PROCESS.pid))
-        except OSError:
-            pass
-        PULL_LAST_EXIT = None
-        return True
     except Exception as e:
         try:
             log_file.write(f"Failed to start pull: {e}\n")
         except Exception:
             pass
-        try:
-            if os.path.exists(LOCK_PATH):
-                os.remove(LOCK_PATH)
-        except OSError:
-            pass
+        _pull_jobs(lambda conn: pull_jobs.fail_claim(conn, job_id, str(e)))
         return False
     finally:
         log_file.close()
+    # Reap the child when it exits so it does not linger as a zombie.
+    threading.Thread(target=process.wait, name="pull-reaper", daemon=True).start()
+    _pull_changed()
+    return True
+
+
+def _etag_for(*parts):
+    """Return a strong ETag value for JSON-serialisable ``parts``."""
+    blob = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _with_validators(response, etag, updated_at=None):
+    """Attach ETag/Last-Modified and require revalidation on every use."""
+    response.set_etag(etag)
+    if updated_at:
+        try:
+            response.last_modified = datetime.fromtimestamp(float(updated_at), timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            pass
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _conditional_json(payload):
+    """JSON response with a content ETag, or 304 if the client has it."""
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 
 @bp.route("/projects/module-3")
 def module_3_project():
-    """Render the Module 3 dashboard with current analysis results."""
-    pull_running = _pull_running()
+    """Render the Module 3 dashboard from the cached page-context snapshot."""
+    pull_view = _pull_view_state()
+    state, loaded = pull_view.get()
+    pull_running = state["running"]
     llm_ready = _llm_ready()
     status = request.args.get("status")
     message = None
-    if not pull_running and os.path.exists(DONE_PATH):
-        done_status = ""
-        done_inserted = None
-        done_duplicates = None
-        try:
-            with open(DONE_PATH, "r", encoding="utf-8") as file_handle:
-                try:
-                    data = json.load(file_handle)
-                    done_status = data.get("status", "")
-                    done_inserted = data.get("inserted")
-                    done_duplicates = data.get("duplicates")
-                except json.JSONDecodeError:
-                    done_status = file_handle.read().strip()
-        except OSError:
-            done_status = ""
-        try:
-            os.remove(DONE_PATH)
-        except OSError:
-            pass
+    # Each finished pull's status is shown once, by whichever worker serves
+    # the next page view. Only a view that saw a notice waiting writes.
+    finished = None
+    if not pull_running and state["finished"]:
+        finished = _pull_jobs(pull_jobs.take_finished)
+        pull_view.update(finished=False)
+    pull_finished = finished is not None
+    if pull_finished:
+        done_status = finished.get("status") or ""
+        done_inserted = finished.get("inserted")
 
         if done_status == "target_reached":
             count_text = done_inserted if done_inserted is not None else "new"
@@ -359,6 +343,8 @@ def module_3_project():
             message = "Pull timed out before completing. You can try again or update analysis with current data."
         elif done_status == "error":
             message = "Pull completed with errors. Check pull_data.log for details."
+        elif done_status == "cancelled":
+            message = "Pull cancelled. You can start a new pull or update analysis."
         elif done_status:
             message = "Pull is completed. You can now update analysis."
     if message is None:
@@ -370,10 +356,8 @@ def module_3_project():
             message = "LLM server is not ready yet. Start it (or wait a moment) before pulling new data."
         elif status == "analysis_updated":
             message = "Analysis refreshed with the latest available data."
-        elif status == "pull_done" and PULL_LAST_EXIT == 0:
-            message = "Pull Data finished successfully. Results updated."
-        elif status == "pull_done" and PULL_LAST_EXIT not in (None, 0):
-            message = "Pull Data finished with errors. Check pull_data.log for details."
+        elif status == "analysis_queued":
+            message = "Analysis update is running in the background. The page shows the last results until it finishes."
         elif status == "pull_done":
             message = "Pull Data finished. You can click Update Analysis to refresh the page."
         elif status == "pull_cancelled":
@@ -381,16 +365,63 @@ def module_3_project():
         elif status == "pull_timeout":
             message = "Pull timed out. You can try again or update analysis with current data."
 
-    results = _read_cached_results()
-    if results is None:
+    if pull_finished or (loaded and pull_running):
+        # A pull just finished or is landing rows: rebuild the snapshot, at
+        # most once per pull-state reload.
+        _invalidate_page()
+    if _cfg("PAGE_CACHE", not _cfg("TESTING", False)):
+        cache = _page_cache()
+        version, snapshot = cache.snapshot(_build_page_snapshot)
+    else:
+        cache, version, snapshot = None, None, _build_page_snapshot()
+    page_state = {
+        "pull_running": pull_running,
+        "llm_ready": llm_ready,
+        "status_message": message,
+        "max_new_records": MAX_NEW_RECORDS,
+        "report_url": url_for("m3_pages.report_pdf"),
+    }
+    # The snapshot tag covers the analysis version and the data-backed
+    # fields; the rest of the page state is hashed as-is. Only the ETag
+    # decides a 304, since pull state can change without the analysis
+    # timestamp moving.
+    etag = _etag_for(snapshot["etag"], page_state)
+    updated_at = snapshot["updated_at"]
+    if not is_resource_modified(request.environ, etag=etag):
+        return _with_validators(current_app.response_class(status=304), etag, updated_at)
+
+    def render():
+        return render_template("project_module_3.html", **snapshot["context"], **page_state)
+
+    if cache is None:
+        html = render()
+    else:
+        html = cache.render(version, (message, pull_running, llm_ready), render)
+    return _with_validators(make_response(html), etag, updated_at)
+
+
+def _build_page_snapshot():
+    """Assemble the data-backed part of the dashboard context."""
+    # Read the token before computing: rows landing mid-compute leave the
+    # cache on the older token, so the next load recomputes.
+    version = _data_version()
+    results = _read_cached_results(version)
+    stale = None
+    if results is None and version is not None:
+        stale = _read_cached_results()
+    if stale is not None:
+        # Serve the last good results while the worker recomputes them.
+        _submit_update()
+        results = _read_cached_results(version) or stale
+    elif results is None:
         results = _compute_results()
-        _write_cached_results(results)
+        _write_cached_results(results, version)
         report_path = _report_path()
-        if not os.path.exists(report_path):
-            try:
-                generate_pdf_report(results, report_path)
-            except Exception:
-                pass
+        try:
+            # The data changed, so any existing report is stale too.
+            generate_pdf_report(results, report_path)
+        except Exception:
+            pass
     else:
         report_path = _report_path()
         if not os.path.exists(report_path):
@@ -408,25 +439,28 @@ def module_3_project():
             )
         except (TypeError, ValueError):
             analysis_updated_at = None
-    latest_db_id = get_latest_db_id()
-    latest_survey_id = _read_latest_survey_id()
-    last_pull_job = _read_last_pull_job()
-    return render_template(
-        "project_module_3.html",
-        results_2026=results.get("year_2026", {}),
-        results_all=results.get("all_time", {}),
-        total_applicants=results.get("total_applicants"),
-        pull_running=pull_running,
-        llm_ready=llm_ready,
-        pull_progress=_read_progress(),
-        status_message=message,
-        max_new_records=MAX_NEW_RECORDS,
-        latest_db_id=latest_db_id,
-        latest_survey_id=latest_survey_id,
-        last_pull_job=last_pull_job,
-        analysis_updated_at=analysis_updated_at,
-        report_url=url_for("static", filename="reports/module_3_report.pdf")
+    context = {
+        "results_2026": results.get("year_2026", {}),
+        "results_all": results.get("all_time", {}),
+        "total_applicants": results.get("total_applicants"),
+        "distributions": results.get("distributions"),
+        "latest_db_id": get_latest_db_id(),
+        "latest_survey_id": _read_latest_survey_id(),
+        "last_pull_job": _read_last_pull_job(),
+        "analysis_updated_at": analysis_updated_at,
+    }
+    # The analysis is identified by its version token when it has one.
+    etag = _etag_for(
+        meta or results,
+        context["latest_db_id"],
+        context["latest_survey_id"],
+        context["last_pull_job"],
     )
+    return {
+        "context": context,
+        "etag": etag,
+        "updated_at": meta.get("updated_at") if meta else None,
+    }
 
 
 @bp.route("/analysis")
@@ -438,16 +472,38 @@ def analysis_page():
 def _run_update_analysis():
     updater = _cfg("UPDATE_HANDLER", None)
     if updater:
-        return updater()
-    results = _compute_results()
-    _write_cached_results(results)
-    try:
-        generate_pdf_report(results, _report_path())
-    except Exception:
-        pass
+        results = updater()
+    else:
+        version = _data_version()
+        results = _compute_results(refresh=True, previous=_read_cached_results())
+        _write_cached_results(results, version)
+        try:
+            generate_pdf_report(results, _report_path())
+        except Exception:
+            pass
+    _invalidate_page()
     return results
 
 
+def _submit_update():
+    """Queue Update Analysis on the background worker.
+
+    Returns the job status, or None when UPDATE_INLINE (default: TESTING)
+    is set, in which case the job has already finished.
+    """
+    app = current_app._get_current_object()
+
+    def job():
+        with app.app_context():
+            _run_update_analysis()
+
+    status = UPDATE_WORKER.submit(job)
+    if _cfg("UPDATE_INLINE", _cfg("TESTING", False)):
+        UPDATE_WORKER.wait()
+        return None
+    return status
+
+
 @bp.route("/pull-data", methods=["POST"])
 def pull_data_api():
     """JSON endpoint for triggering a pull."""
@@ -457,6 +513,7 @@ def pull_data_api():
     handler = _cfg("PULL_HANDLER", None)
     if handler:
         result = handler()
+        _pull_changed()
         return jsonify({"ok": True, "result": result}), 200
 
     if not _llm_ready():
@@ -470,11 +527,41 @@ def pull_data_api():
 
 @bp.route("/update-analysis", methods=["POST"])
 def update_analysis_api():
-    """JSON endpoint to recompute analysis."""
+    """JSON endpoint to recompute analysis (202 with the job status when queued)."""
     if _pull_running():
         return jsonify({"busy": True}), 409
-    _run_update_analysis()
-    return jsonify({"ok": True}), 200
+    job = _submit_update()
+    if job is None:
+        return jsonify({"ok": True}), 200
+    return jsonify({"ok": True, "job": job}), 202
+
+
+@bp.route("/projects/module-3/update-status")
+def update_status():
+    """Return the Update Analysis job status as JSON."""
+    return _conditional_json(UPDATE_WORKER.status())
+
+
+@bp.route("/projects/module-3/report.pdf")
+def report_pdf():
+    """Serve the PDF report with validators from the file's mtime and size."""
+    path = _report_path()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        abort(404)
+    # Every regeneration rewrites the file, so its stat identifies the version.
+    etag = _etag_for(stat.st_mtime_ns, stat.st_size)
+    response = send_file(
+        path,
+        mimetype="application/pdf",
+        etag=etag,
+        last_modified=stat.st_mtime,
+        max_age=0,
+        conditional=True,
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 @bp.route("/projects/module-3/pull-data", methods=["POST"])
@@ -501,28 +588,144 @@ def cancel_pull():
 
 @bp.route("/projects/module-3/update-analysis", methods=["POST"])
 def update_analysis():
-    """Recompute analysis and regenerate the PDF report."""
+    """Recompute analysis and regenerate the PDF report in the background."""
     if _pull_running():
         return redirect(url_for("m3_pages.module_3_project", status="pull_running"))
-    _run_update_analysis()
-    return redirect(url_for("m3_pages.module_3_project", status="analysis_updated"))
+    status = "analysis_updated" if _submit_update() is None else "analysis_queued"
+    return redirect(url_for("m3_pages.module_3_project", status=status))
 
 
-@bp.route("/projects/module-3/pull-status")
-def pull_status():
-    """Return JSON status for UI polling (LLM ready + progress)."""
+def _eta_seconds(progress):
+    """Estimate seconds left in a pull from its progress counters."""
+    if not progress:
+        return None
+    try:
+        inserted = float(progress.get("inserted") or 0)
+        processed = float(progress.get("processed") or 0)
+        target = float(progress.get("target") or 0)
+        elapsed = float(progress.get("elapsed_seconds") or 0)
+    except (TypeError, ValueError):
+        return None
+    if inserted <= 0 or processed <= 0:
+        return None
+    remaining_pages = max(target - inserted, 0) / (inserted / processed)
+    return round(remaining_pages / (processed / max(elapsed, 1)), 1)
+
+
+def _pull_state():
+    """Return pull state (running, LLM readiness, progress, ETA, done)."""
     running = _pull_running()
-    done_status = None
-    if os.path.exists(DONE_PATH):
-        try:
-            with open(DONE_PATH, "r", encoding="utf-8") as file_handle:
-                done_status = file_handle.read().strip() or "unknown"
-        except OSError:
-            done_status = "unknown"
-    return jsonify({
+    # Peek only: the page view that shows the notice marks it as shown.
+    done_status = None if running else _pull_jobs(pull_jobs.peek_finished)
+    progress = _read_progress()
+    return {
         "running": running,
         "llm_ready": _llm_ready(),
-        "progress": _read_progress(),
+        "progress": progress,
+        "eta_seconds": _eta_seconds(progress) if running else None,
         "done": bool(done_status),
         "status": done_status
-    })
+    }
+
+
+def _page_cache():
+    """Return the app's dashboard snapshot cache, creating it once."""
+    app = current_app._get_current_object()
+    with _WATCHER_LOCK:
+        cache = app.extensions.get("m3_page_cache")
+        if cache is None:
+            cache = PageCache(ttl=_cfg("PAGE_SNAPSHOT_TTL", PAGE_SNAPSHOT_TTL))
+            app.extensions["m3_page_cache"] = cache
+    return cache
+
+
+def _invalidate_page():
+    """Drop the dashboard snapshot after a pull or analysis event."""
+    try:
+        _page_cache().invalidate()
+    except RuntimeError:
+        # No app context (e.g. a test calling the helper directly).
+        pass
+
+
+def _load_pull_view_state():
+    """Read what a page view needs to know about pulls (two small queries)."""
+    running = _pull_running()
+    return {
+        "running": running,
+        "finished": not running and _pull_jobs(pull_jobs.peek_finished) is not None,
+    }
+
+
+def _pull_view_state():
+    """Return the app's short-lived pull state for page views, creating it once."""
+    app = current_app._get_current_object()
+    with _WATCHER_LOCK:
+        holder = app.extensions.get("m3_pull_state")
+        if holder is None:
+            default_ttl = 0.0 if _cfg("TESTING", False) else PULL_STATE_TTL
+            holder = TimedState(_load_pull_view_state, _cfg("PULL_STATE_TTL", default_ttl))
+            app.extensions["m3_pull_state"] = holder
+    return holder
+
+
+def _pull_changed():
+    """Forget the cached pull state and snapshot after this worker starts or cancels a pull."""
+    try:
+        _pull_view_state().expire()
+    except RuntimeError:
+        return
+    _invalidate_page()
+
+
+def _progress_watcher():
+    """Return the app's shared pull-progress watcher, creating it once."""
+    app = current_app._get_current_object()
+    with _WATCHER_LOCK:
+        watcher = app.extensions.get("m3_progress_watcher")
+        if watcher is None:
+            def source():
+                with app.app_context():
+                    return _pull_state()
+
+            watcher = StateWatcher(
+                source,
+                _cfg("PROGRESS_INTERVAL", PROGRESS_INTERVAL),
+                name="pull-progress-watcher",
+            )
+            app.extensions["m3_progress_watcher"] = watcher
+    return watcher
+
+
+@bp.route("/projects/module-3/pull-status")
+def pull_status():
+    """Return JSON status for UI polling (LLM ready + progress)."""
+    return _conditional_json(_pull_state())
+
+
+@bp.route("/projects/module-3/pull-events")
+def pull_events():
+    """Stream pull state as Server-Sent Events whenever it changes.
+
+    Every open stream shares one watcher thread, so extra tabs cost no extra
+    file reads or LLM probes. A comment line is sent as a keep-alive when
+    nothing changes for SSE_HEARTBEAT seconds.
+    """
+    changes = _progress_watcher().changes(_cfg("SSE_HEARTBEAT", SSE_HEARTBEAT))
+
+    def stream():
+        yield "retry: 5000\n\n"
+        try:
+            for state in changes:
+                if state is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: progress\ndata: {json.dumps(state, default=str)}\n\n"
+        finally:
+            changes.close()
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,333 @@
+"""
+In-memory columnar analytics over a NumPy snapshot of applicants.
+
+``ColumnarSnapshot`` copies applicants out of PostgreSQL once (``COPY ... TO
+STDOUT``) into typed NumPy columns: float64 scores with NaN for NULL,
+datetime64 dates with NaT, and int32 category codes for the text columns.
+Filters are evaluated once per distinct category and broadcast to rows, so
+the dashboard primitives, or any ad-hoc filter, are vectorised masks with
+no round trip to the database.
+
+The columns live in an immutable ``Columns`` bundle. ``refresh`` builds a
+new bundle (rows past the ``p_id`` watermark appended, or the whole table
+reloaded when it no longer matches) and swaps it in with one assignment,
+so a reader holding ``snapshot.columns`` never sees a half-updated set.
+
+Select it for the dashboard with ``build_analysis_results(backend="numpy")``
+or ``ANALYTICS_BACKEND=numpy``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+
+import numpy as np
+from psycopg import sql
+
+from config import ANALYTICS_RECONCILE_SECONDS
+from M3_material import query_data
+
+NUMERIC_COLUMNS = ("gpa", "gre", "gre_v", "gre_aw")
+DATE_COLUMNS = ("date_added", "acceptance_date")
+TEXT_COLUMNS = (
+    "program",
+    "status",
+    "term",
+    "us_or_international",
+    "degree",
+    "llm_generated_program",
+    "llm_generated_university",
+)
+COPY_TYPES = ["int4"] + ["float8"] * 4 + ["date"] * 2 + ["text"] * 7
+
+_SNAPSHOT = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def _like_regex(pattern: str):
+    """Compile a SQL ILIKE pattern (``%`` and ``_`` wildcards) to a regex."""
+    body = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern
+    )
+    return re.compile(body, re.IGNORECASE | re.DOTALL)
+
+
+class Categorical:
+    """Text column stored as int32 codes into a category list.
+
+    Code -1 is NULL. Predicates run once per category, never per row, and
+    NULL never matches (as in SQL, where it makes the condition unknown).
+    An instance is never changed once built; ``extended`` returns a copy.
+    """
+
+    def __init__(self, categories=(), codes=None, values=()):
+        """Copy ``categories`` and ``codes``, then encode ``values`` after them."""
+        self.categories: list[str] = list(categories)
+        self._index: dict[str, int] = {value: code for code, value in enumerate(self.categories)}
+        added = np.fromiter((self._code(v) for v in values), dtype=np.int32, count=len(values))
+        self.codes = added if codes is None else np.concatenate([codes, added])
+
+    def _code(self, value) -> int:
+        if value is None:
+            return -1
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def extended(self, values) -> "Categorical":
+        """Return a new column with ``values`` appended."""
+        return Categorical(self.categories, self.codes, values)
+
+    def matching(self, predicate) -> np.ndarray:
+        """Return a row mask for values satisfying ``predicate``."""
+        hits = np.fromiter(
+            (bool(predicate(value)) for value in self.categories),
+            dtype=bool,
+            count=len(self.categories),
+        )
+        # The trailing False is what code -1 (NULL) indexes.
+        return np.append(hits, False)[self.codes]
+
+
+class Columns:
+    """One consistent set of applicant columns; never modified once built.
+
+    Masks from ``ilike``/``equals``/``between`` line up with the rows of
+    the bundle that built them, so build filters and call ``primitives``
+    on the same bundle.
+    """
+
+    def __init__(self, p_id=None, numeric=None, dates=None, text=None):
+        self.p_id = np.empty(0, dtype=np.int64) if p_id is None else p_id
+        self.numeric = numeric or {name: np.empty(0, dtype=np.float64) for name in NUMERIC_COLUMNS}
+        self.dates = dates or {name: np.empty(0, dtype="datetime64[D]") for name in DATE_COLUMNS}
+        self.text = text or {name: Categorical() for name in TEXT_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.p_id)
+
+    @property
+    def watermark(self) -> int:
+        """Highest p_id held (rows are appended in p_id order)."""
+        return int(self.p_id[-1]) if len(self.p_id) else 0
+
+    def appended(self, values) -> "Columns":
+        """Return a new bundle with the column-wise ``values`` appended."""
+        numeric = {}
+        for offset, name in enumerate(NUMERIC_COLUMNS, start=1):
+            column = np.array(
+                [np.nan if v is None else v for v in values[offset]], dtype=np.float64
+            )
+            numeric[name] = np.concatenate([self.numeric[name], column])
+        dates = {}
+        for offset, name in enumerate(DATE_COLUMNS, start=1 + len(NUMERIC_COLUMNS)):
+            column = np.array(
+                ["NaT" if v is None else v.isoformat() for v in values[offset]],
+                dtype="datetime64[D]",
+            )
+            dates[name] = np.concatenate([self.dates[name], column])
+        text_start = 1 + len(NUMERIC_COLUMNS) + len(DATE_COLUMNS)
+        text = {
+            name: self.text[name].extended(values[offset])
+            for offset, name in enumerate(TEXT_COLUMNS, start=text_start)
+        }
+        p_id = np.concatenate([self.p_id, np.asarray(values[0], dtype=np.int64)])
+        return Columns(p_id, numeric, dates, text)
+
+    # -----------------------------
+    # Vectorised filters
+    # -----------------------------
+    def ilike(self, column: str, *patterns: str) -> np.ndarray:
+        """Rows where ``column ILIKE`` any of ``patterns``."""
+        regexes = [_like_regex(pattern) for pattern in patterns]
+        return self.text[column].matching(lambda v: any(r.fullmatch(v) for r in regexes))
+
+    def equals(self, column: str, *values: str) -> np.ndarray:
+        """Rows where ``column`` is one of ``values`` (case-sensitive)."""
+        wanted = set(values)
+        return self.text[column].matching(lambda v: v in wanted)
+
+    def between(self, column: str, start: str, end: str, fallback: str | None = None) -> np.ndarray:
+        """Rows where the date (or ``COALESCE(column, fallback)``) is in [start, end]."""
+        dates = self.dates[column]
+        if fallback is not None:
+            dates = np.where(np.isnat(dates), self.dates[fallback], dates)
+        return (dates >= np.datetime64(start)) & (dates <= np.datetime64(end))
+
+    def cohort_mask(self) -> np.ndarray:
+        """The 2026 cohort, mirroring query_data._term_filter(True)."""
+        fall = query_data.FALL_TERM.lower()
+        start, end = query_data.YEAR_START, query_data.YEAR_END
+        added = self.text["term"].matching(lambda v: v.lower() == fall) & self.between(
+            "date_added", start, end
+        )
+        notified = self.ilike("status", query_data.ACCEPT_PATTERN) & self.between(
+            "acceptance_date", start, end, fallback="date_added"
+        )
+        return added | notified
+
+    def _primitive_specs(self) -> dict:
+        """Return {primitive: (condition mask or None, value column or None, kind)}."""
+        accepted = self.ilike("status", query_data.ACCEPT_PATTERN)
+        international = self.text["us_or_international"].matching(
+            lambda v: v not in ("American", "Other")
+        )
+        american = self.equals("us_or_international", "American")
+        computer_science = self.ilike("llm_generated_program", query_data.CS_PATTERN)
+        top_phd = accepted & self.ilike("degree", "%PhD%") & computer_science
+        jhu = self.ilike("llm_generated_university", *query_data.JHU_PATTERNS) | self.ilike(
+            "program", *query_data.JHU_PATTERNS
+        )
+        specs = {
+            "total": (None, None, "rows"),
+            "international": (international, None, "rows"),
+            "accepted": (accepted, None, "rows"),
+        }
+        for name in NUMERIC_COLUMNS:
+            specs[f"{name}_n"] = (None, name, "count")
+            specs[f"{name}_sum"] = (None, name, "sum")
+        for prefix, condition, column in (
+            ("american_gpa", american, "gpa"),
+            ("accepted_gpa", accepted, "gpa"),
+            ("international_gre", international, "gre"),
+        ):
+            specs[f"{prefix}_n"] = (condition, column, "count")
+            specs[f"{prefix}_sum"] = (condition, column, "sum")
+        specs["jhu_masters_cs"] = (
+            self.ilike("degree", "%Master%") & computer_science & jhu,
+            None,
+            "rows",
+        )
+        specs["top_phd_raw"] = (
+            top_phd & self.ilike("program", *query_data.TOP_UNI_PATTERNS),
+            None,
+            "rows",
+        )
+        specs["top_phd_llm"] = (
+            top_phd & self.equals("llm_generated_university", *query_data.TOP_UNI_NAMES),
+            None,
+            "rows",
+        )
+        return specs
+
+    def primitives(self, mask: np.ndarray | None = None) -> dict:
+        """Return {scope: {primitive: value}} like query_data.fetch_primitives.
+
+        ``mask`` restricts both scopes to an ad-hoc row filter built from
+        ilike/equals/between (combine them with ``&``, ``|`` and ``~``).
+        """
+        base = np.ones(len(self), dtype=bool) if mask is None else mask
+        scope_masks = {"year_2026": base & self.cohort_mask(), "all_time": base}
+        specs = self._primitive_specs()
+        result = {}
+        for scope, scope_mask in scope_masks.items():
+            values = {}
+            for name, (condition, column, kind) in specs.items():
+                rows = scope_mask if condition is None else scope_mask & condition
+                if kind == "rows":
+                    values[name] = int(np.count_nonzero(rows))
+                    continue
+                present = self.numeric[column][rows]
+                present = present[~np.isnan(present)]
+                if kind == "count":
+                    values[name] = int(present.size)
+                else:
+                    # SUM over no rows is NULL in SQL.
+                    values[name] = float(present.sum()) if present.size else None
+            result[scope] = values
+        return result
+
+
+
+class ColumnarSnapshot:
+    """The current ``Columns`` for applicants, kept up to date by ``refresh``."""
+
+    def __init__(self):
+        self.columns = Columns()
+        self._filenode = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def watermark(self) -> int:
+        """Highest p_id in the current columns."""
+        return self.columns.watermark
+
+    def refresh(self, max_age=None) -> int:
+        """Bring the columns up to date; return how many rows were read.
+
+        Rows with p_id above the watermark are appended. The whole table is
+        reloaded instead when it was truncated or recreated (its filenode
+        changed), when the rows at or below the watermark no longer match
+        (deletes, or inserts that committed after a higher p_id), or once
+        the last full load is ``max_age`` seconds old (default
+        ANALYTICS_RECONCILE_SECONDS), which is how updates are picked up.
+        """
+        max_age = ANALYTICS_RECONCILE_SECONDS if max_age is None else max_age
+        columns = ("p_id",) + NUMERIC_COLUMNS + DATE_COLUMNS + TEXT_COLUMNS
+        stmt = sql.SQL(
+            "COPY (SELECT {fields} FROM applicants WHERE p_id > {watermark} ORDER BY p_id) "
+            "TO STDOUT"
+        )
+        with self._lock:
+            current = self.columns
+            with query_data.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT pg_relation_filenode('applicants'), COUNT(*) "
+                        "FROM applicants WHERE p_id <= %s",
+                        (current.watermark,),
+                    )
+                    filenode, known = cur.fetchone()
+                    reload = (
+                        self._loaded_at is None
+                        or filenode != self._filenode
+                        or known != len(current)
+                        or time.monotonic() - self._loaded_at >= max_age
+                    )
+                    if reload:
+                        current = Columns()
+                    query = stmt.format(
+                        fields=sql.SQL(", ").join(sql.Identifier(name) for name in columns),
+                        watermark=sql.Literal(current.watermark),
+                    )
+                    with cur.copy(query) as copy:
+                        copy.set_types(COPY_TYPES)
+                        rows = list(copy.rows())
+            if rows:
+                current = current.appended(list(zip(*rows)))
+            # One assignment: readers see the old bundle or the new one.
+            self.columns = current
+            if reload:
+                self._filenode = filenode
+                self._loaded_at = time.monotonic()
+            return len(rows)
+
+    def primitives(self, mask: np.ndarray | None = None) -> dict:
+        """Return the primitives of the current columns (see Columns.primitives)."""
+        return self.columns.primitives(mask)
+
+
+def get_snapshot() -> ColumnarSnapshot:
+    """Return the process-wide snapshot, loading or topping it up first."""
+    global _SNAPSHOT  # pylint: disable=global-statement
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None:
+            _SNAPSHOT = ColumnarSnapshot()
+        snapshot = _SNAPSHOT
+    snapshot.refresh()
+    return snapshot
+
+
+def reset_snapshot() -> None:
+    """Drop the process-wide snapshot (e.g. after applicants is recreated)."""
+    global _SNAPSHOT  # pylint: disable=global-statement
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = None
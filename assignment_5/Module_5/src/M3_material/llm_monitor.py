@@ -0,0 +1,79 @@
+"""
+Background readiness monitor for the local LLM service.
+
+``ReadinessMonitor`` runs a probe (an HTTP check of the LLM's ``/status``) on
+a daemon thread and caches the answer, so request handlers read readiness
+from memory instead of waiting on the network. While the service is up it
+re-probes every ``interval`` seconds; while it is down the delay doubles per
+failed probe up to ``max_backoff``. A cached "ready" older than ``ttl`` is
+not trusted, so a hung probe reads as not ready.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class ReadinessMonitor:
+    """Probe a service in the background and serve the cached result."""
+
+    def __init__(self, probe, interval=5.0, ttl=15.0, max_backoff=60.0):
+        self._probe = probe
+        self._settings = {"interval": interval, "ttl": ttl, "max_backoff": max_backoff}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._state = {"ready": False, "checked_at": None, "failures": 0}
+
+    def delay(self, failures: int) -> float:
+        """Seconds until the next probe after ``failures`` failed probes in a row."""
+        interval = self._settings["interval"]
+        if not failures:
+            return interval
+        return min(interval * 2 ** failures, self._settings["max_backoff"])
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            # is_alive() also restarts the monitor in a forked worker process.
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="readiness-monitor", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ready = bool(self._probe())
+            except Exception:  # pylint: disable=broad-exception-caught
+                ready = False
+            with self._lock:
+                failures = 0 if ready else self._state["failures"] + 1
+                self._state.update(ready=ready, checked_at=time.monotonic(), failures=failures)
+            self._stop.wait(self.delay(failures))
+
+    def ready(self) -> bool:
+        """Return the cached readiness without blocking (False until probed)."""
+        self._ensure_started()
+        with self._lock:
+            checked_at = self._state["checked_at"]
+            if checked_at is None or time.monotonic() - checked_at > self._settings["ttl"]:
+                return False
+            return self._state["ready"]
+
+    def status(self) -> dict:
+        """Return the cached state with the probe age in seconds."""
+        with self._lock:
+            state = dict(self._state)
+        checked_at = state.pop("checked_at")
+        state["age"] = None if checked_at is None else round(time.monotonic() - checked_at, 3)
+        return state
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the probe thread (it restarts on the next ready() call)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
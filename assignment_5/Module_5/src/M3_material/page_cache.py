@@ -0,0 +1,112 @@
+"""
+Dashboard context snapshot and rendered-page cache.
+
+Building the Module 3 page context reads the database (latest id, last
+pull job) and several files (analysis cache, survey id, report). A
+``PageCache`` builds that context once and keeps it until a pull or
+analysis event calls ``invalidate()``, or until it is ``ttl`` seconds old,
+which bounds how long changes made by another worker process go unseen.
+Rendered HTML is kept per key (status message, readiness) for the current
+snapshot only, so a steady-state page view is two dict lookups.
+
+``TimedState`` holds the pull state a page view needs (running, finished
+notice waiting) and re-reads it at most once per ``ttl``, so a cached view
+does no database work either.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class PageCache:
+    """Hold one page-context snapshot and the pages rendered from it."""
+
+    def __init__(self, ttl: float = 30.0, max_pages: int = 16):
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        # (version, built_at, context) for the current snapshot.
+        self._snapshot = None
+        self._generation = 0
+        self._builds = 0
+        self._pages: OrderedDict = OrderedDict()
+
+    def invalidate(self) -> None:
+        """Drop the snapshot and every page rendered from it."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self._pages.clear()
+
+    def snapshot(self, build):
+        """Return ``(version, context)``, calling ``build()`` when needed.
+
+        ``build`` runs outside the lock. If an invalidation lands while it
+        runs, the context is returned but not kept, and the version is None.
+        """
+        with self._lock:
+            current = self._snapshot
+            if current is not None and time.monotonic() - current[1] <= self.ttl:
+                return current[0], current[2]
+            generation = self._generation
+        context = build()
+        with self._lock:
+            if self._generation != generation:
+                return None, context
+            self._builds += 1
+            self._snapshot = (self._builds, time.monotonic(), context)
+            self._pages.clear()
+            return self._builds, context
+
+    def render(self, version, key, render):
+        """Return the page for ``key`` rendered from snapshot ``version``."""
+        if version is None:
+            return render()
+        with self._lock:
+            cached = self._pages.get((version, key))
+            if cached is not None:
+                self._pages.move_to_end((version, key))
+                return cached
+        page = render()
+        with self._lock:
+            if self._snapshot is not None and self._snapshot[0] == version:
+                self._pages[(version, key)] = page
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        return page
+
+
+class TimedState:
+    """Hold a small state dict that ``load()`` refreshes at most every ``ttl`` seconds."""
+
+    def __init__(self, load, ttl: float = 2.0):
+        self.load = load
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (loaded_at, state), or None when the next get() must load.
+        self._current = None
+
+    def get(self):
+        """Return ``(state, loaded)``; ``loaded`` is True when ``load()`` just ran."""
+        with self._lock:
+            current = self._current
+            if current is not None and time.monotonic() - current[0] <= self.ttl:
+                return current[1], False
+        state = self.load()
+        with self._lock:
+            self._current = (time.monotonic(), state)
+        return state, True
+
+    def update(self, **changes) -> None:
+        """Apply ``changes`` to the held state without reloading it."""
+        with self._lock:
+            if self._current is not None:
+                self._current = (self._current[0], {**self._current[1], **changes})
+
+    def expire(self) -> None:
+        """Make the next get() load again."""
+        with self._lock:
+            self._current = None
@@ -0,0 +1,73 @@
+"""
+Shared watcher that fans pull-progress changes out to streaming clients.
+
+One daemon thread polls a state function (the pull_jobs row, pull state,
+LLM readiness) every ``interval`` seconds and wakes subscribers only when
+the state changes. Each open dashboard tab holds a subscription instead of
+querying the database and probing the LLM itself; the thread starts with the
+first subscriber and exits after the last one leaves.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class StateWatcher:
+    """Poll ``source`` on one thread and hand changed states to subscribers."""
+
+    def __init__(self, source, interval: float = 1.0, name: str = "state-watcher"):
+        self._source = source
+        self.interval = interval
+        self.name = name
+        self._cond = threading.Condition()
+        # (version, state); the version increments on every change.
+        self._latest = (0, None)
+        self._subscribers = 0
+        self._thread = None
+
+    @property
+    def subscribers(self) -> int:
+        """Number of open subscriptions."""
+        with self._cond:
+            return self._subscribers
+
+    def _run(self) -> None:
+        while True:
+            try:
+                state = self._source()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                state = {"error": f"{type(exc).__name__}: {exc}"}
+            with self._cond:
+                version, previous = self._latest
+                if version == 0 or state != previous:
+                    self._latest = (version + 1, state)
+                    self._cond.notify_all()
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            time.sleep(self.interval)
+
+    def changes(self, heartbeat: float = 15.0):
+        """Yield the current state, then each change.
+
+        Yields None when ``heartbeat`` seconds pass without a change, so a
+        stream can send a keep-alive. Closing the generator unsubscribes.
+        """
+        with self._cond:
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        seen = 0
+        try:
+            while True:
+                with self._cond:
+                    changed = self._cond.wait_for(lambda: self._latest[0] != seen, heartbeat)
+                    seen, state = self._latest
+                    state = state if changed else None
+                yield state
+        finally:
+            with self._cond:
+                self._subscribers -= 1
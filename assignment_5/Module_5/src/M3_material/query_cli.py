@@ -3,8 +3,21 @@ Quick CLI test runner for query_data.py.
 
 This script prints the answers that the dashboard displays, and helps validate
 the SQL queries without running the Flask app.
+
+Modes (combinable):
+
+- ``--json`` prints the full results dict instead of prose.
+- ``--bench N`` times each metric function over N runs (p50/p95 in ms).
+- ``--explain`` captures ``EXPLAIN (ANALYZE, BUFFERS)`` for each statement.
+- ``--report PATH`` writes everything collected as one JSON report, so
+  query regressions against a large synthetic DB can be diffed.
 """
 
+import argparse
+import json
+import math
+import time
+
 try:
     from .query_data import (
         acceptance_rate_fall_2026,
@@ -13,10 +26,15 @@ try:
         avg_gpa_acceptances_fall_2026,
         avg_gpa_american_fall_2026,
         average_metrics_all_applicants,
+        build_analysis_results,
         count_fall_2026_entries,
         count_jhu_masters_cs,
         count_top_phd_acceptances_2026_llm,
         count_top_phd_acceptances_2026_raw_university,
+        count_total_applicants,
+        explain_statement,
+        fetch_primitives,
+        metric_statements,
         percent_international_students,
     )
 except ImportError:  # fallback when run as a script
@@ -27,15 +45,76 @@ except ImportError:  # fallback when run as a script
         avg_gpa_acceptances_fall_2026,
         avg_gpa_american_fall_2026,
         average_metrics_all_applicants,
+        build_analysis_results,
         count_fall_2026_entries,
         count_jhu_masters_cs,
         count_top_phd_acceptances_2026_llm,
         count_top_phd_acceptances_2026_raw_university,
+        count_total_applicants,
+        explain_statement,
+        fetch_primitives,
+        metric_statements,
         percent_international_students,
     )
 
 
-def main():
+def _metric_functions():
+    """Return {label: zero-argument callable} for every metric function."""
+    functions = {
+        "count_total_applicants": count_total_applicants,
+        "fetch_primitives": fetch_primitives,
+        "build_analysis_results": build_analysis_results,
+    }
+    for func in (
+        count_fall_2026_entries,
+        percent_international_students,
+        average_metrics_all_applicants,
+        avg_gpa_american_fall_2026,
+        acceptance_rate_fall_2026,
+        avg_gpa_acceptances_fall_2026,
+        count_jhu_masters_cs,
+        count_top_phd_acceptances_2026_raw_university,
+        count_top_phd_acceptances_2026_llm,
+        additional_question_1,
+        additional_question_2,
+    ):
+        functions[func.__name__] = lambda func=func: func(True)
+    return functions
+
+
+def _percentile(sorted_ms, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_ms[max(0, math.ceil(fraction * len(sorted_ms)) - 1)]
+
+
+def bench(runs):
+    """Time each metric function ``runs`` times; return ms statistics."""
+    report = {}
+    for label, func in _metric_functions().items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        report[label] = {
+            "runs": runs,
+            "p50_ms": round(_percentile(timings, 0.50), 3),
+            "p95_ms": round(_percentile(timings, 0.95), 3),
+            "max_ms": round(timings[-1], 3),
+        }
+    return report
+
+
+def explain():
+    """Return {statement label: EXPLAIN (ANALYZE, BUFFERS) JSON plan}."""
+    return {
+        label: explain_statement(stmt, params)
+        for label, (stmt, params) in metric_statements().items()
+    }
+
+
+def print_answers():
     """Print the dashboard answers without starting the Flask app."""
     # Question 1
     fall_2026_count = count_fall_2026_entries(True)
@@ -108,5 +187,39 @@ def main():
     print(f"  {additional_question_2(True)}")
 
 
+def main(argv=None):
+    """Print answers, or run the JSON/benchmark/EXPLAIN modes."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the full results dict")
+    parser.add_argument("--bench", type=int, metavar="N", help="time each metric over N runs")
+    parser.add_argument(
+        "--explain", action="store_true", help="EXPLAIN (ANALYZE, BUFFERS) each query"
+    )
+    parser.add_argument("--report", metavar="PATH", help="write the collected report as JSON")
+    args = parser.parse_args(argv)
+
+    if not (args.json or args.bench or args.explain or args.report):
+        print_answers()
+        return None
+
+    report = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    report["results"] = build_analysis_results()
+    if args.bench:
+        report["bench"] = bench(args.bench)
+    if args.explain:
+        report["explain"] = explain()
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file_handle:
+            json.dump(report, file_handle, indent=2, default=str)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return report
+    for label, stats in report.get("bench", {}).items():
+        print(f"{label:48} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms")
+    for label, plan in report.get("explain", {}).items():
+        print(f"{label:48} {plan['Plan']['Node Type']:20} {plan['Execution Time']:9.3f} ms")
+    return report
+
+
 if __name__ == "__main__":
     main()
@@ -1,13 +1,28 @@
 """
 SQL query helpers for Module 3 analytics.
 
-Each function opens a DB connection, runs a focused SQL query, and returns
-simple numeric results used by the dashboard and PDF report.
+All dashboard metrics are computed by one aggregate query per refresh: each
+metric is a ``FILTER (WHERE ...)`` aggregate over a single scan of
+applicants, for the 2026 cohort and all-time side by side. The query returns
+additive primitives (row counts, value counts and sums); averages and
+percentages are finished in Python with the same rounding the per-metric SQL
+used. The individual question helpers remain as thin wrappers.
+
+The dashboard reads published primitives from the ``analytics_summary``
+table. Because every primitive is additive, pulls fold just the rows they
+inserted into it (``apply_analytics_delta``); ``refresh_analytics_summary``
+recomputes it from scratch after bulk imports and, via
+``reconcile_analytics_summary``, once it is older than
+``ANALYTICS_RECONCILE_SECONDS``.
 """
-import psycopg
+from decimal import ROUND_HALF_UP, Decimal
+from importlib import import_module
+
 from psycopg import sql
+from psycopg.types.json import Jsonb
 
-from db.db_config import get_db_config
+from config import ANALYTICS_BACKEND, ANALYTICS_RECONCILE_SECONDS
+from db.pool import connection
 # Cohort definition:
 # - Start term is Fall (term column stores only the semester word),
 #   and the entry was added in 2026, OR
@@ -21,11 +36,10 @@ MAX_LIMIT = 100
 # Helper: Connect to DB
 # -----------------------------
 def get_connection():
-    """Open a DB connection or raise a helpful error."""
+    """Borrow a pooled DB connection or raise a helpful error."""
     try:
-        # Psycopg3 allows connection as a context manager
-        conn = psycopg.connect(**get_db_config())
-        return conn
+        # Used as a context manager: commits and returns the connection to the pool.
+        return connection()
     except Exception as exc:
         raise RuntimeError(f"Error connecting to database: {exc}") from exc
 
@@ -46,8 +60,10 @@ def _term_filter(use_term_filter: bool):
     """Return SQL WHERE clause + params for the 2026 cohort or all entries."""
     if use_term_filter:
         # Include Fall entries added in 2026 OR accepted entries notified in 2026.
+        # lower(term) = lower(...) matches ILIKE for a wildcard-free term and,
+        # with the status pattern, lines up with the migration 004 indexes.
         return (
-            "((term ILIKE %s AND date_added BETWEEN %s AND %s) "
+            "((lower(term) = lower(%s) AND date_added BETWEEN %s AND %s) "
             "OR (status ILIKE %s AND COALESCE(acceptance_date, date_added) "
             "BETWEEN %s AND %s))",
             [FALL_TERM, YEAR_START, YEAR_END, "accept%", YEAR_START, YEAR_END],
@@ -55,207 +71,284 @@ def _term_filter(use_term_filter: bool):
     return "TRUE", []
 
 # -----------------------------
-# 1. Count 2026 cohort entries
+# Metric definitions
 # -----------------------------
-def count_total_applicants():
-    """Total records in applicants table."""
+ACCEPT_PATTERN = "accept%"
+INTERNATIONAL_SQL = "us_or_international NOT IN ('American', 'Other')"
+# Cover common variants and misspellings in raw text.
+JHU_PATTERNS = [
+    "%Johns Hopkins University%",
+    "%Johns Hopkins Univ%",
+    "%John Hopkins%",
+    "%Johns Hopkins%",
+    "%John Hopkins University%",
+    "%Johns Hopkins Univeristy%",
+    "%JHU%",
+]
+TOP_UNI_PATTERNS = [
+    "%Georgetown University%",
+    "%MIT%",
+    "%Stanford University%",
+    "%Carnegie Mellon University%",
+]
+TOP_UNI_NAMES = [
+    "Georgetown University",
+    "MIT",
+    "Stanford University",
+    "Carnegie Mellon University",
+]
+CS_PATTERN = "%Computer Science%"
+
+# (primitive name, aggregate, extra condition or None, condition params).
+# Every primitive is additive across disjoint row sets, so the same list can
+# later be summed per partition and finished with _finish_scope().
+PRIMITIVES = [
+    ("total", "COUNT(*)", None, []),
+    ("international", "COUNT(*)", INTERNATIONAL_SQL, []),
+    ("accepted", "COUNT(*)", "status ILIKE %s", [ACCEPT_PATTERN]),
+    ("gpa_n", "COUNT(gpa)", None, []),
+    ("gpa_sum", "SUM(gpa)", None, []),
+    ("gre_n", "COUNT(gre)", None, []),
+    ("gre_sum", "SUM(gre)", None, []),
+    ("gre_v_n", "COUNT(gre_v)", None, []),
+    ("gre_v_sum", "SUM(gre_v)", None, []),
+    ("gre_aw_n", "COUNT(gre_aw)", None, []),
+    ("gre_aw_sum", "SUM(gre_aw)", None, []),
+    ("american_gpa_n", "COUNT(gpa)", "us_or_international = 'American'", []),
+    ("american_gpa_sum", "SUM(gpa)", "us_or_international = 'American'", []),
+    ("accepted_gpa_n", "COUNT(gpa)", "status ILIKE %s", [ACCEPT_PATTERN]),
+    ("accepted_gpa_sum", "SUM(gpa)", "status ILIKE %s", [ACCEPT_PATTERN]),
+    ("international_gre_n", "COUNT(gre)", INTERNATIONAL_SQL, []),
+    ("international_gre_sum", "SUM(gre)", INTERNATIONAL_SQL, []),
+    (
+        "jhu_masters_cs",
+        "COUNT(*)",
+        "degree ILIKE %s AND llm_generated_program ILIKE %s "
+        "AND (llm_generated_university ILIKE ANY(%s) OR program ILIKE ANY(%s))",
+        ["%Master%", CS_PATTERN, JHU_PATTERNS, JHU_PATTERNS],
+    ),
+    (
+        "top_phd_raw",
+        "COUNT(*)",
+        "status ILIKE %s AND degree ILIKE %s AND llm_generated_program ILIKE %s "
+        "AND program ILIKE ANY(%s)",
+        [ACCEPT_PATTERN, "%PhD%", CS_PATTERN, TOP_UNI_PATTERNS],
+    ),
+    (
+        "top_phd_llm",
+        "COUNT(*)",
+        "status ILIKE %s AND degree ILIKE %s AND llm_generated_program ILIKE %s "
+        "AND llm_generated_university = ANY(%s)",
+        [ACCEPT_PATTERN, "%PhD%", CS_PATTERN, TOP_UNI_NAMES],
+    ),
+]
+# Scope name -> use_term_filter flag, in build_analysis_results order.
+SCOPES = {"year_2026": True, "all_time": False}
+
+
+def _select_columns(scopes, names):
+    """Return (select expressions, params, (scope, primitive) columns)."""
+    select, params, columns = [], [], []
+    for scope in scopes:
+        scope_flag = "in_cohort" if SCOPES[scope] else "TRUE"
+        for name, aggregate, condition, condition_params in PRIMITIVES:
+            if names is not None and name not in names:
+                continue
+            where = scope_flag if condition is None else f"{scope_flag} AND {condition}"
+            select.append(f"{aggregate} FILTER (WHERE {where})")
+            params.extend(condition_params)
+            columns.append((scope, name))
+    return select, params, columns
+
+
+def _metrics_query(scopes, names=None, p_ids=None):
+    """Build the single-scan aggregate query for the requested scopes.
+
+    ``names`` limits the query to a subset of PRIMITIVES (default: all) and
+    ``p_ids`` to the given rows (default: the whole table).
+    Returns ``(statement, params, columns)`` where ``columns`` lists the
+    ``(scope, primitive)`` pair for each output column. When only the cohort
+    is requested its predicate is also the WHERE clause, so the cohort
+    indexes can serve it; otherwise one scan feeds both scopes.
+    """
+    cohort_clause, cohort_params = _term_filter(True)
+    select, params, columns = _select_columns(scopes, names)
+
+    inner = f"SELECT *, {cohort_clause} AS in_cohort FROM applicants"
+    inner_params = list(cohort_params)
+    where = []
+    if all(SCOPES[scope] for scope in scopes):
+        where.append(cohort_clause)
+        inner_params += cohort_params
+    if p_ids is not None:
+        where.append("p_id = ANY(%s)")
+        inner_params.append(list(p_ids))
+    if where:
+        inner += " WHERE " + " AND ".join(where)
+    stmt = sql.SQL(
+        "SELECT " + ", ".join(select) + " FROM (" + inner + ") AS scoped LIMIT {limit}"
+    ).format(limit=sql.Placeholder())
+    return stmt, params + inner_params + [_clamp_limit(None)], columns
+
+
+def _run_primitives(cur, scopes=tuple(SCOPES), names=None, p_ids=None):
+    """Run the aggregate query on ``cur``; return {scope: {primitive: value}}."""
+    stmt, params, columns = _metrics_query(scopes, names, p_ids)
+    cur.execute(stmt, params)
+    row = cur.fetchone()
+    primitives = {scope: {} for scope in scopes}
+    for (scope, name), value in zip(columns, row):
+        primitives[scope][name] = value
+    return primitives
+
+
+def fetch_primitives(scopes=tuple(SCOPES), names=None):
+    """Run the aggregate query once; return {scope: {primitive: value}}."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants LIMIT {limit}"
-            ).format(limit=sql.Placeholder())
-            cur.execute(stmt, [limit_value])
-            return cur.fetchone()[0]
+            return _run_primitives(cur, scopes, names)
+
+
+def _average(total, count):
+    """Mirror ``AVG(x)::numeric(5,2)`` followed by ``float(v) if v else None``.
+
+    PostgreSQL averages float8 as sum / count, converts to numeric via 15
+    significant digits, then rounds half away from zero to two places.
+    """
+    if not count:
+        return None
+    value = Decimal(f"{total / count:.15g}").quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return float(value) if value else None
+
+
+def _percent(part, total):
+    """Percentage of ``total`` rounded to two places (0.0 when empty)."""
+    return round((part / total) * 100, 2) if total else 0.0
+
+
+def _average_metrics(p):
+    return {
+        "avg_gpa": _average(p["gpa_sum"], p["gpa_n"]),
+        "avg_gre": _average(p["gre_sum"], p["gre_n"]),
+        "avg_gre_v": _average(p["gre_v_sum"], p["gre_v_n"]),
+        "avg_gre_aw": _average(p["gre_aw_sum"], p["gre_aw_n"]),
+    }
+
+
+# Dashboard metric -> (primitives it needs, function finishing them).
+METRICS = {
+    "count": (("total",), lambda p: p["total"]),
+    "percent_international": (
+        ("international", "total"),
+        lambda p: _percent(p["international"], p["total"]),
+    ),
+    "average_metrics": (
+        ("gpa_n", "gpa_sum", "gre_n", "gre_sum", "gre_v_n", "gre_v_sum", "gre_aw_n", "gre_aw_sum"),
+        _average_metrics,
+    ),
+    "avg_gpa_american_fall_2026": (
+        ("american_gpa_n", "american_gpa_sum"),
+        lambda p: _average(p["american_gpa_sum"], p["american_gpa_n"]),
+    ),
+    "acceptance_rate_fall_2026": (
+        ("accepted", "total"),
+        lambda p: _percent(p["accepted"], p["total"]),
+    ),
+    "avg_gpa_acceptances_fall_2026": (
+        ("accepted_gpa_n", "accepted_gpa_sum"),
+        lambda p: _average(p["accepted_gpa_sum"], p["accepted_gpa_n"]),
+    ),
+    "jhu_masters_cs": (("jhu_masters_cs",), lambda p: p["jhu_masters_cs"]),
+    "top_phd_acceptances_2026_raw": (("top_phd_raw",), lambda p: p["top_phd_raw"]),
+    "top_phd_acceptances_2026_llm": (("top_phd_llm",), lambda p: p["top_phd_llm"]),
+    "additional_question_1": (
+        ("gpa_n", "total"),
+        lambda p: _percent(p["gpa_n"], p["total"]),
+    ),
+    "additional_question_2": (
+        ("international_gre_n", "international_gre_sum"),
+        lambda p: _average(p["international_gre_sum"], p["international_gre_n"]),
+    ),
+}
+
+
+def _finish_scope(p):
+    """Turn one scope's primitives into the dashboard metric values."""
+    return {metric: finish(p) for metric, (_, finish) in METRICS.items()}
+
+
+def _scope_metric(metric, use_term_filter: bool):
+    """One metric for one scope, querying only the primitives it needs."""
+    scope = "year_2026" if use_term_filter else "all_time"
+    names, finish = METRICS[metric]
+    return finish(fetch_primitives((scope,), names)[scope])
+
+
+def assemble_results(primitives):
+    """Build the dashboard dict from {scope: primitives} for both scopes."""
+    year = _finish_scope(primitives["year_2026"])
+    all_time = _finish_scope(primitives["all_time"])
+    return {
+        "total_applicants": all_time["count"],
+        "year_2026": {"fall_2026_count": year.pop("count"), **year},
+        "all_time": {"total_entries": all_time.pop("count"), **all_time},
+    }
+
+# -----------------------------
+# 1. Count total entries
+# -----------------------------
+def count_total_applicants():
+    """Total records in applicants table."""
+    return _scope_metric("count", False)
 
 # -----------------------------
 # 2. Count 2026 cohort entries
 # -----------------------------
 def count_fall_2026_entries(use_term_filter: bool):
     """Count entries in the 2026 cohort (or all entries if filter disabled)."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants WHERE {clause} LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            return cur.fetchone()[0]
+    return _scope_metric("count", use_term_filter)
 
 # -----------------------------
 # 3. Percent international students
 # -----------------------------
 def percent_international_students(use_term_filter: bool):
     """Percent international (not American/Other) in the selected cohort."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} AND us_or_international NOT IN ('American', 'Other') "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            intl_count = cur.fetchone()[0]
-
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants WHERE {clause} LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            total = cur.fetchone()[0]
-
-            return round((intl_count / total) * 100, 2) if total else 0.0
+    return _scope_metric("percent_international", use_term_filter)
 
 # -----------------------------
 # 4. Average metrics (GPA, GRE, GRE V, GRE AW)
 # -----------------------------
 def average_metrics_all_applicants(use_term_filter: bool):
     """Average GPA/GRE metrics for the selected cohort."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT "
-                "AVG(gpa)::numeric(5,2), "
-                "AVG(gre)::numeric(5,2), "
-                "AVG(gre_v)::numeric(5,2), "
-                "AVG(gre_aw)::numeric(5,2) "
-                "FROM applicants "
-                "WHERE {clause} "
-                "  AND ("
-                "      gpa IS NOT NULL "
-                "   OR gre IS NOT NULL "
-                "   OR gre_v IS NOT NULL "
-                "   OR gre_aw IS NOT NULL "
-                "  ) "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            row = cur.fetchone()
-            return {
-                "avg_gpa": float(row[0]) if row[0] else None,
-                "avg_gre": float(row[1]) if row[1] else None,
-                "avg_gre_v": float(row[2]) if row[2] else None,
-                "avg_gre_aw": float(row[3]) if row[3] else None
-            }
+    return _scope_metric("average_metrics", use_term_filter)
 
 # -----------------------------
 # 5. Average GPA of American 2026 cohort applicants
 # -----------------------------
 def avg_gpa_american_fall_2026(use_term_filter: bool):
     """Average GPA for American applicants in the selected cohort."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT AVG(gpa)::numeric(5,2) "
-                "FROM applicants "
-                "WHERE {clause} "
-                "  AND us_or_international='American' "
-                "  AND gpa IS NOT NULL "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            result = cur.fetchone()[0]
-            return float(result) if result else None
+    return _scope_metric("avg_gpa_american_fall_2026", use_term_filter)
 
 # -----------------------------
 # 6. Acceptance rate (2026 cohort)
 # -----------------------------
 def acceptance_rate_fall_2026(use_term_filter: bool):
     """Acceptance rate for the selected cohort."""
-    accept_pattern = "accept%"
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} "
-                "  AND status ILIKE %s "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, (*params, accept_pattern, limit_value))
-            acceptances = cur.fetchone()[0]
-
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants WHERE {clause} LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            total = cur.fetchone()[0]
-
-            return round((acceptances / total) * 100, 2) if total else 0.0
+    return _scope_metric("acceptance_rate_fall_2026", use_term_filter)
 
 # -----------------------------
 # 7. Average GPA of 2026 cohort acceptances
 # -----------------------------
 def avg_gpa_acceptances_fall_2026(use_term_filter: bool):
     """Average GPA among accepted applicants in the selected cohort."""
-    accept_pattern = "accept%"
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT AVG(gpa)::numeric(5,2) "
-                "FROM applicants "
-                "WHERE {clause} "
-                "  AND status ILIKE %s "
-                "  AND gpa IS NOT NULL "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, (*params, accept_pattern, limit_value))
-            result = cur.fetchone()[0]
-            return float(result) if result else None
+    return _scope_metric("avg_gpa_acceptances_fall_2026", use_term_filter)
 
 # -----------------------------
 # 8. Count JHU Masters in CS applicants
 # -----------------------------
 def count_jhu_masters_cs(use_term_filter: bool):
     """Count JHU MS in CS applicants using LLM + raw text edge cases."""
-    masters_pattern = "%Master%"
-    cs_pattern = "%Computer Science%"
-    # Cover common variants and misspellings in raw text.
-    uni_patterns = [
-        "%Johns Hopkins University%",
-        "%Johns Hopkins Univ%",
-        "%John Hopkins%",
-        "%Johns Hopkins%",
-        "%John Hopkins University%",
-        "%Johns Hopkins Univeristy%",
-        "%JHU%",
-    ]
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} "
-                "  AND degree ILIKE %s "
-                "  AND llm_generated_program ILIKE %s "
-                "  AND ("
-                "        llm_generated_university ILIKE ANY(%s) "
-                "     OR program ILIKE ANY(%s)"
-                "  ) "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(
-                stmt,
-                (*params, masters_pattern, cs_pattern, uni_patterns, uni_patterns, limit_value),
-            )
-            return cur.fetchone()[0]
+    return _scope_metric("jhu_masters_cs", use_term_filter)
 
 # -----------------------------
 # 9. Count 2026 cohort acceptances for top PhD CS programs
@@ -263,33 +356,7 @@ def count_jhu_masters_cs(use_term_filter: bool):
 # -----------------------------
 def count_top_phd_acceptances_2026_raw_university(use_term_filter: bool):
     """Count accepted PhD CS applicants by raw university names in program."""
-    top_unis = [
-        "%Georgetown University%",
-        "%MIT%",
-        "%Stanford University%",
-        "%Carnegie Mellon University%",
-    ]
-    accept_pattern = "accept%"
-    cs_pattern = "%Computer Science%"
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} "
-                "  AND status ILIKE %s "
-                "  AND degree ILIKE %s "
-                "  AND llm_generated_program ILIKE %s "
-                "  AND program ILIKE ANY(%s) "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(
-                stmt,
-                (*params, accept_pattern, "%PhD%", cs_pattern, top_unis, limit_value),
-            )
-            return cur.fetchone()[0]
+    return _scope_metric("top_phd_acceptances_2026_raw", use_term_filter)
 
 # -----------------------------
 # 10. Count 2026 cohort acceptances for top PhD CS programs
@@ -297,121 +364,430 @@ def count_top_phd_acceptances_2026_raw_university(use_term_filter: bool):
 # -----------------------------
 def count_top_phd_acceptances_2026_llm(use_term_filter: bool):
     """Count accepted PhD CS applicants using LLM-normalized universities."""
-    top_unis = [
-        "Georgetown University",
-        "MIT",
-        "Stanford University",
-        "Carnegie Mellon University",
-    ]
-    accept_pattern = "accept%"
-    cs_pattern = "%Computer Science%"
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} "
-                "  AND status ILIKE %s "
-                "  AND degree ILIKE %s "
-                "  AND llm_generated_program ILIKE %s "
-                "  AND llm_generated_university = ANY(%s) "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(
-                stmt,
-                (*params, accept_pattern, "%PhD%", cs_pattern, top_unis, limit_value),
-            )
-            return cur.fetchone()[0]
+    return _scope_metric("top_phd_acceptances_2026_llm", use_term_filter)
 
 # -----------------------------
 # 11. Additional example queries
 # -----------------------------
 def additional_question_1(use_term_filter: bool):
     """Percent of applicants who reported a GPA."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants WHERE {clause} LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            total = cur.fetchone()[0]
-            stmt = sql.SQL(
-                "SELECT COUNT(*) FROM applicants "
-                "WHERE {clause} AND gpa IS NOT NULL "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            with_gpa = cur.fetchone()[0]
-            return round((with_gpa / total) * 100, 2) if total else 0.0
+    return _scope_metric("additional_question_1", use_term_filter)
 
 def additional_question_2(use_term_filter: bool):
     """Average GRE Quant for international applicants."""
-    clause, params = _term_filter(use_term_filter)
-    clause_sql = sql.SQL(clause)
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT AVG(gre)::numeric(5,2) "
-                "FROM applicants "
-                "WHERE {clause} "
-                "  AND us_or_international NOT IN ('American','Other') "
-                "  AND gre IS NOT NULL "
-                "LIMIT {limit}"
-            ).format(clause=clause_sql, limit=sql.Placeholder())
-            cur.execute(stmt, params + [limit_value])
-            result = cur.fetchone()[0]
-            return float(result) if result else None
+    return _scope_metric("additional_question_2", use_term_filter)
+
+
+def _latest_id_query():
+    stmt = sql.SQL(
+        "SELECT MAX(result_id) FROM applicants LIMIT {limit}"
+    ).format(limit=sql.Placeholder())
+    return stmt, [_clamp_limit(None)]
 
 
 def get_latest_db_id():
     """Return the highest GradCafe result ID stored in the database."""
     with get_connection() as conn:
         with conn.cursor() as cur:
-            limit_value = _clamp_limit(None)
-            stmt = sql.SQL(
-                "SELECT MAX(SUBSTRING(url FROM '/(\\d+)$')::int) "
-                "FROM applicants WHERE url ~ '/\\d+$' "
-                "LIMIT {limit}"
-            ).format(limit=sql.Placeholder())
-            cur.execute(stmt, [limit_value])
+            cur.execute(*_latest_id_query())
             value = cur.fetchone()[0]
             return int(value) if value is not None else None
 
 
-def build_analysis_results():
-    """Return the analysis dict used by the Module 3 dashboard."""
+def metric_statements():
+    """Return {label: (statement, params)} for the SQL behind the dashboard.
+
+    Covers the full two-scope scan, each wrapper's subset query per scope
+    and the latest-ID lookup; used by query_cli --explain.
+    """
+    statements = {"all_metrics": _metrics_query(tuple(SCOPES))[:2]}
+    for metric, (names, _) in METRICS.items():
+        for scope in SCOPES:
+            statements[f"{metric}[{scope}]"] = _metrics_query((scope,), names)[:2]
+    statements["latest_db_id"] = _latest_id_query()
+    return statements
+
+
+def explain_statement(stmt, params):
+    """Run ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``; return the plan dict."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") + stmt, params)
+            return cur.fetchone()[0][0]
+
+
+def _summary_rows(cur, lock=False):
+    """Return (published {scope: primitives} or None, age in seconds).
+
+    A summary missing a scope or written for a different PRIMITIVES list
+    counts as unpublished. ``lock`` takes the rows FOR UPDATE, serialising
+    refreshes with concurrent deltas.
+    """
+    stmt = sql.SQL(
+        "SELECT scope, primitives, EXTRACT(EPOCH FROM NOW() - refreshed_at) "
+        "FROM analytics_summary ORDER BY scope LIMIT {limit}" + (" FOR UPDATE" if lock else "")
+    ).format(limit=sql.Placeholder())
+    cur.execute(stmt, [_clamp_limit(len(SCOPES))])
+    rows = cur.fetchall()
+    published = {scope: primitives for scope, primitives, _ in rows}
+    names = {primitive[0] for primitive in PRIMITIVES}
+    if any(set(published.get(scope, ())) != names for scope in SCOPES):
+        return None, None
+    return published, max(float(age) for _, _, age in rows)
+
+
+def _merge(total, delta):
+    """Add a delta primitive to a published one (SUM over no rows is NULL)."""
+    if total is None:
+        return delta
+    if delta is None:
+        return total
+    return total + delta
+
+
+def apply_analytics_delta(conn, p_ids):
+    """Fold newly inserted rows into the published summary.
+
+    Runs on the inserting connection so the rows and the summary change in
+    one transaction. Costs one aggregate over ``p_ids`` rather than over
+    applicants. Returns False when there is no summary to update yet (the
+    next reconcile publishes one).
+    """
+    if not p_ids:
+        return False
+    with conn.transaction():
+        with conn.cursor() as cur:
+            published, _ = _summary_rows(cur, lock=True)
+            if published is None:
+                return False
+            delta = _run_primitives(cur, p_ids=p_ids)
+            for scope, values in delta.items():
+                merged = {
+                    name: _merge(published[scope][name], value) for name, value in values.items()
+                }
+                cur.execute(
+                    "UPDATE analytics_summary SET primitives = %s, updated_at = NOW() "
+                    "WHERE scope = %s",
+                    (Jsonb(merged), scope),
+                )
+    return True
+
+
+def refresh_analytics_summary():
+    """Recompute primitives from applicants and publish them; return results.
+
+    ``refreshed_at`` records this full recompute; deltas leave it unchanged.
+    ``updated_at`` moves on both.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            # Lock first: a delta that commits while we scan would be lost.
+            _summary_rows(cur, lock=True)
+            primitives = _run_primitives(cur)
+            for scope, values in primitives.items():
+                cur.execute(
+                    "INSERT INTO analytics_summary (scope, primitives, refreshed_at, updated_at) "
+                    "VALUES (%s, %s, NOW(), NOW()) "
+                    "ON CONFLICT (scope) DO UPDATE "
+                    "SET primitives = EXCLUDED.primitives, refreshed_at = EXCLUDED.refreshed_at, "
+                    "updated_at = EXCLUDED.updated_at",
+                    (scope, Jsonb(values)),
+                )
+    return assemble_results(primitives)
+
+
+def read_analytics_summary():
+    """Return published {scope: primitives}, or None if not yet refreshed."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            return _summary_rows(cur)[0]
+
+
+def reconcile_analytics_summary(max_age=None):
+    """Return ``(results, refreshed)``, recomputing if the summary is missing or stale.
+
+    ``max_age`` defaults to ANALYTICS_RECONCILE_SECONDS. Between reconciles
+    the summary is kept current by apply_analytics_delta, so this is
+    normally a single read. ``refreshed`` is True when the full recompute ran.
+    """
+    max_age = ANALYTICS_RECONCILE_SECONDS if max_age is None else max_age
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            published, age = _summary_rows(cur)
+    if published is None or age >= max_age:
+        return refresh_analytics_summary(), True
+    return assemble_results(published), False
+
+
+def build_analysis_results(backend=None):
+    """Return the analysis dict used by the Module 3 dashboard.
+
+    With the default ``"sql"`` backend this reads the published summary; the
+    first call on a fresh database computes and publishes it. ``"numpy"``
+    evaluates the metrics over the in-memory columnar snapshot instead.
+    ``backend`` defaults to ANALYTICS_BACKEND.
+    """
+    backend = backend or ANALYTICS_BACKEND
+    if backend == "numpy":
+        # Resolved at call time: columnar imports this module and NumPy is
+        # only needed when the backend is selected.
+        columnar = import_module("M3_material.columnar")
+        return assemble_results(columnar.get_snapshot().primitives())
+    if backend != "sql":
+        raise ValueError(f"Unknown analytics backend: {backend!r}")
+    primitives = read_analytics_summary()
+    if primitives is None:
+        return refresh_analytics_summary()
+    return assemble_results(primitives)
+
+
+# -----------------------------
+# Cohort comparisons
+# -----------------------------
+# A cohort is (term, year): entries for that term added in the year, plus
+# acceptances notified in the year, like the default (FALL_TERM, 2026).
+DEFAULT_COHORT = (FALL_TERM, int(YEAR_START[:4]))
+_COHORT_CACHE: dict = {}
+
+
+def data_version():
+    """Return a cheap token that changes whenever the analysed data may have.
+
+    (highest p_id, last analytics_summary change), in one round trip of two
+    index or tiny-table lookups. Any insert raises the first. Pull batches,
+    refreshes and a bulk import (which clears the summary) move the second.
+    Pull heartbeats do not touch either, so a running pull does not make
+    every page view look stale.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            stmt = sql.SQL(
+                "SELECT (SELECT MAX(p_id) FROM applicants), "
+                "(SELECT MAX(updated_at) FROM analytics_summary) LIMIT {limit}"
+            ).format(limit=sql.Placeholder())
+            cur.execute(stmt, [_clamp_limit(None)])
+            return tuple(cur.fetchone())
+
+
+def _cohort_query(terms, years):
+    """Build the GROUPING SETS query behind fetch_cohort_primitives.
+
+    Rows are grouped by (term, year added, year an acceptance was notified);
+    keys outside the requested terms/years collapse to NULL so the number of
+    groups stays bounded. The groups are disjoint, so any cohort is the sum
+    of its matching groups, and the empty grouping set is the all-time row.
+    """
+    select, params, columns = _select_columns(("all_time",), None)
+    keyed = (
+        "SELECT *, "
+        "CASE WHEN lower(term) = ANY(%s) THEN lower(term) END AS term_key, "
+        "CASE WHEN EXTRACT(YEAR FROM date_added)::int = ANY(%s) "
+        "THEN EXTRACT(YEAR FROM date_added)::int END AS added_year, "
+        "CASE WHEN status ILIKE %s "
+        "AND EXTRACT(YEAR FROM COALESCE(acceptance_date, date_added))::int = ANY(%s) "
+        "THEN EXTRACT(YEAR FROM COALESCE(acceptance_date, date_added))::int END "
+        "AS notified_year, TRUE AS in_cohort FROM applicants"
+    )
+    keys = "term_key, added_year, notified_year"
+    stmt = sql.SQL(
+        f"SELECT GROUPING({keys}) = 0, {keys}, " + ", ".join(select)
+        + f" FROM ({keyed}) AS scoped GROUP BY GROUPING SETS (({keys}), ()) LIMIT {{limit}}"
+    ).format(limit=sql.Placeholder())
+    # (terms + NULL) x (years + NULL)^2 groups, plus the all-time row.
+    limit = (len(terms) + 1) * (len(years) + 1) ** 2 + 1
+    keyed_params = [terms, years, ACCEPT_PATTERN, years]
+    return stmt, params + keyed_params + [limit], [name for _, name in columns]
+
+
+def _empty_primitives():
+    """Primitives of an empty row set: counts are 0, sums are NULL."""
     return {
-        "total_applicants": count_total_applicants(),
-        "year_2026": {
-            "fall_2026_count": count_fall_2026_entries(True),
-            "percent_international": percent_international_students(True),
-            "average_metrics": average_metrics_all_applicants(True),
-            "avg_gpa_american_fall_2026": avg_gpa_american_fall_2026(True),
-            "acceptance_rate_fall_2026": acceptance_rate_fall_2026(True),
-            "avg_gpa_acceptances_fall_2026": avg_gpa_acceptances_fall_2026(True),
-            "jhu_masters_cs": count_jhu_masters_cs(True),
-            "top_phd_acceptances_2026_raw": count_top_phd_acceptances_2026_raw_university(True),
-            "top_phd_acceptances_2026_llm": count_top_phd_acceptances_2026_llm(True),
-            "additional_question_1": additional_question_1(True),
-            "additional_question_2": additional_question_2(True),
+        name: 0 if aggregate.startswith("COUNT") else None
+        for name, aggregate, _, _ in PRIMITIVES
+    }
+
+
+def _sum_cohort_groups(cohorts, rows, names):
+    """Add each grouped row into every cohort it belongs to."""
+    result = {cohort: _empty_primitives() for cohort in cohorts}
+    result["all_time"] = _empty_primitives()
+    for is_group, term_key, added_year, notified_year, *values in rows:
+        group = dict(zip(names, values))
+        if not is_group:
+            result["all_time"] = group
+            continue
+        for term, year in cohorts:
+            if (term_key == term.lower() and added_year == year) or notified_year == year:
+                result[(term, year)] = {
+                    name: _merge(result[(term, year)][name], value)
+                    for name, value in group.items()
+                }
+    return result
+
+
+def fetch_cohort_primitives(cohorts):
+    """Return {cohort: primitives} for each (term, year), plus "all_time".
+
+    All cohorts come from one grouped scan of applicants.
+    """
+    cohorts = [(term, int(year)) for term, year in cohorts]
+    terms = sorted({term.lower() for term, _ in cohorts})
+    years = sorted({year for _, year in cohorts})
+    stmt, params, names = _cohort_query(terms, years)
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(stmt, params)
+            rows = cur.fetchall()
+    return _sum_cohort_groups(cohorts, rows, names)
+
+
+def cohort_results(cohorts=(DEFAULT_COHORT,)):
+    """Return {(term, year): metrics} for any list of cohorts.
+
+    Results are cached per cohort and data_version(), so repeated
+    comparisons cost one cheap version query until new rows arrive; any
+    uncached cohorts are computed together in one grouped scan.
+    """
+    version = data_version()
+    cohorts = [(term, int(year)) for term, year in cohorts]
+    missing = [cohort for cohort in cohorts if (version, cohort) not in _COHORT_CACHE]
+    if missing:
+        fetched = fetch_cohort_primitives(missing)
+        # Entries for older versions can never be served again.
+        for key in [key for key in _COHORT_CACHE if key[0] != version]:
+            del _COHORT_CACHE[key]
+        for cohort in missing:
+            _COHORT_CACHE[(version, cohort)] = _finish_scope(fetched[cohort])
+    return {cohort: _COHORT_CACHE[(version, cohort)] for cohort in cohorts}
+
+
+# -----------------------------
+# Score distributions
+# -----------------------------
+# Score column -> (label, histogram low, histogram high, bucket count).
+DISTRIBUTION_COLUMNS = {
+    "gpa": ("GPA", 0.0, 4.0, 8),
+    "gre": ("GRE Quant", 130.0, 170.0, 8),
+    "gre_v": ("GRE Verbal", 130.0, 170.0, 8),
+    "gre_aw": ("GRE Analytical Writing", 0.0, 6.0, 6),
+}
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+# Status group -> ILIKE pattern; anything else, NULL included, is "other".
+STATUS_GROUPS = {"accepted": ACCEPT_PATTERN, "rejected": "reject%", "waitlisted": "wait%"}
+
+
+def _distribution_query():
+    """Build the grouped scan behind fetch_distributions.
+
+    Each score gets a bucket number from ``width_bucket`` (0 below the
+    range, n + 1 above it; the range maximum joins the top bucket), then
+    every group counts its rows per bucket and takes ``percentile_cont`` over
+    all PERCENTILES at once. GROUPING SETS produce all-time, per-status,
+    cohort and cohort-per-status rows from the same scan.
+    """
+    cohort_clause, cohort_params = _term_filter(True)
+    keyed = [f"COALESCE({cohort_clause}, FALSE) AS in_cohort"]
+    keyed_params = list(cohort_params)
+    keyed.append(
+        "CASE "
+        + " ".join("WHEN status ILIKE %s THEN %s" for _ in STATUS_GROUPS)
+        + " ELSE 'other' END AS status_key"
+    )
+    for key, pattern in STATUS_GROUPS.items():
+        keyed_params += [pattern, key]
+    select, params = [], []
+    for column, (_, low, high, buckets) in DISTRIBUTION_COLUMNS.items():
+        keyed.append(
+            f"{column}, CASE WHEN {column} = %s THEN %s "
+            f"ELSE width_bucket({column}, %s, %s, %s) END AS {column}_bucket"
+        )
+        keyed_params += [high, buckets, low, high, buckets]
+        select.append(f"COUNT({column})")
+        select.append(f"percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY {column})")
+        params.append(list(PERCENTILES))
+        select.extend(
+            f"COUNT(*) FILTER (WHERE {column}_bucket = {bucket})"
+            for bucket in range(buckets + 2)
+        )
+    stmt = sql.SQL(
+        "SELECT GROUPING(in_cohort), in_cohort, GROUPING(status_key), status_key, "
+        + ", ".join(select)
+        + " FROM (SELECT " + ", ".join(keyed) + " FROM applicants) AS scoped "
+        "GROUP BY GROUPING SETS ((), (status_key), (in_cohort), (in_cohort, status_key)) "
+        "LIMIT {limit}"
+    ).format(limit=sql.Placeholder())
+    # One all-time row, two cohort-flag rows, and each of those per status.
+    limit = 3 * (len(STATUS_GROUPS) + 2)
+    return stmt, params + keyed_params + [limit]
+
+
+def _distribution(column, values):
+    """Shape one column's (count, percentiles, bucket counts) for display."""
+    label, low, high, buckets = DISTRIBUTION_COLUMNS[column]
+    count, percentiles, *bucket_counts = values
+    percentiles = percentiles or [None] * len(PERCENTILES)
+    width = (high - low) / buckets
+    return {
+        "label": label,
+        "n": count,
+        "percentiles": {
+            f"p{round(fraction * 100)}": None if value is None else round(value, 2)
+            for fraction, value in zip(PERCENTILES, percentiles)
         },
-        "all_time": {
-            "total_entries": count_total_applicants(),
-            "percent_international": percent_international_students(False),
-            "average_metrics": average_metrics_all_applicants(False),
-            "avg_gpa_american_fall_2026": avg_gpa_american_fall_2026(False),
-            "acceptance_rate_fall_2026": acceptance_rate_fall_2026(False),
-            "avg_gpa_acceptances_fall_2026": avg_gpa_acceptances_fall_2026(False),
-            "jhu_masters_cs": count_jhu_masters_cs(False),
-            "top_phd_acceptances_2026_raw": count_top_phd_acceptances_2026_raw_university(False),
-            "top_phd_acceptances_2026_llm": count_top_phd_acceptances_2026_llm(False),
-            "additional_question_1": additional_question_1(False),
-            "additional_question_2": additional_question_2(False),
+        "histogram": {
+            "edges": [round(low + width * step, 2) for step in range(buckets + 1)],
+            "counts": bucket_counts[1:-1],
+            "below": bucket_counts[0],
+            "above": bucket_counts[-1],
         },
     }
+
+
+def _group_distributions(values):
+    """Split one grouped row's aggregates into {column: distribution}."""
+    result = {}
+    offset = 0
+    for column, (_, _, _, buckets) in DISTRIBUTION_COLUMNS.items():
+        width = buckets + 4
+        result[column] = _distribution(column, values[offset:offset + width])
+        offset += width
+    return result
+
+
+def _empty_distributions():
+    """Distributions of an empty row set."""
+    return _group_distributions(
+        [
+            value
+            for _, _, _, buckets in DISTRIBUTION_COLUMNS.values()
+            for value in [0, None] + [0] * (buckets + 2)
+        ]
+    )
+
+
+def fetch_distributions():
+    """Return score histograms and percentiles, per scope and per status.
+
+    Shape: ``{scope: {"all": {column: dist}, "by_status": {status: {column:
+    dist}}}}`` for "year_2026" and "all_time", where ``dist`` holds ``n``,
+    ``percentiles`` (p10..p90) and ``histogram`` (bucket ``edges`` and
+    ``counts``, plus out-of-range ``below``/``above``). One grouped scan.
+    """
+    stmt, params = _distribution_query()
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(stmt, params)
+            rows = cur.fetchall()
+    result = {scope: {"all": _empty_distributions(), "by_status": {}} for scope in SCOPES}
+    for all_rows, in_cohort, all_statuses, status_key, *values in rows:
+        if all_rows:
+            scope = "all_time"
+        elif in_cohort:
+            scope = "year_2026"
+        else:
+            continue
+        if all_statuses:
+            result[scope]["all"] = _group_distributions(values)
+        else:
+            result[scope]["by_status"][status_key] = _group_distributions(values)
+    return result
@@ -232,6 +232,26 @@ def generate_pdf_report(results, path):
     lines.extend(_wrap(f"Avg GRE (International): {all_results.get('additional_question_2')}"))
     lines.append("")
 
+    distributions = results.get("distributions") or {}
+    for scope, scope_label in (("year_2026", "2026 Cohort"), ("all_time", "All Entries")):
+        dist = distributions.get(scope)
+        if not dist:
+            continue
+        section(f"Score Distributions ({scope_label})")
+        for metric in dist["all"].values():
+            pct = ", ".join(f"{k.upper()} {v}" for k, v in metric["percentiles"].items())
+            lines.extend(_wrap(f"{metric['label']} (n={metric['n']}): {pct}"))
+            hist = metric["histogram"]
+            buckets = ", ".join(
+                f"{hist['edges'][i]}-{hist['edges'][i + 1]}: {count}"
+                for i, count in enumerate(hist["counts"])
+            )
+            lines.extend(_wrap(f"  Histogram: {buckets}; below {hist['below']}, above {hist['above']}"))
+        for status_key, by_column in sorted(dist["by_status"].items()):
+            medians = ", ".join(f"{m['label']} {m['percentiles'].get('p50')}" for m in by_column.values())
+            lines.extend(_wrap(f"  Median ({status_key}): {medians}"))
+        lines.append("")
+
     section("Query Descriptions")
     queries = [
         {
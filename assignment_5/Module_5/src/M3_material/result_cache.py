@@ -0,0 +1,98 @@
+"""
+Analysis result cache keyed on a data-version token.
+
+Results are stored on disk (``analysis_cache.json``) together with the
+token of the data they were computed from. A lookup only hits when the
+stored token equals the current one, so a pull that inserts rows
+invalidates the cache without anyone deleting the file.
+
+An in-process tier keeps the parsed file keyed by its inode, mtime and
+size. A read costs one ``stat``, and the file is only parsed again after
+another writer (such as a different worker process) replaced it. Writes
+go to a temporary file that replaces the target in one ``os.replace``, so
+readers never see a half-written file. If a file still fails to parse,
+the last good copy is served instead of forcing a recompute.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+
+# Re-exported: the writers live in the db layer so loaders can use them too.
+from db.atomic_io import atomic_write_json, atomic_write_text  # pylint: disable=unused-import
+
+# path -> (file signature, parsed payload)
+_FILES: dict = {}
+_FILES_LOCK = threading.Lock()
+
+
+def normalize_version(version):
+    """Return ``version`` as it reads back from JSON (tuples become lists)."""
+    return json.loads(json.dumps(version, default=str))
+
+
+def _signature(stat_result):
+    return (stat_result.st_dev, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _valid(data) -> bool:
+    return isinstance(data, dict) and "year_2026" in data and "all_time" in data
+
+
+def _load(path: str):
+    """Return the parsed cache file, reusing the in-process copy if unchanged."""
+    try:
+        signature = _signature(os.stat(path))
+    except OSError:
+        return None
+    with _FILES_LOCK:
+        cached = _FILES.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as file_handle:
+            data = json.load(file_handle)
+    except OSError:
+        return None
+    except json.JSONDecodeError:
+        # Torn or foreign write: keep serving the last good results.
+        return cached[1] if cached is not None else None
+    if not _valid(data):
+        return None
+    with _FILES_LOCK:
+        _FILES[path] = (signature, data)
+    return data
+
+
+def read(path: str, version=None):
+    """Return cached results computed for ``version``, or None.
+
+    With ``version=None`` (token unavailable) any valid cached results are
+    returned, as before versioning.
+    """
+    data = _load(path)
+    if data is None:
+        return None
+    if version is not None:
+        if (data.get("_meta") or {}).get("data_version") != normalize_version(version):
+            return None
+    return data
+
+
+def write(path: str, results: dict, version=None) -> dict:
+    """Persist ``results`` for ``version``; return the stored payload."""
+    payload = dict(results)
+    payload["_meta"] = {"updated_at": time.time(), "data_version": normalize_version(version)}
+    stat_result = atomic_write_json(path, payload)
+    with _FILES_LOCK:
+        _FILES[path] = (_signature(stat_result), payload)
+    return payload
+
+
+def clear() -> None:
+    """Drop the in-process tier (the disk file is left alone)."""
+    with _FILES_LOCK:
+        _FILES.clear()
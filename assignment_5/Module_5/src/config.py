@@ -23,3 +23,35 @@ LLM_PORT = int(os.getenv("LLM_PORT", "8000"))
 LLM_HOST_URL = os.getenv("LLM_HOST_URL", f"http://{LLM_HOST}:{LLM_PORT}/standardize")
 LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
 LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+# The web app probes the LLM's /status in the background every
+# LLM_STATUS_INTERVAL seconds (backing off up to LLM_STATUS_MAX_BACKOFF while
+# it is down) and trusts a "ready" answer for LLM_STATUS_TTL seconds.
+LLM_STATUS_INTERVAL = float(os.getenv("LLM_STATUS_INTERVAL", "5"))
+LLM_STATUS_TTL = float(os.getenv("LLM_STATUS_TTL", "15"))
+LLM_STATUS_MAX_BACKOFF = float(os.getenv("LLM_STATUS_MAX_BACKOFF", "60"))
+
+# Web configuration
+# The dashboard reuses its page-context snapshot (and rendered HTML) until a
+# pull or analysis event, or at most this many seconds, so changes made by
+# another worker process show up within the TTL.
+PAGE_SNAPSHOT_TTL = float(os.getenv("PAGE_SNAPSHOT_TTL", "30"))
+# Page views reuse the pull state (running, finished notice waiting) for this
+# many seconds instead of querying pull_jobs on every view.
+PULL_STATE_TTL = float(os.getenv("PULL_STATE_TTL", "2"))
+# run.py serves the app on WEB_HOST:WEB_PORT with WEB_WORKERS forked worker
+# processes (WEB_THREADS request threads each under gunicorn). WEB_SERVER
+# picks the server: "auto" (gunicorn if installed, else the built-in
+# prefork), "gunicorn", "prefork" or "threaded" (one process).
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8080"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1)))
+WEB_THREADS = int(os.getenv("WEB_THREADS", "8"))
+WEB_SERVER = os.getenv("WEB_SERVER", "auto")
+
+# Analytics configuration
+# Pulls fold new rows into analytics_summary incrementally; a full recompute
+# (reconcile) runs when the last one is older than this many seconds.
+ANALYTICS_RECONCILE_SECONDS = int(os.getenv("ANALYTICS_RECONCILE_SECONDS", "86400"))
+# "sql" reads the published summary; "numpy" uses the in-memory columnar
+# snapshot (M3_material/columnar.py).
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "sql")
@@ -0,0 +1,44 @@
+"""
+Atomic file writes shared by the loaders, the pull and the web cache.
+
+A write goes to a temporary file in the target's directory and replaces
+the target with one ``os.replace``, so readers see either the old file or
+the new one, never a partial write.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_text(path: str, text: str):
+    """Write ``text`` to ``path`` via a temp file and an atomic rename.
+
+    Returns the ``os.stat_result`` of the written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file_handle:
+            file_handle.write(text)
+            file_handle.flush()
+            # The rename keeps the inode and mtime, so this is the target's stat.
+            stat_result = os.fstat(file_handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return stat_result
+
+
+def atomic_write_json(path: str, payload, indent=None):
+    """Write JSON atomically; compact unless ``indent`` is given."""
+    separators = None if indent is not None else (",", ":")
+    text = json.dumps(payload, indent=indent, separators=separators, default=str)
+    return atomic_write_text(path, text)
@@ -8,20 +8,24 @@ Uses normalize.py for all field mapping and cleanup.
 
 from __future__ import annotations
 
-import json
+import hashlib
 import os
 
 import psycopg
 from psycopg import sql
 
 try:
+    from .atomic_io import atomic_write_json
     from .db_config import get_db_config
     from .migrate import migrate
-    from .normalize import load_records, normalize_records
+    from .normalize import load_jsonl_tail, load_records, normalize_records
+    from .pool import connection
 except ImportError:  # fallback when run as a script
+    from atomic_io import atomic_write_json
     from db_config import get_db_config
     from migrate import migrate
-    from normalize import load_records, normalize_records
+    from normalize import load_jsonl_tail, load_records, normalize_records
+    from pool import connection
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DEFAULT_PATH = os.path.join(BASE_DIR, "M3_material", "data", "extra_llm_applicant_data.json")
@@ -29,6 +33,7 @@ LAST_ENTRIES_PATH = os.path.join(BASE_DIR, "db", "last_100_entries.json")
 ANALYSIS_CACHE_PATH = os.path.join(BASE_DIR, "db", "analysis_cache.json")
 REPORT_PATH = os.path.join(BASE_DIR, "static", "reports", "module_3_report.pdf")
 MAX_LIMIT = 100
+HASH_CHUNK_SIZE = 1024 * 1024
 _BASE_SEEDED = False
 
 COLUMNS = [
@@ -72,11 +77,93 @@ def _clamp_limit(value: int | None, default: int = 100) -> int:
     return limit_value
 
 
+def _hash_source(path: str, prefix_size: int | None = None) -> tuple[str, str | None]:
+    """Return the SHA-256 of a file and, optionally, of its first prefix_size bytes."""
+    digest = hashlib.sha256()
+    prefix_hash = None
+    with open(path, "rb") as file_handle:
+        if prefix_size is not None:
+            remaining = prefix_size
+            while remaining > 0:
+                chunk = file_handle.read(min(HASH_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+            # hexdigest() does not finalize, so hashing continues past the prefix.
+            prefix_hash = digest.hexdigest()
+        for chunk in iter(lambda: file_handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), prefix_hash
+
+
+def _read_seed_fingerprint(cur, source: str) -> dict | None:
+    """Return the stored fingerprint for a seed source, if any."""
+    cur.execute(
+        "SELECT size_bytes, mtime, content_hash, row_count "
+        "FROM seed_fingerprints WHERE source = %s",
+        (source,),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {
+        "size_bytes": row[0],
+        "mtime": row[1],
+        "content_hash": row[2],
+        "row_count": row[3],
+    }
+
+
+def _write_seed_fingerprint(cur, source: str, fingerprint: dict) -> None:
+    """Insert or replace the fingerprint for a seed source."""
+    cur.execute(
+        """
+        INSERT INTO seed_fingerprints (source, size_bytes, mtime, content_hash, row_count)
+        VALUES (%(source)s, %(size_bytes)s, %(mtime)s, %(content_hash)s, %(row_count)s)
+        ON CONFLICT (source) DO UPDATE
+           SET size_bytes = EXCLUDED.size_bytes,
+               mtime = EXCLUDED.mtime,
+               content_hash = EXCLUDED.content_hash,
+               row_count = EXCLUDED.row_count,
+               updated_at = NOW()
+        """,
+        {"source": source, **fingerprint},
+    )
+
+
+def _load_seed_records(path: str, size: int, previous: dict | None):
+    """
+    Return (raw records to insert, content hash, total row count).
+
+    Unchanged content yields no records, and a file whose old bytes are
+    intact only has its appended JSONL tail loaded.
+    """
+    grown = previous is not None and size > previous["size_bytes"]
+    content_hash, prefix_hash = _hash_source(
+        path, previous["size_bytes"] if grown else None
+    )
+    if previous is not None and content_hash == previous["content_hash"]:
+        return [], content_hash, previous["row_count"]
+    if grown and prefix_hash == previous["content_hash"]:
+        try:
+            tail = load_jsonl_tail(path, previous["size_bytes"])
+            return tail, content_hash, previous["row_count"] + len(tail)
+        except ValueError:
+            # Not a clean JSONL append (e.g. a JSON array); reload the file.
+            pass
+    records = load_records(path)
+    return records, content_hash, len(records)
+
+
 def seed_base_dataset(path: str = DEFAULT_PATH) -> int:
     """
     Ensure the base JSON/JSONL dataset is loaded into the applicants table.
 
-    This is idempotent: rows with duplicate URLs are ignored via ON CONFLICT.
+    A fingerprint (size, mtime, content hash, row count) of the source is
+    stored in seed_fingerprints so unchanged files are skipped without being
+    read, and grown files only load their appended records. Inserts remain
+    idempotent via ON CONFLICT.
     """
     global _BASE_SEEDED
     if _BASE_SEEDED:
@@ -86,16 +173,41 @@ def seed_base_dataset(path: str = DEFAULT_PATH) -> int:
     if not os.path.exists(path):
         return 0
 
-    records = normalize_records(load_records(path))
-    # Skip records without a URL to avoid duplicate NULL entries.
-    records = [r for r in records if r.get("url")]
-    if not records:
-        _BASE_SEEDED = True
-        return 0
-
-    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+    source = os.path.abspath(path)
+    stat = os.stat(path)
+    with connection(autocommit=True) as conn:
         with conn.cursor() as cur:
-            cur.executemany(INSERT_SQL, records)
+            previous = _read_seed_fingerprint(cur, source)
+            if previous is not None:
+                cur.execute("SELECT EXISTS (SELECT 1 FROM applicants)")
+                if not cur.fetchone()[0]:
+                    # The table was emptied since the last seed; start over.
+                    previous = None
+            if (
+                previous is not None
+                and previous["size_bytes"] == stat.st_size
+                and previous["mtime"] == stat.st_mtime
+            ):
+                _BASE_SEEDED = True
+                return 0
+
+            raw, content_hash, row_count = _load_seed_records(path, stat.st_size, previous)
+            # Skip records without a URL to avoid duplicate NULL entries.
+            records = [r for r in normalize_records(raw) if r.get("url")]
+            # Commit rows and fingerprint together so a failed load is retried.
+            with conn.transaction():
+                if records:
+                    cur.executemany(INSERT_SQL, records)
+                _write_seed_fingerprint(
+                    cur,
+                    source,
+                    {
+                        "size_bytes": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "content_hash": content_hash,
+                        "row_count": row_count,
+                    },
+                )
 
     _BASE_SEEDED = True
     return len(records)
@@ -107,11 +219,12 @@ def ensure_table() -> None:
 
 
 def recreate_table(conn) -> None:
-    """Drop and recreate the applicants table and migration table."""
+    """Drop and recreate the applicants, seed fingerprint and migration tables."""
     with conn.cursor() as cur:
         cur.execute("DROP TABLE IF EXISTS applicants")
+        cur.execute("DROP TABLE IF EXISTS seed_fingerprints")
         cur.execute("DROP TABLE IF EXISTS schema_migrations")
-    migrate()
+    migrate(force=True)
 
 
 def insert_records(conn, records: list[dict]) -> None:
@@ -128,9 +241,19 @@ def write_last_entries(conn, path, limit=100) -> None:
         rows = cur.fetchall()
         columns = [desc[0] for desc in cur.description]
     entries = [dict(zip(columns, row)) for row in rows]
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as file_handle:
-        json.dump(entries, file_handle, indent=2, default=str)
+    atomic_write_json(path, entries, indent=2)
+
+
+def clear_analytics_summary(conn) -> None:
+    """Unpublish the dashboard's analytics summary after a bulk import.
+
+    The summary is rebuilt by the web layer (M3_material.query_data): the
+    next dashboard read finds no summary and recomputes it from applicants.
+    ``--recreate`` keeps the analytics_summary table, so its old rows must
+    go too.
+    """
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM analytics_summary")
 
 
 def invalidate_analysis_cache() -> None:
@@ -158,6 +281,7 @@ def main(path=DEFAULT_PATH, recreate=False) -> None:
             ensure_table()
         insert_records(conn, normalized)
         write_last_entries(conn, LAST_ENTRIES_PATH)
+        clear_analytics_summary(conn)
 
     invalidate_analysis_cache()
     print(f"Import complete. Processed {len(normalized)} records.")
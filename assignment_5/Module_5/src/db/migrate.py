@@ -3,48 +3,130 @@ Simple migration runner for Module 3.
 
 Applies SQL files in db/migrations/ in sorted order, recording them in the
 schema_migrations table so they are only applied once.
+
+Each file runs in its own transaction under a session advisory lock, so a
+failing file leaves no partial schema behind and concurrent starters apply
+it exactly once. Applied files are checksummed; editing one after it has
+been applied is reported instead of silently ignored. Once the schema is
+known to be current, later calls in the same process return immediately.
 """
 
 from __future__ import annotations
 
 import glob
+import hashlib
 import os
 
 import psycopg
 
 try:
-    from .db_config import get_db_config
+    from .pool import connection
 except ImportError:  # fallback when run as a script
-    from db_config import get_db_config
+    from pool import connection
 
 MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_ID = 5_310_031
+_SCHEMA_CURRENT = False
 
 
-def migrate() -> None:
-    """Apply migrations in order and record them in schema_migrations."""
-    os.makedirs(MIGRATIONS_DIR, exist_ok=True)
-    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
-        with conn.cursor() as cur:
+def _load_migrations() -> list[tuple[str, str, str]]:
+    """Return (filename, sql, sha256) for each migration file in order."""
+    migrations = []
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+        with open(path, "rb") as file_handle:
+            data = file_handle.read()
+        migrations.append(
+            (os.path.basename(path), data.decode("utf-8"), hashlib.sha256(data).hexdigest())
+        )
+    return migrations
+
+
+def _applied_checksums(cur) -> dict[str, str | None] | None:
+    """Return {filename: checksum} in one query, or None if not bootstrapped."""
+    try:
+        cur.execute("SELECT filename, checksum FROM schema_migrations")
+    except (psycopg.errors.UndefinedTable, psycopg.errors.UndefinedColumn):
+        return None
+    return dict(cur.fetchall())
+
+
+def _pending(migrations, applied):
+    """Return migrations not yet applied, raising on checksum drift."""
+    pending = []
+    for filename, body, checksum in migrations:
+        if filename not in applied:
+            pending.append((filename, body, checksum))
+        elif applied[filename] not in (None, checksum):
+            raise RuntimeError(
+                f"Migration {filename} changed after it was applied "
+                "(checksum mismatch); add a new migration instead of editing it."
+            )
+    return pending
+
+
+def _needs_lock(migrations, applied) -> bool:
+    """Return True when anything must be written to schema_migrations."""
+    if applied is None or _pending(migrations, applied):
+        return True
+    return any(applied.get(filename, "") is None for filename, _, _ in migrations)
+
+
+def _bootstrap(cur) -> None:
+    """Create or upgrade the schema_migrations bookkeeping table."""
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "filename TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT NOW()"
+        ")"
+    )
+    cur.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS checksum TEXT")
+
+
+def _apply_locked(conn, cur, migrations) -> None:
+    """Apply pending migrations; the caller holds the advisory lock."""
+    applied = _applied_checksums(cur)
+    if applied is None:
+        _bootstrap(cur)
+        applied = _applied_checksums(cur)
+
+    # Rows recorded before checksums existed adopt the current file contents.
+    for filename, _, checksum in migrations:
+        if filename in applied and applied[filename] is None:
+            cur.execute(
+                "UPDATE schema_migrations SET checksum = %s WHERE filename = %s",
+                (checksum, filename),
+            )
+            applied[filename] = checksum
+
+    for filename, body, checksum in _pending(migrations, applied):
+        with conn.transaction():
+            if body.strip():
+                cur.execute(body)
             cur.execute(
-                "CREATE TABLE IF NOT EXISTS schema_migrations ("
-                "filename TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT NOW()"
-                ")"
+                "INSERT INTO schema_migrations (filename, checksum) VALUES (%s, %s)",
+                (filename, checksum),
             )
 
-            for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
-                filename = os.path.basename(path)
-                cur.execute(
-                    "SELECT 1 FROM schema_migrations WHERE filename = %s LIMIT 1",
-                    (filename,),
-                )
-                if cur.fetchone():
-                    continue
-
-                with open(path, "r", encoding="utf-8") as file_handle:
-                    sql = file_handle.read()
-                if sql.strip():
-                    cur.execute(sql)
-                cur.execute(
-                    "INSERT INTO schema_migrations (filename) VALUES (%s)",
-                    (filename,),
-                )
+
+def migrate(force: bool = False) -> None:
+    """Apply pending migrations in order and record them in schema_migrations.
+
+    ``force`` skips the per-process "schema current" fast path; use it after
+    dropping tables out from under the runner.
+    """
+    global _SCHEMA_CURRENT  # pylint: disable=global-statement
+    if _SCHEMA_CURRENT and not force:
+        return
+
+    os.makedirs(MIGRATIONS_DIR, exist_ok=True)
+    migrations = _load_migrations()
+    with connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            applied = _applied_checksums(cur)
+            if _needs_lock(migrations, applied):
+                cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+                try:
+                    _apply_locked(conn, cur, migrations)
+                finally:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+    _SCHEMA_CURRENT = True
@@ -0,0 +1,12 @@
+-- Track the source files loaded by seed_base_dataset.
+-- A matching fingerprint lets the seed skip re-reading and re-inserting
+-- an unchanged file; a grown file only has its appended tail loaded.
+
+CREATE TABLE IF NOT EXISTS seed_fingerprints (
+    source TEXT PRIMARY KEY,
+    size_bytes BIGINT NOT NULL,
+    mtime DOUBLE PRECISION NOT NULL,
+    content_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
@@ -0,0 +1,15 @@
+-- Numeric GradCafe result ID derived from the URL.
+-- A stored generated column is backfilled for existing rows when added and
+-- kept current on every insert; the btree index turns "latest ID" and
+-- ID-window lookups into index probes instead of regex scans over url.
+-- IDs longer than nine digits stay NULL rather than overflowing INTEGER.
+
+ALTER TABLE applicants
+    ADD COLUMN IF NOT EXISTS result_id INTEGER
+    GENERATED ALWAYS AS (
+        CASE
+            WHEN url ~ '/\d{1,9}$' THEN SUBSTRING(url FROM '/(\d+)$')::int
+        END
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_applicants_result_id ON applicants (result_id);
@@ -0,0 +1,36 @@
+-- Indexes for the analytics cohort and name-matching predicates.
+--
+-- The 2026 cohort (see M3_material/query_data._term_filter) is the OR of
+--   lower(term) = 'fall' AND date_added BETWEEN ...
+--   status ILIKE 'accept%' AND COALESCE(acceptance_date, date_added) BETWEEN ...
+-- Each branch gets its own index so the planner can BitmapOr them instead of
+-- scanning the whole table.
+
+CREATE INDEX IF NOT EXISTS idx_applicants_term_date_added
+    ON applicants (lower(term), date_added);
+
+CREATE INDEX IF NOT EXISTS idx_applicants_accepted_decision_date
+    ON applicants ((COALESCE(acceptance_date, date_added)))
+    WHERE status ILIKE 'accept%';
+
+-- Trigram GIN indexes serve the '%...%' ILIKE / ILIKE ANY matches on free-text
+-- program and university fields. pg_trgm is optional: servers without the
+-- extension (or without permission to create it) keep working unindexed.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_applicants_program_trgm
+            ON applicants USING gin (program gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_applicants_llm_university_trgm
+            ON applicants USING gin (llm_generated_university gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_applicants_llm_program_trgm
+            ON applicants USING gin (llm_generated_program gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm not available; skipping trigram indexes';
+    END IF;
+EXCEPTION
+    WHEN insufficient_privilege THEN
+        RAISE NOTICE 'cannot create pg_trgm; skipping trigram indexes';
+END
+$$;
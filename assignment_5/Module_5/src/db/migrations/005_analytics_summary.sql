@@ -0,0 +1,11 @@
+-- Published analytics primitives, one row per dashboard scope.
+-- Refreshed from applicants after each pull, import and Update Analysis
+-- (see M3_material/query_data.refresh_analytics_summary); page loads read
+-- these rows instead of scanning applicants. Refreshes are plain upserts,
+-- so readers keep seeing the previous row until the refresh commits.
+
+CREATE TABLE IF NOT EXISTS analytics_summary (
+    scope TEXT PRIMARY KEY,
+    primitives JSONB NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
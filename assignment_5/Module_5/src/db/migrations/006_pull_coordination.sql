@@ -0,0 +1,10 @@
+-- Pull coordination (see db/pull_jobs.py). The running pull holds a
+-- session advisory lock; pull_jobs carries the rest: updated_at is the
+-- pull's heartbeat, cancel_requested asks it to stop at the next page, and
+-- notified records that the dashboard has shown its final status.
+
+ALTER TABLE pull_jobs ADD COLUMN IF NOT EXISTS cancel_requested BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Pulls finished before this migration count as already shown.
+ALTER TABLE pull_jobs ADD COLUMN IF NOT EXISTS notified BOOLEAN NOT NULL DEFAULT TRUE;
+ALTER TABLE pull_jobs ALTER COLUMN notified SET DEFAULT FALSE;
@@ -0,0 +1,10 @@
+-- Drop the trigram GIN indexes added by 004_analytics_indexes.sql.
+--
+-- The dashboard matches names with ILIKE ANY(array) inside one full-table
+-- FILTER aggregate (or reads analytics_summary), and neither can use a GIN
+-- index, so these only slowed every insert. The pg_trgm extension is left
+-- installed; dropping it could break other users of the database.
+
+DROP INDEX IF EXISTS idx_applicants_program_trgm;
+DROP INDEX IF EXISTS idx_applicants_llm_university_trgm;
+DROP INDEX IF EXISTS idx_applicants_llm_program_trgm;
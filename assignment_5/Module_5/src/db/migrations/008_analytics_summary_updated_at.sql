@@ -0,0 +1,7 @@
+-- Record when each analytics_summary row last changed.
+--
+-- refreshed_at only moves on a full recompute. updated_at also moves when
+-- a pull batch folds its rows in (query_data.apply_analytics_delta), so
+-- data_version() can read it instead of counting applicants.
+
+ALTER TABLE analytics_summary ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
@@ -46,6 +46,20 @@ def load_records(path: str) -> list[dict]:
         return records
 
 
+def load_jsonl_tail(path: str, offset: int) -> list[dict]:
+    """Load JSONL records appended after a byte offset."""
+    with open(path, "rb") as file_handle:
+        file_handle.seek(offset)
+        data = file_handle.read()
+    records = []
+    for line in data.decode("utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        records.append(json.loads(line))
+    return records
+
+
 def clean_text(value: object) -> str | None:
     """Strip whitespace and NUL bytes from text fields."""
     if value is None:
@@ -0,0 +1,232 @@
+"""
+Process-wide PostgreSQL connection pool.
+
+Web, analytics and seeding helpers borrow connections from one pool instead
+of calling ``psycopg.connect`` per query. ``psycopg_pool`` is used when it is
+installed; otherwise a small thread-safe built-in pool provides the same
+``getconn``/``putconn``/``get_stats`` surface.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import psycopg
+
+try:
+    from .db_config import get_db_config
+except ImportError:  # fallback when run as a script
+    from db_config import get_db_config
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # optional dependency
+    ConnectionPool = None
+
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+_USAGE = {"checkouts": 0, "checkout_ms": 0.0, "checkout_max_ms": 0.0}
+
+
+class SimplePool:
+    """Minimal bounded pool used when psycopg_pool is not installed."""
+
+    def __init__(self, config: dict, max_size: int = POOL_MAX_SIZE, timeout: float = POOL_TIMEOUT):
+        self._config = config
+        self._max_size = max_size
+        self._timeout = timeout
+        self._idle: list[psycopg.Connection] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {"requests_num": 0, "requests_waiting": 0, "requests_wait_ms": 0.0}
+
+    @staticmethod
+    def check_connection(conn: psycopg.Connection) -> None:
+        """Raise if ``conn`` is unusable; mirrors ConnectionPool.check_connection."""
+        if conn.closed:
+            raise psycopg.OperationalError("connection is closed")
+        autocommit = conn.autocommit
+        conn.autocommit = True
+        try:
+            conn.execute("")
+        finally:
+            conn.autocommit = autocommit
+
+    def _reserve(self, deadline: float):
+        """Pop an idle connection, or return None after reserving a new slot."""
+        started = time.monotonic()
+        with self._cond:
+            self._stats["requests_waiting"] += 1
+            try:
+                while not self._idle and self._size >= self._max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError(
+                            f"no connection available after {self._timeout:.1f}s"
+                        )
+                if self._idle:
+                    return self._idle.pop()
+                self._size += 1
+                return None
+            finally:
+                self._stats["requests_waiting"] -= 1
+                self._stats["requests_wait_ms"] += (time.monotonic() - started) * 1000
+
+    def _discard(self, conn: psycopg.Connection | None) -> None:
+        """Free the slot held by ``conn`` (or by a failed connect)."""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    def getconn(self, timeout: float | None = None) -> psycopg.Connection:
+        """Borrow a live connection, opening one if under max_size.
+
+        Idle connections are checked before being handed out; dead ones (for
+        example after a server restart) are discarded and replaced.
+        """
+        deadline = time.monotonic() + (self._timeout if timeout is None else timeout)
+        with self._cond:
+            self._stats["requests_num"] += 1
+        while True:
+            conn = self._reserve(deadline)
+            if conn is None:
+                try:
+                    return psycopg.connect(**self._config)
+                except Exception:
+                    self._discard(None)
+                    raise
+            try:
+                self.check_connection(conn)
+            except psycopg.Error:
+                self._discard(conn)
+                continue
+            return conn
+
+    def putconn(self, conn: psycopg.Connection) -> None:
+        """Return a connection; broken or mid-transaction ones are discarded."""
+        reusable = not conn.closed and not conn.broken
+        if reusable and conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+            try:
+                conn.rollback()
+            except psycopg.Error:
+                reusable = False
+        with self._cond:
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not reusable:
+            conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self) -> dict:
+        """Return pool counters using psycopg_pool's key names."""
+        with self._cond:
+            return {
+                "pool_max": self._max_size,
+                "pool_size": self._size,
+                "pool_available": len(self._idle),
+                **self._stats,
+            }
+
+
+def _create_pool():
+    """Build the pool from get_db_config(), preferring psycopg_pool."""
+    config = dict(get_db_config())
+    if ConnectionPool is not None:
+        conninfo = config.pop("conninfo", "")
+        return ConnectionPool(
+            conninfo,
+            kwargs=config,
+            min_size=1,
+            max_size=POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+    return SimplePool(config)
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use (and after fork)."""
+    global _POOL, _POOL_PID  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = _create_pool()
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def close_pool() -> None:
+    """Close the process-wide pool; the next borrow opens a fresh one."""
+    global _POOL, _POOL_PID  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        pool, _POOL, _POOL_PID = _POOL, None, None
+    if pool is not None:
+        pool.close()
+
+
+class PooledConnection:
+    """Borrow a pooled connection for a ``with`` block.
+
+    The connection is checked out immediately, so connection errors surface
+    at the call site. Like ``psycopg.connect`` used as a context manager, the
+    block commits on success and rolls back on error; the connection is then
+    returned to the pool instead of being closed.
+    """
+
+    def __init__(self, autocommit: bool = False):
+        self._pool = get_pool()
+        self._conn = self._pool.getconn()
+        self._started = time.monotonic()
+        if self._conn.autocommit != autocommit:
+            self._conn.autocommit = autocommit
+
+    def __enter__(self) -> psycopg.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        conn = self._conn
+        try:
+            if not conn.closed and not conn.broken and not conn.autocommit:
+                if exc_type is None:
+                    conn.commit()
+                else:
+                    conn.rollback()
+        finally:
+            elapsed = (time.monotonic() - self._started) * 1000
+            with _POOL_LOCK:
+                _USAGE["checkouts"] += 1
+                _USAGE["checkout_ms"] += elapsed
+                _USAGE["checkout_max_ms"] = max(_USAGE["checkout_max_ms"], elapsed)
+            self._pool.putconn(conn)
+        return False
+
+
+def connection(autocommit: bool = False) -> PooledConnection:
+    """Borrow a connection from the process-wide pool."""
+    return PooledConnection(autocommit=autocommit)
+
+
+def get_stats() -> dict:
+    """Return pool size/wait counters plus checkout (hold) time totals."""
+    stats = dict(get_pool().get_stats())
+    with _POOL_LOCK:
+        stats.update(_USAGE)
+    return stats
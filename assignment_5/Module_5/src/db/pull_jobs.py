@@ -0,0 +1,185 @@
+"""
+Pull coordination through a PostgreSQL advisory lock and ``pull_jobs``.
+
+The pull process holds the session-level advisory lock ``PULL_LOCK_ID``
+for as long as it runs, so every web worker (on any host) asks the
+database whether a pull is running instead of trusting its own memory or
+a lock file. The lock goes away with the pull's connection, so a crashed
+pull never leaves a stale lock behind.
+
+Starting a pull is a claim: one transaction takes the same key as a
+transaction lock, checks that no other claim is still starting, and
+inserts a ``starting`` job row. The pull process then takes the session
+lock and moves the row to ``running``. Its progress updates refresh
+``updated_at`` (the heartbeat) and carry a cancel request back, and its
+final status is the "pull finished" notice the dashboard shows once.
+"""
+
+from __future__ import annotations
+
+import time
+
+# Arbitrary application-wide key for pg_advisory_lock (migrate.py uses 5_310_031).
+PULL_LOCK_ID = 5_310_032
+# How long a claimed job may stay "starting" before its process must hold the lock.
+START_GRACE_SECONDS = 30
+ACTIVE_STATUSES = ("starting", "running")
+
+# A bigint advisory key below 2**32 shows up as classid 0, objid = key, objsubid 1.
+_LOCK_HELD = """
+    EXISTS (
+        SELECT 1 FROM pg_locks
+         WHERE locktype = 'advisory'
+           AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+           AND classid = 0 AND objid = %(key)s AND objsubid = 1 AND granted
+    )
+"""
+_STARTING = """
+    EXISTS (
+        SELECT 1 FROM pull_jobs
+         WHERE status = 'starting'
+           AND started_at > NOW() - make_interval(secs => %(grace)s)
+    )
+"""
+
+
+def _params() -> dict:
+    return {"key": PULL_LOCK_ID, "grace": START_GRACE_SECONDS}
+
+
+def pull_running(conn) -> bool:
+    """Return True while a pull holds the lock or a fresh claim is starting."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {_LOCK_HELD} OR {_STARTING}", _params())
+        return bool(cur.fetchone()[0])
+
+
+def claim_pull(conn, target: int) -> int | None:
+    """Insert a ``starting`` job and return its id, or None if a pull is active."""
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (PULL_LOCK_ID,))
+            if not cur.fetchone()[0]:
+                return None
+            cur.execute(f"SELECT {_STARTING}", _params())
+            if cur.fetchone()[0]:
+                return None
+            # Nobody holds the lock, so any other active row is a pull that died.
+            cur.execute(
+                "UPDATE pull_jobs SET status = 'abandoned', notified = TRUE, updated_at = NOW() "
+                "WHERE status = ANY(%s)",
+                (list(ACTIVE_STATUSES),),
+            )
+            cur.execute(
+                "INSERT INTO pull_jobs (status, target) VALUES ('starting', %s) RETURNING id",
+                (target,),
+            )
+            return cur.fetchone()[0]
+
+
+def fail_claim(conn, job_id: int, error: str) -> None:
+    """Mark a claimed job as failed (its process never started)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "UPDATE pull_jobs SET status = 'error', error = %s, updated_at = NOW() WHERE id = %s",
+            (error, job_id),
+        )
+
+
+def acquire_pull_lock(conn, wait: float = 5.0, poll: float = 0.1) -> bool:
+    """Take the session lock for the pull on ``conn``, retrying for ``wait`` seconds.
+
+    A retry covers another worker's claim transaction briefly holding the key.
+    """
+    deadline = time.monotonic() + wait
+    with conn.cursor() as cur:
+        while True:
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (PULL_LOCK_ID,))
+            if cur.fetchone()[0]:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+
+
+def request_cancel(conn) -> bool:
+    """Ask the active pull to stop; return False when none is active."""
+    with conn.cursor() as cur:
+        # The redirect already tells the user, so the final status is not shown again.
+        cur.execute(
+            "UPDATE pull_jobs SET cancel_requested = TRUE, notified = TRUE "
+            "WHERE status = ANY(%s) RETURNING id",
+            (list(ACTIVE_STATUSES),),
+        )
+        return bool(cur.fetchall())
+
+
+_FINISHED = "NOT notified AND status <> ALL(%s)"
+
+
+def peek_finished(conn) -> str | None:
+    """Return the status of the newest finished pull not yet shown, if any."""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT status FROM pull_jobs WHERE {_FINISHED} ORDER BY id DESC LIMIT 1",
+            (list(ACTIVE_STATUSES),),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def take_finished(conn) -> dict | None:
+    """Mark finished pulls as shown and return the newest one's result.
+
+    Concurrent callers never both get the same pull: the second one's
+    UPDATE re-checks ``notified`` after the first commits.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            f"UPDATE pull_jobs SET notified = TRUE WHERE {_FINISHED} "
+            "RETURNING id, status, inserted, duplicates",
+            (list(ACTIVE_STATUSES),),
+        )
+        rows = cur.fetchall()
+    if not rows:
+        return None
+    _, status, inserted, duplicates = max(rows)
+    return {"status": status, "inserted": inserted, "duplicates": duplicates}
+
+
+def last_job(conn) -> dict | None:
+    """Return the most recently updated job for the dashboard."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT status, inserted, processed, updated_at, error
+            FROM pull_jobs
+            ORDER BY updated_at DESC
+            LIMIT 1
+            """
+        )
+        row = cur.fetchone()
+    if not row:
+        return None
+    return dict(zip(("status", "inserted", "processed", "updated_at", "error"), row))
+
+
+def read_progress(conn) -> dict | None:
+    """Return the newest job's counters in the pull progress format."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT status, inserted, duplicates, processed, target, last_attempted,
+                   EXTRACT(EPOCH FROM updated_at - started_at)::float8
+            FROM pull_jobs
+            ORDER BY id DESC
+            LIMIT 1
+            """
+        )
+        row = cur.fetchone()
+    if not row:
+        return None
+    keys = ("status", "inserted", "duplicates", "processed", "target", "last_attempted")
+    progress = dict(zip(keys, row))
+    progress["elapsed_seconds"] = int(row[6] or 0)
+    return progress
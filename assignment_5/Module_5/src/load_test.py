@@ -0,0 +1,126 @@
+"""
+Small HTTP load generator for measuring web throughput.
+
+Example:
+    python src/load_test.py http://127.0.0.1:8080/analysis -c 16 -d 10
+
+Each of ``concurrency`` threads keeps one HTTP/1.1 connection open and
+sends GET requests back to back for ``duration`` seconds. The report is
+requests per second plus latency percentiles, printed as JSON.
+
+A connection that cannot be opened counts as a connect error, and that
+client waits ``CONNECT_BACKOFF`` seconds (doubling up to
+``MAX_CONNECT_BACKOFF``) before trying again instead of spinning. Failures
+on an open connection count as errors and reconnect at once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+CONNECT_BACKOFF = 0.05
+MAX_CONNECT_BACKOFF = 1.0
+
+
+def _percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000, 2)
+
+
+def _client(url, deadline: float, timeout: float, results: dict, lock) -> None:
+    path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+    latencies, statuses, errors, connect_errors = [], Counter(), 0, 0
+    backoff = CONNECT_BACKOFF
+    conn = None
+    while time.monotonic() < deadline:
+        if conn is None:
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+            try:
+                conn.connect()
+            except OSError:
+                connect_errors += 1
+                conn.close()
+                conn = None
+                time.sleep(min(backoff, max(0.0, deadline - time.monotonic())))
+                backoff = min(backoff * 2, MAX_CONNECT_BACKOFF)
+                continue
+            backoff = CONNECT_BACKOFF
+        started = time.monotonic()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = None
+            continue
+        latencies.append(time.monotonic() - started)
+        statuses[response.status] += 1
+        if response.will_close:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["statuses"].update(statuses)
+        results["errors"] += errors
+        results["connect_errors"] += connect_errors
+
+
+def run_load(url: str, concurrency: int = 8, duration: float = 10.0, timeout: float = 10.0) -> dict:
+    """Load ``url`` from ``concurrency`` connections for ``duration`` seconds."""
+    parsed = urlsplit(url)
+    if parsed.scheme != "http" or not parsed.hostname:
+        raise ValueError(f"expected an http:// URL, got {url!r}")
+    results = {"latencies": [], "statuses": Counter(), "errors": 0, "connect_errors": 0}
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + duration
+    args = (parsed, deadline, timeout, results, lock)
+    threads = [
+        threading.Thread(target=_client, args=args, daemon=True) for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies = sorted(results["latencies"])
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": results["errors"],
+        "connect_errors": results["connect_errors"],
+        "statuses": {str(code): count for code, count in sorted(results["statuses"].items())},
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+def main(argv=None) -> None:
+    """Run the load test described by ``argv`` and print the JSON report."""
+    parser = argparse.ArgumentParser(description="Measure HTTP throughput of a running server.")
+    parser.add_argument("url")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run_load(args.url, args.concurrency, args.duration, args.timeout), indent=2))
+
+
+if __name__ == "__main__":
+    main()
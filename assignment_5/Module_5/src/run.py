@@ -3,24 +3,25 @@ Module 3 entry point for the Flask web app.
 
 Responsibilities:
 - Register Module 1 and Module 3 blueprints.
-- Auto-start the local LLM service (if not already running).
-- Wait for the LLM to become ready before serving pages.
+- Auto-start the local LLM service (if not already running) without waiting
+  for it; the dashboard reports LLM readiness from its background monitor.
+- Serve the app with the multi-worker production server (``serving.py``),
+  or with Flask's debug server and reloader when run with ``--dev``.
 """
 
 # pylint: disable=global-statement,consider-using-with
 
+import argparse
 import atexit
 import os
 import socket
 import subprocess
 import sys
-import time
-import urllib.error
-import urllib.request
 
 from flask import Flask
 
-from config import LLM_HOST, LLM_PORT
+import serving
+from config import LLM_HOST, LLM_PORT, WEB_HOST, WEB_PORT, WEB_SERVER, WEB_THREADS, WEB_WORKERS
 from M1_material.board import bp as m1_bp
 from M3_material.board import bp as m3_bp
 
@@ -38,6 +39,8 @@ app = create_app()
 
 # Keep a handle to the subprocess so we can shut it down cleanly.
 LLM_PROCESS = None
+# Only the process that launched the LLM stops it (not forked web workers).
+LLM_OWNER_PID = None
 
 
 def _is_port_open(host: str, port: int) -> bool:
@@ -51,7 +54,7 @@ def _is_port_open(host: str, port: int) -> bool:
 
 def _start_llm_server():
     """Start the local LLM service if it is not already running."""
-    global LLM_PROCESS
+    global LLM_PROCESS, LLM_OWNER_PID
     if _is_port_open(LLM_HOST, LLM_PORT):
         return
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -68,37 +71,41 @@ def _start_llm_server():
     log_file = open(log_path, "a", encoding="utf-8")
     # Launch the LLM server and write logs for troubleshooting.
     LLM_PROCESS = subprocess.Popen(cmd, cwd=llm_dir, env=env, stdout=log_file, stderr=log_file)
+    LLM_OWNER_PID = os.getpid()
     if LLM_PROCESS.poll() is not None:
         print("LLM server failed to start. Check llm_hosting/llm_server.log.")
 
 
-def _wait_for_llm_ready(timeout_seconds: int = 180) -> bool:
-    """Poll the LLM /ready endpoint until it reports healthy or we time out."""
-    url = f"http://{LLM_HOST}:{LLM_PORT}/ready"
-    deadline = time.time() + timeout_seconds
-    while time.time() < deadline:
-        try:
-            with urllib.request.urlopen(url, timeout=10) as resp:
-                if resp.status == 200:
-                    return True
-        except (urllib.error.URLError, ConnectionError):
-            time.sleep(1)
-    return False
-
-
 def _stop_llm_server():
     """Terminate the LLM subprocess on shutdown."""
-    if LLM_PROCESS and LLM_PROCESS.poll() is None:
+    if LLM_PROCESS and LLM_OWNER_PID == os.getpid() and LLM_PROCESS.poll() is None:
         LLM_PROCESS.terminate()
 
 
 atexit.register(_stop_llm_server)
 
+
+def main(argv=None) -> None:
+    """Start the LLM in the background and serve the app."""
+    parser = argparse.ArgumentParser(description="Run the GradCafe analytics web app.")
+    parser.add_argument("--dev", action="store_true",
+                        help="Run Flask's debug server with the reloader.")
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--threads", type=int, default=WEB_THREADS)
+    parser.add_argument("--server", choices=serving.SERVERS, default=WEB_SERVER)
+    args = parser.parse_args(argv)
+
+    if args.dev:
+        # Only auto-start the LLM once (in the reloader's child process).
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            _start_llm_server()
+        app.run(debug=True, host=args.host, port=args.port)
+        return
+    _start_llm_server()
+    serving.serve(app, args.host, args.port, args.workers, args.threads, args.server)
+
+
 if __name__ == "__main__":
-    # Only auto-start the LLM once (avoid double-start in Flask reload).
-    if os.environ.get("WERKZEUG_RUN_MAIN") == "true" or not app.debug:
-        _start_llm_server()
-        if not _wait_for_llm_ready():
-            print("LLM server did not become ready in time. Check llm_hosting/llm_server.log.")
-    # Run the Flask app.
-    app.run(debug=True, host="0.0.0.0", port=8080)
+    main()
@@ -0,0 +1,169 @@
+"""
+Production WSGI serving for the Flask app.
+
+``serve()`` runs the app in several forked worker processes. gunicorn is
+used when it is installed (``gthread`` workers). Otherwise a built-in
+prefork binds one listening socket, forks ``workers`` children that each
+serve it with a threaded Werkzeug server, and replaces any child that
+exits. Where ``os.fork`` is unavailable, or with one worker, a single
+threaded Werkzeug server runs in this process.
+
+Every worker calls ``init_worker()`` after the fork, so it opens its own
+pool connections and starts with empty caches instead of sharing sockets
+and state copied from the parent.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import time
+import traceback
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from db import pool
+from M3_material import columnar, result_cache
+from M3_material.board import pages
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # optional dependency
+    BaseApplication = None
+
+SERVERS = ("auto", "gunicorn", "prefork", "threaded")
+# Pause before replacing a worker that failed, so a broken start cannot spin.
+RESPAWN_DELAY = 1.0
+# Per-app caches and watcher threads built lazily by the Module 3 pages.
+_APP_EXTENSIONS = ("m3_page_cache", "m3_progress_watcher", "m3_pull_state")
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """Request handler without a log line per request (errors still log)."""
+
+    def log_request(self, code="-", size="-"):
+        pass
+
+
+def init_worker(app) -> None:
+    """Reset per-process state in a freshly started worker."""
+    # get_pool() sees the new pid and opens a pool for this worker; the
+    # parent's connections are left alone rather than closed from here.
+    pool.get_pool()
+    result_cache.clear()
+    columnar.reset_snapshot()
+    for name in _APP_EXTENSIONS:
+        app.extensions.pop(name, None)
+    # Start this worker's readiness probe now rather than on the first request.
+    pages.LLM_MONITOR.ready()
+
+
+def pick_server(name: str, workers: int) -> str:
+    """Resolve ``name`` ("auto" or a server from SERVERS) to the server to run."""
+    if name not in SERVERS:
+        raise ValueError(f"unknown server {name!r}; expected one of {', '.join(SERVERS)}")
+    if name == "gunicorn" and BaseApplication is None:
+        raise RuntimeError("gunicorn is not installed")
+    if name == "auto":
+        name = "gunicorn" if BaseApplication is not None else "prefork"
+    if name == "prefork" and (workers < 2 or not hasattr(os, "fork")):
+        name = "threaded"
+    return name
+
+
+def _run_gunicorn(app, host: str, port: int, workers: int, threads: int) -> None:
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "gthread",
+        "threads": threads,
+        "post_fork": lambda _server, _worker: init_worker(app),
+    }
+
+    class _Application(BaseApplication):  # pylint: disable=abstract-method
+        def load_config(self):
+            """Apply the serving options to gunicorn's config."""
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            """Return the WSGI app (already imported by the parent)."""
+            return app
+
+    _Application().run()
+
+
+def _run_threaded(app, host: str, port: int, fd: int | None = None) -> None:
+    server = make_server(host, port, app, threaded=True, request_handler=_QuietHandler, fd=fd)
+    server.serve_forever()
+
+
+def _worker_main(app, host: str, port: int, listener: socket.socket) -> None:
+    """Serve ``listener`` in a forked child; never returns."""
+    # The parent handles Ctrl-C and stops the children with SIGTERM.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        init_worker(app)
+        _run_threaded(app, host, port, fd=listener.fileno())
+    except BaseException:  # pylint: disable=broad-exception-caught
+        traceback.print_exc()
+        code = 1
+    finally:
+        # Skip atexit handlers and buffered state inherited from the parent.
+        os._exit(code)  # pylint: disable=protected-access
+
+
+def _run_prefork(app, host: str, port: int, workers: int) -> None:
+    listener = socket.create_server((host, port), backlog=1024)
+    children: set[int] = set()
+    state = {"stopping": False}
+
+    def _stop(_signum, _frame):
+        state["stopping"] = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    print(f"Serving on http://{host}:{port} with {workers} workers (prefork)")
+    try:
+        while True:
+            while not state["stopping"] and len(children) < workers:
+                pid = os.fork()
+                if pid == 0:
+                    _worker_main(app, host, port, listener)
+                children.add(pid)
+            if not children:
+                break
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            children.discard(pid)
+            if status and not state["stopping"]:
+                print(f"Worker {pid} exited with status {status}; starting a replacement.")
+                time.sleep(RESPAWN_DELAY)
+    finally:
+        listener.close()
+
+
+def serve(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    app, host: str, port: int, workers: int, threads: int = 8, server: str = "auto"
+) -> str:
+    """Serve ``app`` until stopped; return the name of the server that ran."""
+    name = pick_server(server, workers)
+    if name == "gunicorn":
+        _run_gunicorn(app, host, port, workers, threads)
+    elif name == "prefork":
+        _run_prefork(app, host, port, workers)
+    else:
+        init_worker(app)
+        print(f"Serving on http://{host}:{port} (threaded, one process)")
+        _run_threaded(app, host, port)
+    return name
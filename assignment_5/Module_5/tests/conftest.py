@@ -76,6 +76,7 @@ def _reset_db():
             # TRUNCATE removes all rows and resets primary key counters.
             cur.execute("TRUNCATE applicants RESTART IDENTITY")
             cur.execute("TRUNCATE pull_jobs RESTART IDENTITY")
+            cur.execute("TRUNCATE analytics_summary")
     yield
 
 
@@ -0,0 +1,60 @@
+"""
+Tests for the coalescing background worker in M3_material.background.
+"""
+
+import threading
+
+import pytest
+
+from M3_material.background import CoalescingWorker
+
+pytestmark = pytest.mark.analysis
+
+
+def test_requests_during_a_run_coalesce_into_one_follow_up():
+    worker = CoalescingWorker("test-worker")
+    release = threading.Event()
+    runs = []
+
+    def job():
+        runs.append(len(runs))
+        release.wait(5)
+
+    first = worker.submit(job)
+    assert first["state"] == "running" and first["pending"] is False
+    for _ in range(4):
+        status = worker.submit(job)
+    assert status["pending"] is True
+    assert status["coalesced"] == 3
+    release.set()
+    assert worker.wait(5)
+
+    status = worker.status()
+    assert runs == [0, 1]  # four clicks mid-run -> one follow-up run
+    assert status["state"] == "idle"
+    assert status["requested"] == 5
+    assert status["runs"] == 2
+    assert status["error"] is None
+    assert status["duration"] >= 0
+
+
+def test_failed_run_is_reported_and_worker_recovers():
+    worker = CoalescingWorker("test-worker")
+    worker.submit(lambda: 1 / 0)
+    assert worker.wait(5)
+    assert worker.status()["error"].startswith("ZeroDivisionError")
+
+    done = []
+    worker.submit(lambda: done.append(True))
+    assert worker.wait(5)
+    assert done == [True]
+    assert worker.status()["error"] is None
+
+
+def test_wait_times_out_while_running():
+    worker = CoalescingWorker("test-worker")
+    release = threading.Event()
+    worker.submit(lambda: release.wait(5))
+    assert worker.wait(0.01) is False
+    release.set()
+    assert worker.wait(5)
@@ -82,11 +82,18 @@ def test_import_extra_data_main_recreate(tmp_path, sample_record, monkeypatch):
 
     import_extra_data.main(path=str(data_path), recreate=True)
 
-    # Confirm rows are inserted after recreate.
+    # Confirm rows are inserted after recreate and the old summary is gone.
     with psycopg.connect(**get_db_config(), autocommit=True) as conn:
         with conn.cursor() as cur:
             cur.execute("SELECT COUNT(*) FROM applicants")
             assert cur.fetchone()[0] == 1
+            cur.execute("SELECT COUNT(*) FROM analytics_summary")
+            assert cur.fetchone()[0] == 0
+    # The next dashboard read republishes it from the imported rows.
+    from M3_material import query_data
+
+    assert query_data.build_analysis_results()["total_applicants"] == 1
+    assert query_data.read_analytics_summary()["all_time"]["total"] == 1
 
     assert not (tmp_path / "analysis_cache.json").exists()
     assert not (tmp_path / "report.pdf").exists()
@@ -113,6 +120,7 @@ def test_import_extra_data_main_non_recreate(tmp_path, sample_record, monkeypatc
             return False
 
     monkeypatch.setattr(import_extra_data.psycopg, "connect", lambda **kwargs: DummyConn())
+    monkeypatch.setattr(import_extra_data, "clear_analytics_summary", lambda conn: None)
 
     import_extra_data.main(path=str(data_path), recreate=False)
     assert called["count"] == 1
@@ -155,6 +163,9 @@ def test_import_extra_data_main_script_entry(monkeypatch, tmp_path, sample_recor
     fake_migrate.migrate = lambda: None
     fake_norm = types.ModuleType("normalize")
     fake_norm.load_records = lambda *_: []
+    fake_norm.load_jsonl_tail = lambda *_: []
+    fake_pool = types.ModuleType("pool")
+    fake_pool.connection = lambda **kwargs: None
     fake_norm.normalize_records = lambda records: records
 
     class DummyCursor:
@@ -191,8 +202,9 @@ def test_import_extra_data_main_script_entry(monkeypatch, tmp_path, sample_recor
     monkeypatch.setitem(sys.modules, "db_config", fake_db)
     monkeypatch.setitem(sys.modules, "migrate", fake_migrate)
     monkeypatch.setitem(sys.modules, "normalize", fake_norm)
+    monkeypatch.setitem(sys.modules, "pool", fake_pool)
+    monkeypatch.setitem(sys.modules, "atomic_io", __import__("db.atomic_io").atomic_io)
     monkeypatch.setitem(sys.modules, "psycopg", fake_psycopg)
-
     monkeypatch.setattr(sys, "argv", ["import_extra_data.py", "--path", str(data_path)])
     root = Path(__file__).resolve().parents[1]
     runpy.run_path(str(root / "src" / "db" / "import_extra_data.py"), run_name="__main__")
@@ -210,11 +222,16 @@ def test_import_extra_data_fallback_imports(monkeypatch):
     fake_migrate.migrate = lambda: None
     fake_norm = types.ModuleType("normalize")
     fake_norm.load_records = lambda *_: []
+    fake_norm.load_jsonl_tail = lambda *_: []
+    fake_pool = types.ModuleType("pool")
+    fake_pool.connection = lambda **kwargs: None
     fake_norm.normalize_records = lambda *_: []
 
     monkeypatch.setitem(sys.modules, "db_config", fake_db)
     monkeypatch.setitem(sys.modules, "migrate", fake_migrate)
     monkeypatch.setitem(sys.modules, "normalize", fake_norm)
+    monkeypatch.setitem(sys.modules, "pool", fake_pool)
+    monkeypatch.setitem(sys.modules, "atomic_io", __import__("db.atomic_io").atomic_io)
 
     root = Path(__file__).resolve().parents[1]
     runpy.run_path(str(root / "src" / "db" / "import_extra_data.py"), run_name="import_extra_data_test")
@@ -0,0 +1,73 @@
+"""
+Tests for the background LLM readiness monitor in M3_material.llm_monitor.
+"""
+
+import threading
+import time
+
+import pytest
+
+from M3_material.board import pages
+from M3_material.llm_monitor import ReadinessMonitor
+
+pytestmark = pytest.mark.web
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_ready_never_blocks_on_the_probe():
+    release = threading.Event()
+    monitor = ReadinessMonitor(lambda: release.wait(5), interval=0.01, ttl=5)
+    started = time.monotonic()
+    # The probe is stuck; the caller still gets an answer straight away.
+    assert monitor.ready() is False
+    assert time.monotonic() - started < 0.5
+    release.set()
+    _wait_until(monitor.ready)
+    assert monitor.status()["failures"] == 0
+    monitor.stop(5)
+
+
+def test_failures_back_off_and_recover():
+    answers = [False, False, RuntimeError("refused"), True]
+    calls = []
+
+    def probe():
+        calls.append(time.monotonic())
+        answer = answers[min(len(calls), len(answers)) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monitor = ReadinessMonitor(probe, interval=0.01, ttl=5, max_backoff=0.03)
+    assert [monitor.delay(n) for n in range(4)] == [0.01, 0.02, 0.03, 0.03]
+    monitor.ready()
+    _wait_until(monitor.ready)
+    assert len(calls) == 4
+    # Each wait after a failure is at least the backoff delay.
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+    assert gaps[0] >= 0.02 and gaps[1] >= 0.03
+    monitor.stop(5)
+    assert monitor.status()["failures"] == 0
+
+
+def test_stale_ready_answer_expires():
+    monitor = ReadinessMonitor(lambda: True, interval=10, ttl=0.05)
+    _wait_until(monitor.ready)
+    # The next probe is 10 s away, so the cached "ready" goes stale.
+    _wait_until(lambda: not monitor.ready())
+    assert monitor.status()["age"] > 0.05
+    monitor.stop(5)
+    assert ReadinessMonitor(lambda: True).status()["age"] is None
+
+
+def test_pages_read_readiness_from_monitor(app, monkeypatch):
+    app.config.pop("LLM_READY_CHECK", None)
+    monkeypatch.setattr(pages.LLM_MONITOR, "ready", lambda: True)
+    with app.app_context():
+        assert pages._llm_ready() is True
@@ -0,0 +1,127 @@
+"""
+Tests for the HTTP load generator (src/load_test.py).
+
+Requests go to a real threaded HTTP/1.1 server on an ephemeral port.
+"""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import load_test
+
+pytestmark = pytest.mark.web
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler: /close ends the connection, anything else keeps it."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        close = self.path.startswith("/close")
+        body = b"bye" if close else b"ok"
+        self.send_response(201 if close else 200)
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def test_run_load_reports_throughput(server_url):
+    report = load_test.run_load(f"{server_url}/ok?x=1", concurrency=2, duration=0.3)
+    assert report["requests"] > 0 and report["errors"] == report["connect_errors"] == 0
+    assert report["statuses"] == {"200": report["requests"]}
+    assert report["rps"] > 0
+    assert 0 < report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+
+    # Responses that close the connection make the client reconnect.
+    report = load_test.run_load(f"{server_url}/close", concurrency=1, duration=0.2)
+    assert report["requests"] > 1 and report["statuses"] == {"201": report["requests"]}
+
+
+def test_run_load_backs_off_when_connect_fails(monkeypatch):
+    # A fake clock that only sleeping advances.
+    now, sleeps = [0.0], []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(load_test.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(load_test.time, "sleep", _sleep)
+    monkeypatch.setattr(load_test, "MAX_CONNECT_BACKOFF", 0.2)
+    # Nothing listens on a port that was just released.
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        port = sock.getsockname()[1]
+    report = load_test.run_load(f"http://127.0.0.1:{port}", concurrency=1, duration=1.0, timeout=0.5)
+    assert report["requests"] == report["errors"] == 0
+    assert report["connect_errors"] == len(sleeps)
+    assert report["p50_ms"] is None
+    # The delay doubles up to the cap and never runs past the deadline.
+    assert sleeps == pytest.approx([0.05, 0.1, 0.2, 0.2, 0.2, 0.2, 0.05])
+
+
+class _DropHandler(BaseHTTPRequestHandler):
+    """Accepts the connection and closes it without answering."""
+
+    def handle(self):
+        pass
+
+
+def test_run_load_counts_request_errors():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DropHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        report = load_test.run_load(url, concurrency=1, duration=0.1, timeout=0.5)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(5)
+    assert report["requests"] == 0 and report["errors"] > 0
+    assert report["connect_errors"] == 0
+
+
+def test_run_load_rejects_other_urls():
+    with pytest.raises(ValueError):
+        load_test.run_load("https://example.com/")
+    with pytest.raises(ValueError):
+        load_test.run_load("not a url")
+
+
+def test_main_prints_json(server_url, capsys):
+    load_test.main([f"{server_url}/ok", "-c", "1", "-d", "0.1"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["concurrency"] == 1 and report["requests"] > 0
+
+
+def test_load_test_entrypoint(monkeypatch, server_url, capsys):
+    import runpy
+    import sys
+    from pathlib import Path
+
+    monkeypatch.setattr(sys, "argv", ["load_test.py", f"{server_url}/ok", "-d", "0.05"])
+    root = Path(__file__).resolve().parents[1]
+    runpy.run_path(str(root / "src" / "load_test.py"), run_name="__main__")
+    assert json.loads(capsys.readouterr().out)["url"].endswith("/ok")
@@ -4,10 +4,13 @@ Tests for db.migrate behavior.
 We drop the schema_migrations table to force migrations to re-run.
 """
 
+import threading
+
 import pytest
 from pathlib import Path
 import psycopg
 
+from db import migrate as migrate_mod
 from db.db_config import get_db_config
 from db.migrate import migrate
 
@@ -20,7 +23,7 @@ def test_migrate_reapplies_when_schema_table_missing():
         with conn.cursor() as cur:
             cur.execute("DROP TABLE IF EXISTS schema_migrations")
 
-    migrate()
+    migrate(force=True)
 
     # Verify the schema_migrations table exists after migration.
     with psycopg.connect(**get_db_config(), autocommit=True) as conn:
@@ -37,8 +40,8 @@ def test_migrate_fallback_imports(monkeypatch):
     import types
     import sys
 
-    fake_db = types.ModuleType("db_config")
-    fake_db.get_db_config = lambda: {}
+    fake_pool = types.ModuleType("pool")
+    fake_pool.connection = lambda **kwargs: None
     fake_psycopg = types.ModuleType("psycopg")
 
     class DummyConn:
@@ -58,8 +61,115 @@ def test_migrate_fallback_imports(monkeypatch):
             return False
 
     fake_psycopg.connect = lambda **kwargs: DummyConn()
-    monkeypatch.setitem(sys.modules, "db_config", fake_db)
+    monkeypatch.setitem(sys.modules, "pool", fake_pool)
     monkeypatch.setitem(sys.modules, "psycopg", fake_psycopg)
 
     root = Path(__file__).resolve().parents[1]
     runpy.run_path(str(root / "src" / "db" / "migrate.py"), run_name="migrate_test")
+
+
+def _applied():
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT filename, checksum FROM schema_migrations ORDER BY filename")
+            return cur.fetchall()
+
+
+def test_migrate_records_checksums():
+    migrate(force=True)
+    rows = _applied()
+    expected = [(name, checksum) for name, _, checksum in migrate_mod._load_migrations()]
+    assert rows == expected
+
+
+def test_migrate_leaves_no_trigram_indexes():
+    # 007 drops the GIN indexes 004 created; no dashboard query could use them.
+    migrate(force=True)
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT indexname FROM pg_indexes WHERE indexname LIKE '%%_trgm'")
+            assert cur.fetchall() == []
+
+
+def test_migrate_fast_path_skips_database(monkeypatch):
+    # Once the schema is current, migrate() must not even connect.
+    migrate()
+
+    def _fail(**_):
+        raise AssertionError("migrate() reconnected after schema was current")
+
+    monkeypatch.setattr(migrate_mod, "connection", _fail)
+    migrate()
+
+
+def test_migrate_rejects_edited_migration():
+    # A stored checksum that no longer matches the file is an error.
+    filename = migrate_mod._load_migrations()[0][0]
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE schema_migrations SET checksum = 'edited' WHERE filename = %s",
+                (filename,),
+            )
+    try:
+        with pytest.raises(RuntimeError, match="checksum mismatch"):
+            migrate(force=True)
+    finally:
+        with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE schema_migrations SET checksum = NULL WHERE filename = %s",
+                    (filename,),
+                )
+    # A NULL checksum (legacy row) is adopted from the current file.
+    migrate(force=True)
+    assert None not in dict(_applied()).values()
+
+
+def test_migrate_upgrades_table_without_checksum_column():
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("ALTER TABLE schema_migrations DROP COLUMN checksum")
+    migrate(force=True)
+    rows = _applied()
+    assert rows and all(checksum for _, checksum in rows)
+
+
+def test_migrate_rolls_back_failed_file(tmp_path, monkeypatch):
+    # A failing file leaves neither partial DDL nor a schema_migrations row.
+    (tmp_path / "999_broken.sql").write_text(
+        "CREATE TABLE migrate_probe (id INT);\nSELECT 1 / 0;\n"
+    )
+    monkeypatch.setattr(migrate_mod, "MIGRATIONS_DIR", str(tmp_path))
+    with pytest.raises(psycopg.errors.DivisionByZero):
+        migrate(force=True)
+
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('migrate_probe')")
+            assert cur.fetchone()[0] is None
+    assert "999_broken.sql" not in dict(_applied())
+
+
+def test_migrate_concurrent_starters_apply_once():
+    # Several processes starting on an empty database must not race.
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS schema_migrations")
+
+    errors = []
+
+    def _run():
+        try:
+            migrate(force=True)
+        except Exception as exc:  # pragma: no cover - surfaced by the assert below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(_applied()) == len(migrate_mod._load_migrations())
@@ -0,0 +1,96 @@
+"""
+Tests for the dashboard snapshot cache in M3_material.page_cache.
+"""
+
+import pytest
+
+from M3_material.page_cache import PageCache, TimedState
+
+pytestmark = pytest.mark.web
+
+
+def test_snapshot_is_built_once_until_invalidated():
+    cache = PageCache(ttl=60)
+    builds = []
+
+    def build():
+        builds.append(len(builds))
+        return {"n": len(builds)}
+
+    version, context = cache.snapshot(build)
+    assert cache.snapshot(build) == (version, context)
+    assert builds == [0]
+    cache.invalidate()
+    new_version, new_context = cache.snapshot(build)
+    assert new_version != version and new_context == {"n": 2}
+
+
+def test_snapshot_expires_after_ttl():
+    cache = PageCache(ttl=-1)
+    first, _ = cache.snapshot(dict)
+    second, _ = cache.snapshot(dict)
+    assert second == first + 1
+
+
+def test_invalidation_during_build_is_not_cached():
+    cache = PageCache(ttl=60)
+
+    def build():
+        cache.invalidate()
+        return {"racing": True}
+
+    assert cache.snapshot(build) == (None, {"racing": True})
+    renders = []
+    assert cache.render(None, "k", lambda: renders.append(1) or "page") == "page"
+    assert cache.render(None, "k", lambda: renders.append(1) or "page") == "page"
+    assert len(renders) == 2
+
+
+def test_pages_are_cached_per_key_and_snapshot():
+    cache = PageCache(ttl=60, max_pages=2)
+    version, _ = cache.snapshot(dict)
+    renders = []
+
+    def render(text):
+        def inner():
+            renders.append(text)
+            return text
+        return inner
+
+    assert cache.render(version, "a", render("a")) == "a"
+    assert cache.render(version, "a", render("a")) == "a"
+    assert cache.render(version, "b", render("b")) == "b"
+    assert cache.render(version, "a", render("a")) == "a"
+    # "b" is the least recently used page when "c" arrives.
+    cache.render(version, "c", render("c"))
+    cache.render(version, "b", render("b"))
+    assert renders == ["a", "b", "c", "b"]
+
+    # A page rendered from a snapshot that was replaced mid-render is not kept.
+    cache.invalidate()
+    assert cache.render(version, "a", render("a")) == "a"
+    assert renders[-1] == "a"
+
+
+def test_timed_state_loads_at_most_once_per_ttl():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"running": len(loads) == 1, "finished": False}
+
+    state = TimedState(load, ttl=60)
+    assert state.get() == ({"running": True, "finished": False}, True)
+    assert state.get() == ({"running": True, "finished": False}, False)
+    assert len(loads) == 1
+
+    state.update(finished=True)
+    assert state.get() == ({"running": True, "finished": True}, False)
+
+    state.expire()
+    state.update(finished=True)  # nothing held, nothing to change
+    assert state.get() == ({"running": False, "finished": False}, True)
+
+    state.ttl = -1
+    assert state.get()[1] is True
+    assert len(loads) == 3
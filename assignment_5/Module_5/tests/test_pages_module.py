@@ -6,6 +6,7 @@ execution fast and deterministic.
 """
 
 import json
+import threading
 import time
 import builtins
 
@@ -19,9 +20,6 @@ pytestmark = pytest.mark.web
 @pytest.fixture()
 def temp_paths(monkeypatch, tmp_path):
     # Redirect all file paths used by pages.py into a temp directory.
-    monkeypatch.setattr(pages, "LOCK_PATH", str(tmp_path / "pull.lock"))
-    monkeypatch.setattr(pages, "DONE_PATH", str(tmp_path / "pull.done"))
-    monkeypatch.setattr(pages, "PROGRESS_PATH", str(tmp_path / "progress.json"))
     monkeypatch.setattr(pages, "LATEST_SURVEY_PATH", str(tmp_path / "latest_survey_id.txt"))
     monkeypatch.setattr(pages, "ANALYSIS_CACHE_PATH", str(tmp_path / "analysis_cache.json"))
     monkeypatch.setattr(pages, "REPORT_PATH", str(tmp_path / "report.pdf"))
@@ -29,29 +27,6 @@ def temp_paths(monkeypatch, tmp_path):
     return tmp_path
 
 
-@pytest.fixture(autouse=True)
-def reset_pull_state():
-    # Ensure global pull state is clean across tests.
-    pages.PULL_PROCESS = None
-    pages.PULL_LAST_EXIT = None
-    yield
-    pages.PULL_PROCESS = None
-    pages.PULL_LAST_EXIT = None
-
-
-def test_pid_running_true_false(monkeypatch):
-    # Simulate a running PID with a no-op os.kill.
-    monkeypatch.setattr(pages.os, "kill", lambda pid, sig: None)
-    assert pages._pid_running(123) is True
-
-    # Simulate a missing PID by raising OSError.
-    def _raise(pid, sig):
-        raise OSError("not running")
-
-    monkeypatch.setattr(pages.os, "kill", _raise)
-    assert pages._pid_running(123) is False
-
-
 def test_llm_status_url_env_override(monkeypatch):
     # When LLM_HOST_URL is set, the status URL should be derived from it.
     monkeypatch.setenv("LLM_HOST_URL", "http://localhost:8000/standardize")
@@ -128,6 +103,95 @@ def test_compute_results_seeds_base_dataset(app, monkeypatch):
     assert "year_2026" in result
 
 
+def test_compute_results_reads_or_refreshes_summary(app, monkeypatch):
+    # Page loads read the published summary, Update Analysis reconciles it,
+    # and a seed that inserted rows forces a full recompute.
+    app.config.pop("COMPUTE_RESULTS", None)
+    app.config["COMPUTE_DISTRIBUTIONS"] = lambda: {}
+    monkeypatch.setattr(pages, "build_analysis_results", lambda: {"source": "read"})
+    monkeypatch.setattr(pages, "reconcile_analytics_summary", lambda: ({"source": "reconciled"}, False))
+    monkeypatch.setattr(pages, "refresh_analytics_summary", lambda: {"source": "refreshed"})
+    inserted = {"rows": 0}
+    monkeypatch.setattr(pages, "seed_base_dataset", lambda: inserted["rows"])
+
+    def source(**kwargs):
+        return pages._compute_results(**kwargs)["source"]
+
+    with app.app_context():
+        assert source() == "read"
+        assert source(refresh=True) == "reconciled"
+        app.config["TESTING"] = False
+        assert source() == "read"
+        inserted["rows"] = 3
+        assert source() == "refreshed"
+        assert source(refresh=True) == "refreshed"
+
+
+def test_compute_results_keeps_distributions_until_rows_change(app, monkeypatch):
+    from M3_material import query_data
+
+    app.config.pop("COMPUTE_RESULTS", None)
+    calls = []
+    app.config["COMPUTE_DISTRIBUTIONS"] = lambda: calls.append(1) or {"fresh": True}
+    empty = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    reconciled = {"refreshed": False}
+    monkeypatch.setattr(
+        pages, "reconcile_analytics_summary", lambda: (empty, reconciled["refreshed"])
+    )
+    previous = {**empty, "distributions": {"kept": True}, "_meta": {"updated_at": 1}}
+
+    with app.app_context():
+        # Reconcile changed nothing: the cached distributions are reused.
+        assert pages._compute_results(refresh=True, previous=previous)["distributions"] == {"kept": True}
+        assert calls == []
+        # Rows changed since the cached results were computed.
+        moved = {**previous, "total_applicants": 5}
+        assert pages._compute_results(refresh=True, previous=moved)["distributions"] == {"fresh": True}
+        # Reconcile ran the full recompute, or there is nothing cached yet.
+        reconciled["refreshed"] = True
+        assert pages._compute_results(refresh=True, previous=previous)["distributions"] == {"fresh": True}
+        assert pages._compute_results(refresh=True)["distributions"] == {"fresh": True}
+    assert len(calls) == 3
+
+
+def test_compute_results_adds_distributions(app, client, monkeypatch):
+    # Distributions ride along with the results (and so with the cache),
+    # and the dashboard renders them.
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    empty = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    dists = {
+        scope: {"all": query_data._empty_distributions(), "by_status": {}}
+        for scope in query_data.SCOPES
+    }
+    dists["all_time"]["all"]["gpa"]["histogram"]["above"] = 2
+    dists["all_time"]["by_status"]["accepted"] = query_data._empty_distributions()
+    calls = []
+    app.config["COMPUTE_RESULTS"] = lambda: empty
+    app.config["COMPUTE_DISTRIBUTIONS"] = lambda: calls.append(1) or dists
+    monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: None)
+    app.config["DATA_VERSION"] = lambda: (7, 7, None)
+
+    with app.app_context():
+        assert pages._compute_results()["distributions"] == dists
+    # Results that already carry distributions are left alone.
+    app.config["COMPUTE_RESULTS"] = lambda: {**empty, "distributions": dists}
+    with app.app_context():
+        pages._compute_results()
+    assert calls == [1]
+
+    html = client.get("/projects/module-3").get_data(as_text=True)
+    assert "Score Distributions (All Entries)" in html
+    assert "Out of range: 0 below, 2 above" in html
+    assert "Median GRE Quant" in html
+    result_cache.clear()
+
+
 def test_cache_helpers(temp_paths):
     # Write results to cache and read them back.
     results = {"year_2026": {}, "all_time": {}, "total_applicants": 1}
@@ -136,21 +200,54 @@ def test_cache_helpers(temp_paths):
     assert cached["total_applicants"] == 1
     assert "_meta" in cached
 
-    # Invalid JSON should return None.
+    # A torn write serves the last good copy; with none in memory it misses.
     bad_path = temp_paths / "analysis_cache.json"
     bad_path.write_text("not json")
+    assert pages._read_cached_results()["total_applicants"] == 1
+    pages.result_cache.clear()
     assert pages._read_cached_results() is None
 
 
-def test_read_progress_and_latest_survey(temp_paths):
-    # Progress file should load JSON when present.
-    progress_path = temp_paths / "progress.json"
-    progress_path.write_text(json.dumps({"processed": 1}))
-    assert pages._read_progress()["processed"] == 1
+def test_data_version_falls_back_to_none(app):
+    app.config["DATA_VERSION"] = lambda: (_ for _ in ()).throw(RuntimeError("db down"))
+    with app.app_context():
+        assert pages._data_version() is None
+    app.config["DATA_VERSION"] = lambda: (5, 2, None)
+    with app.app_context():
+        assert pages._data_version() == (5, 2, None)
+
+
+def test_module_3_project_recomputes_when_data_version_changes(app, client, monkeypatch):
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    computed = []
+    empty = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    app.config["COMPUTE_RESULTS"] = lambda: computed.append(1) or empty
+    monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: None)
+    version = {"token": (1, 1, None)}
+    app.config["DATA_VERSION"] = lambda: version["token"]
+
+    client.get("/projects/module-3")
+    client.get("/projects/module-3")
+    assert len(computed) == 1  # second load served from cache
+
+    # A pull inserted rows: the stored cache is stale and is recomputed.
+    version["token"] = (2, 2, None)
+    client.get("/projects/module-3")
+    assert len(computed) == 2
+    result_cache.clear()
 
-    # Invalid JSON should yield None.
-    progress_path.write_text("bad")
+
+def test_read_progress_and_latest_survey(temp_paths):
+    # Progress comes from the newest pull_jobs row.
     assert pages._read_progress() is None
+    _insert_job("running", inserted=2, processed=5, target=10)
+    progress = pages._read_progress()
+    assert progress["processed"] == 5 and progress["target"] == 10
+    assert progress["elapsed_seconds"] >= 0
 
     # Latest survey ID parsing.
     latest_path = temp_paths / "latest_survey_id.txt"
@@ -194,332 +291,125 @@ def test_read_last_pull_job_db(app):
 
 
 def test_read_last_pull_job_handles_error(monkeypatch):
-    # Force psycopg.connect to raise to hit the exception branch.
-    monkeypatch.setattr(pages.psycopg, "connect", lambda **k: (_ for _ in ()).throw(RuntimeError("fail")))
+    # Force the pool checkout to raise to hit the exception branch.
+    monkeypatch.setattr(pages, "connection", lambda **k: (_ for _ in ()).throw(RuntimeError("fail")))
     assert pages._read_last_pull_job() is None
 
 
-def test_is_pull_running_done_and_empty_lock(temp_paths):
-    # DONE_PATH present should clear the lock and return False.
-    lock_path = temp_paths / "pull.lock"
-    done_path = temp_paths / "pull.done"
-    lock_path.write_text("123")
-    done_path.write_text("done")
-
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
-
-    # Empty lock file should be removed and treated as not running.
-    lock_path.write_text("")
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
-
-
-def test_is_pull_running_done_remove_error(temp_paths, monkeypatch):
-    # If LOCK_PATH removal fails, _is_pull_running should still return False.
-    (temp_paths / "pull.done").write_text("done")
-    (temp_paths / "pull.lock").write_text("123")
-
-    def _raise(path):
-        raise OSError("nope")
-
-    monkeypatch.setattr(pages.os, "remove", _raise)
-    assert pages._is_pull_running() is False
-
-
-def test_is_pull_running_starting_age(temp_paths, monkeypatch):
-    # "starting" lock should be considered running if recent, otherwise removed.
-    lock_path = temp_paths / "pull.lock"
-    lock_path.write_text("starting")
-
-    # Recent lock => running True.
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: time.time())
-    assert pages._is_pull_running() is True
-
-    # Old lock => removed and False.
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: time.time() - 20)
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
-
+def _insert_job(status, notified=False, **fields):
+    from db.db_config import get_db_config
+    import psycopg
 
-def test_is_pull_running_pid_and_stale(temp_paths, monkeypatch):
-    # PID lock with non-running process should be removed.
-    lock_path = temp_paths / "pull.lock"
-    lock_path.write_text("123")
-    monkeypatch.setattr(pages, "_pid_running", lambda pid: False)
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
+    columns = {"status": status, "notified": notified, **fields}
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"INSERT INTO pull_jobs ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) RETURNING id",
+                list(columns.values()),
+            )
+            return cur.fetchone()[0]
 
-    # PID lock with running process but stale timestamp should be removed.
-    lock_path.write_text("123")
-    monkeypatch.setattr(pages, "_pid_running", lambda pid: True)
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: time.time() - (pages.LOCK_STALE_SECONDS + 1))
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
 
-    # Recent PID lock should be considered running.
-    lock_path.write_text("123")
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: time.time())
-    assert pages._is_pull_running() is True
+def _job(job_id):
+    from db.db_config import get_db_config
+    import psycopg
 
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT status, cancel_requested, notified, error FROM pull_jobs WHERE id = %s",
+                (job_id,),
+            )
+            return cur.fetchone()
 
-def test_is_pull_running_empty_lock(temp_paths):
-    # Empty lock content should be removed and return False.
-    lock_path = temp_paths / "pull.lock"
-    lock_path.write_text("")
-    assert pages._is_pull_running() is False
-    assert not lock_path.exists()
 
+def test_is_pull_running_follows_the_advisory_lock():
+    from db.db_config import get_db_config
+    from db.pull_jobs import PULL_LOCK_ID
+    import psycopg
 
-def test_is_pull_running_no_files(temp_paths):
-    # No DONE or LOCK files should return False (line 235).
-    assert not (temp_paths / "pull.done").exists()
-    assert not (temp_paths / "pull.lock").exists()
     assert pages._is_pull_running() is False
-
-
-def test_is_pull_running_lock_read_error(temp_paths, monkeypatch):
-    # If reading the lock file raises OSError, the function should proceed.
-    lock_path = temp_paths / "pull.lock"
-    lock_path.write_text("123")
-
-    def _raise(*args, **kwargs):
-        raise OSError("boom")
-
-    monkeypatch.setattr(builtins, "open", _raise)
-    # Also force getmtime to raise to hit the return True branch.
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: (_ for _ in ()).throw(OSError("fail")))
-    assert pages._is_pull_running() is True
-
-
-def test_is_pull_running_stale_remove_error(temp_paths, monkeypatch):
-    # If stale lock removal fails, return False anyway.
-    lock_path = temp_paths / "pull.lock"
-    lock_path.write_text("123")
-    monkeypatch.setattr(pages.os.path, "getmtime", lambda p: time.time() - (pages.LOCK_STALE_SECONDS + 1))
-
-    def _raise(path):
-        raise OSError("fail")
-
-    monkeypatch.setattr(pages.os, "remove", _raise)
+    # A pull process on any host holds the lock on its own connection.
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        conn.execute("SELECT pg_advisory_lock(%s)", (PULL_LOCK_ID,))
+        assert pages._is_pull_running() is True
+    # The lock goes away with the connection, even without an unlock.
     assert pages._is_pull_running() is False
 
 
-def test_is_pull_running_process_poll(monkeypatch):
-    # If a process is running (poll() is None), return True.
-    class DummyProc:
-        def poll(self):
-            return None
-
-    pages.PULL_PROCESS = DummyProc()
-    assert pages._is_pull_running() is True
-
-    # If process finished, PULL_LAST_EXIT should be set and return False.
-    class DoneProc:
-        returncode = 0
-
-        def poll(self):
-            return 0
-
-    pages.PULL_PROCESS = DoneProc()
+def test_is_pull_running_database_down(monkeypatch):
+    monkeypatch.setattr(pages, "connection", lambda **k: (_ for _ in ()).throw(RuntimeError("fail")))
     assert pages._is_pull_running() is False
-    assert pages.PULL_LAST_EXIT == 0
-
-
-def test_clear_pull_state_removes_files(temp_paths):
-    # Create fake running process that fails terminate -> kill.
-    calls = {"killed": 0}
-
-    class DummyProc:
-        def poll(self):
-            return None
-
-        def terminate(self):
-            raise RuntimeError("fail terminate")
-
-        def wait(self, timeout=None):
-            raise RuntimeError("fail wait")
-
-        def kill(self):
-            calls["killed"] += 1
-
-    pages.PULL_PROCESS = DummyProc()
-
-    # Create lock/progress/done files to verify cleanup.
-    (temp_paths / "pull.lock").write_text("123")
-    (temp_paths / "pull.done").write_text("done")
-    (temp_paths / "progress.json").write_text("{}")
-
-    pages._clear_pull_state()
-
-    assert calls["killed"] == 1
-    assert not (temp_paths / "pull.lock").exists()
-    assert not (temp_paths / "pull.done").exists()
-    assert not (temp_paths / "progress.json").exists()
-
-
-def test_clear_pull_state_success_path(temp_paths, monkeypatch):
-    # When terminate/wait succeed, no kill should occur.
-    calls = {"killed": 0}
-
-    class DummyProc:
-        def poll(self):
-            return None
-
-        def terminate(self):
-            pass
-
-        def wait(self, timeout=None):
-            pass
-
-        def kill(self):
-            calls["killed"] += 1
-
-    pages.PULL_PROCESS = DummyProc()
-
-    # Force os.remove to raise to cover the OSError branch in cleanup.
-    monkeypatch.setattr(pages.os, "remove", lambda p: (_ for _ in ()).throw(OSError("fail")))
-    (temp_paths / "pull.lock").write_text("123")
-    pages._clear_pull_state()
-    assert calls["killed"] == 0
-
-
-def test_clear_pull_state_kill_failure(monkeypatch):
-    # If kill itself fails, the exception should be swallowed.
-    class DummyProc:
-        def poll(self):
-            return None
-
-        def terminate(self):
-            raise RuntimeError("boom")
-
-        def wait(self, timeout=None):
-            raise RuntimeError("boom")
 
-        def kill(self):
-            raise RuntimeError("kill failed")
 
-    pages.PULL_PROCESS = DummyProc()
-    pages._clear_pull_state()
+def test_clear_pull_state_requests_cancel():
+    assert pages._clear_pull_state() is False
+    job_id = _insert_job("running")
+    assert pages._clear_pull_state() is True
+    status, cancel_requested, notified, _ = _job(job_id)
+    assert status == "running" and cancel_requested and notified
 
 
 def test_start_pull_success_and_failure(temp_paths, monkeypatch):
-    # Successful path should create a lock file with PID and return True.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
+    # A successful start claims a job row and hands its id to the subprocess.
     monkeypatch.setattr(pages, "_llm_ready", lambda: True)
+    launched = []
 
     class DummyProc:
-        def __init__(self):
-            self.pid = 999
+        pid = 999
 
-        def poll(self):
-            return None
+        def wait(self):
+            return 0
+
+    def _popen(args, **kwargs):
+        launched.append(args)
+        return DummyProc()
 
-    monkeypatch.setattr(pages.subprocess, "Popen", lambda *a, **k: DummyProc())
+    monkeypatch.setattr(pages.subprocess, "Popen", _popen)
 
     assert pages._start_pull() is True
-    assert (temp_paths / "pull.lock").read_text().strip() == "999"
+    job_id = int(launched[0][-1])
+    assert launched[0][-2] == "--job-id"
+    assert _job(job_id)[0] == "starting"
+    assert pages._is_pull_running() is True
+    # The fresh claim keeps a second start (from any worker) out.
+    assert pages._start_pull() is False
+    assert len(launched) == 1
 
-    # Failure path should remove the lock and return False.
-    (temp_paths / "pull.lock").write_text("starting")
+    # A failed launch marks its claim as an error so the next start can proceed.
+    pages._pull_jobs(lambda conn: conn.execute("UPDATE pull_jobs SET started_at = NOW() - INTERVAL '1 hour'"))
     monkeypatch.setattr(pages.subprocess, "Popen", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("boom")))
     assert pages._start_pull() is False
-    assert not (temp_paths / "pull.lock").exists()
+    status, _, _, error = _job(job_id + 1)
+    assert status == "error" and error == "boom"
+    # The stale "starting" row from the first claim was abandoned.
+    assert _job(job_id)[0] == "abandoned"
 
 
 def test_start_pull_busy_or_llm_not_ready(monkeypatch):
-    # If a pull is already running, start should return False.
-    monkeypatch.setattr(pages, "_pull_running", lambda: True)
-    assert pages._start_pull() is False
+    from db.db_config import get_db_config
+    from db.pull_jobs import PULL_LOCK_ID
+    import psycopg
 
+    monkeypatch.setattr(pages.subprocess, "Popen", lambda *a, **k: pytest.fail("must not start"))
     # If LLM not ready, start should return False.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
     monkeypatch.setattr(pages, "_llm_ready", lambda: False)
     assert pages._start_pull() is False
 
-
-def test_start_pull_lock_write_error(monkeypatch, tmp_path):
-    # Cover the lock write OSError branch.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
-    monkeypatch.setattr(pages, "_llm_ready", lambda: True)
-
-    log_dir = tmp_path / "logs"
-    lock_dir = tmp_path / "locks"
-    monkeypatch.setattr(pages, "LOG_PATH", str(log_dir / "pull.log"))
-    monkeypatch.setattr(pages, "LOCK_PATH", str(lock_dir / "pull.lock"))
-
-    real_makedirs = pages.os.makedirs
-
-    def _makedirs(path, exist_ok=False):
-        # Raise only for the lock directory to hit the except OSError branch.
-        if path == str(lock_dir):
-            raise OSError("fail")
-        return real_makedirs(path, exist_ok=exist_ok)
-
-    monkeypatch.setattr(pages.os, "makedirs", _makedirs)
-
-    class DummyProc:
-        def __init__(self):
-            self.pid = 111
-
-        def poll(self):
-            return None
-
-    monkeypatch.setattr(pages.subprocess, "Popen", lambda *a, **k: DummyProc())
-
-    # Even with a lock write error, the function should continue and start.
-    assert pages._start_pull() is True
-
-
-def test_start_pull_pid_write_error(monkeypatch, tmp_path):
-    # If writing the PID into the lock fails, the error should be swallowed.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
+    # If a pull already holds the lock, start should return False.
     monkeypatch.setattr(pages, "_llm_ready", lambda: True)
-
-    log_dir = tmp_path / "logs"
-    lock_dir = tmp_path / "locks"
-    monkeypatch.setattr(pages, "LOG_PATH", str(log_dir / "pull.log"))
-    monkeypatch.setattr(pages, "LOCK_PATH", str(lock_dir / "pull.lock"))
-
-    class DummyProc:
-        def __init__(self):
-            self.pid = 222
-
-        def poll(self):
-            return None
-
-    monkeypatch.setattr(pages.subprocess, "Popen", lambda *a, **k: DummyProc())
-
-    real_open = builtins.open
-    lock_writes = {"count": 0}
-
-    def _open(path, mode="r", *args, **kwargs):
-        if path == pages.LOCK_PATH and "w" in mode:
-            lock_writes["count"] += 1
-            if lock_writes["count"] > 1:
-                raise OSError("fail pid write")
-        return real_open(path, mode, *args, **kwargs)
-
-    monkeypatch.setattr(builtins, "open", _open)
-    assert pages._start_pull() is True
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        conn.execute("SELECT pg_advisory_lock(%s)", (PULL_LOCK_ID,))
+        assert pages._start_pull() is False
 
 
 def test_start_pull_log_write_error(monkeypatch, tmp_path):
     # If log_file.write fails, the exception path should be swallowed.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
     monkeypatch.setattr(pages, "_llm_ready", lambda: True)
 
     log_dir = tmp_path / "logs"
-    lock_dir = tmp_path / "locks"
     monkeypatch.setattr(pages, "LOG_PATH", str(log_dir / "pull.log"))
-    monkeypatch.setattr(pages, "LOCK_PATH", str(lock_dir / "pull.lock"))
-
-    class DummyProc:
-        def __init__(self):
-            self.pid = 333
-
-        def poll(self):
-            return None
 
     def _raise(*args, **kwargs):
         raise RuntimeError("boom")
@@ -544,29 +434,6 @@ def test_start_pull_log_write_error(monkeypatch, tmp_path):
     assert pages._start_pull() is False
 
 
-def test_start_pull_remove_lock_error(monkeypatch, tmp_path):
-    # If removing the lock fails in the exception branch, it should be swallowed.
-    monkeypatch.setattr(pages, "_pull_running", lambda: False)
-    monkeypatch.setattr(pages, "_llm_ready", lambda: True)
-
-    log_dir = tmp_path / "logs"
-    lock_dir = tmp_path / "locks"
-    monkeypatch.setattr(pages, "LOG_PATH", str(log_dir / "pull.log"))
-    monkeypatch.setattr(pages, "LOCK_PATH", str(lock_dir / "pull.lock"))
-
-    def _raise(*args, **kwargs):
-        raise RuntimeError("boom")
-
-    monkeypatch.setattr(pages.subprocess, "Popen", _raise)
-    monkeypatch.setattr(pages.os, "remove", lambda *_: (_ for _ in ()).throw(OSError("fail")))
-
-    # Create a lock file so the removal branch is exercised.
-    lock_dir.mkdir(parents=True, exist_ok=True)
-    (lock_dir / "pull.lock").write_text("starting")
-
-    assert pages._start_pull() is False
-
-
 def test_pull_data_api_paths(app, client, monkeypatch):
     # Busy => 409
     app.config["PULL_RUNNING_CHECK"] = lambda: True
@@ -652,8 +519,8 @@ def test_cancel_pull_routes(app, client, monkeypatch):
 
 
 def test_pull_status_endpoint(temp_paths, app, client, monkeypatch):
-    # Create done file to exercise done_status parsing.
-    (temp_paths / "pull.done").write_text("done")
+    # A finished pull that has not been shown yet reports done + status.
+    _insert_job("target_reached", inserted=3, processed=4, target=3)
 
     app.config["PULL_RUNNING_CHECK"] = lambda: False
     app.config["LLM_READY_CHECK"] = lambda: True
@@ -664,15 +531,8 @@ def test_pull_status_endpoint(temp_paths, app, client, monkeypatch):
     assert payload["running"] is False
     assert payload["llm_ready"] is True
     assert payload["done"] is True
-
-
-def test_pull_status_done_read_error(temp_paths, app, client, monkeypatch):
-    # If DONE_PATH exists but can't be read, status should fall back to "unknown".
-    (temp_paths / "pull.done").write_text("done")
-    monkeypatch.setattr(builtins, "open", lambda *a, **k: (_ for _ in ()).throw(OSError("fail")))
-    resp = client.get("/projects/module-3/pull-status")
-    assert resp.status_code == 200
-    assert resp.get_json()["status"] == "unknown"
+    assert payload["status"] == "target_reached"
+    assert payload["progress"]["inserted"] == 3
 
 
 def test_module_3_project_status_messages(app, client, temp_paths, monkeypatch):
@@ -706,48 +566,32 @@ def test_module_3_project_status_messages(app, client, temp_paths, monkeypatch):
             "additional_question_2": None,
         },
     }
-    monkeypatch.setattr(pages, "_read_cached_results", lambda: fake_results)
+    monkeypatch.setattr(pages, "_read_cached_results", lambda *_: fake_results)
     monkeypatch.setattr(pages, "_compute_results", lambda: fake_results)
-    monkeypatch.setattr(pages, "_write_cached_results", lambda results: None)
+    monkeypatch.setattr(pages, "_write_cached_results", lambda *_: None)
     monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: None)
     monkeypatch.setattr(pages, "get_latest_db_id", lambda: 1)
     monkeypatch.setattr(pages, "_read_latest_survey_id", lambda: 2)
     monkeypatch.setattr(pages, "_read_last_pull_job", lambda: None)
 
-    # DONE_PATH statuses should produce a banner message.
-    done_statuses = [
-        "target_reached",
-        "partial_new_entries",
-        "no_new_entries",
-        "no_more_entries",
-        "no_new_data",
-        "fetch_failed",
-        "timeout",
-        "error",
-        "something_else",
-    ]
-    for status in done_statuses:
-        (temp_paths / "pull.done").write_text(json.dumps({"status": status, "inserted": 1}))
+    # Finished pull statuses should produce a banner message.
+    done_statuses = {
+        "target_reached": "Pull is completed with 1 records.",
+        "partial_new_entries": "Pull is completed with 1 new records",
+        "no_new_entries": "already in the database",
+        "no_more_entries": "no more applicant entries",
+        "no_new_data": "No new records were found",
+        "fetch_failed": "repeated fetch failures",
+        "timeout": "Pull timed out before completing",
+        "error": "Pull completed with errors",
+        "cancelled": "Pull cancelled.",
+        "something_else": "Pull is completed. You can now update analysis.",
+    }
+    for status, text in done_statuses.items():
+        _insert_job(status, inserted=1)
         resp = client.get("/analysis")
         assert resp.status_code == 200
-
-    # Invalid JSON in DONE_PATH should not crash (json decode error branch).
-    (temp_paths / "pull.done").write_text("{not json")
-    resp = client.get("/analysis")
-    assert resp.status_code == 200
-
-    # OSError reading DONE_PATH should be swallowed.
-    real_open = builtins.open
-    (temp_paths / "pull.done").write_text("ok")
-    monkeypatch.setattr(builtins, "open", lambda *a, **k: (_ for _ in ()).throw(OSError("fail")))
-    resp = client.get("/analysis")
-    assert resp.status_code == 200
-
-    # OSError removing DONE_PATH should be swallowed.
-    monkeypatch.setattr(builtins, "open", real_open)
-    monkeypatch.setattr(pages.os, "remove", lambda *_: (_ for _ in ()).throw(OSError("fail")))
-    resp = client.get("/analysis")
-    assert resp.status_code == 200
+        assert text in resp.get_data(as_text=True)
 
     # Query-string statuses should also map to messages.
     status_values = [
@@ -759,25 +603,14 @@ def test_module_3_project_status_messages(app, client, temp_paths, monkeypatch):
         "pull_cancelled",
         "pull_timeout",
     ]
-    pages.PULL_LAST_EXIT = 0
     for status in status_values:
         resp = client.get(f"/analysis?status={status}")
         assert resp.status_code == 200
 
-    # Force a non-zero last exit to cover the error branch.
-    pages.PULL_LAST_EXIT = 1
-    resp = client.get("/analysis?status=pull_done")
-    assert resp.status_code == 200
-
-    # Cover the branch where PULL_LAST_EXIT is None.
-    pages.PULL_LAST_EXIT = None
-    resp = client.get("/analysis?status=pull_done")
-    assert resp.status_code == 200
-
 
 def test_module_3_project_compute_and_meta(app, client, temp_paths, monkeypatch):
     # Start with empty cache to exercise compute-and-write path.
-    monkeypatch.setattr(pages, "_read_cached_results", lambda: None)
+    monkeypatch.setattr(pages, "_read_cached_results", lambda *_: None)
 
     # Provide results with _meta so analysis_updated_at is computed.
     fake_results = {
@@ -811,7 +644,7 @@ def test_module_3_project_compute_and_meta(app, client, temp_paths, monkeypatch)
         "_meta": {"updated_at": time.time()},
     }
     monkeypatch.setattr(pages, "_compute_results", lambda: fake_results)
-    monkeypatch.setattr(pages, "_write_cached_results", lambda results: None)
+    monkeypatch.setattr(pages, "_write_cached_results", lambda *_: None)
     monkeypatch.setattr(pages, "get_latest_db_id", lambda: None)
     monkeypatch.setattr(pages, "_read_latest_survey_id", lambda: None)
     monkeypatch.setattr(pages, "_read_last_pull_job", lambda: None)
@@ -860,7 +693,7 @@ def test_cached_results_report_generation_error(app, client, temp_paths, monkeyp
         },
     }
 
-    monkeypatch.setattr(pages, "_read_cached_results", lambda: fake_results)
+    monkeypatch.setattr(pages, "_read_cached_results", lambda *_: fake_results)
     monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("fail")))
     monkeypatch.setattr(pages, "get_latest_db_id", lambda: 1)
     monkeypatch.setattr(pages, "_read_latest_survey_id", lambda: None)
@@ -870,9 +703,9 @@ def test_cached_results_report_generation_error(app, client, temp_paths, monkeyp
     assert resp.status_code == 200
 
 
-def test_module_3_project_remove_done_oserror(app, client, temp_paths, monkeypatch):
-    # Ensure the DONE_PATH removal failure branch is exercised.
-    (temp_paths / "pull.done").write_text(json.dumps({"status": "target_reached", "inserted": 1}))
+def test_module_3_project_shows_finished_pull_once(app, client, temp_paths, monkeypatch):
+    # The first page view (from any worker) takes the notice; later views do not repeat it.
+    job_id = _insert_job("target_reached", inserted=1)
 
     fake_results = {
         "total_applicants": 1,
@@ -903,14 +736,15 @@ def test_module_3_project_remove_done_oserror(app, client, temp_paths, monkeypat
             "additional_question_2": None,
         },
     }
-    monkeypatch.setattr(pages, "_read_cached_results", lambda: fake_results)
+    monkeypatch.setattr(pages, "_read_cached_results", lambda *_: fake_results)
     monkeypatch.setattr(pages, "get_latest_db_id", lambda: 1)
     monkeypatch.setattr(pages, "_read_latest_survey_id", lambda: None)
     monkeypatch.setattr(pages, "_read_last_pull_job", lambda: None)
-    monkeypatch.setattr(pages.os, "remove", lambda *_: (_ for _ in ()).throw(OSError("fail")))
 
-    resp = client.get("/analysis")
-    assert resp.status_code == 200
+    assert "Pull is completed with 1 records" in client.get("/analysis").get_data(as_text=True)
+    assert _job(job_id)[2] is True
+    assert "Pull is completed" not in client.get("/analysis").get_data(as_text=True)
+    assert client.get("/projects/module-3/pull-status").get_json()["done"] is False
 
 
 def test_run_update_analysis_paths(app):
@@ -931,7 +765,14 @@ def test_run_update_analysis_paths(app):
 def test_run_update_analysis_default_path(app, monkeypatch):
     # Without UPDATE_HANDLER, the default path should compute + write + report.
     app.config.pop("UPDATE_HANDLER", None)
-    monkeypatch.setattr(pages, "_compute_results", lambda: {"year_2026": {}, "all_time": {}, "total_applicants": 0})
+    refreshes = []
+
+    def _compute(refresh=False, previous=None):
+        refreshes.append((refresh, previous))
+        return {"year_2026": {}, "all_time": {}, "total_applicants": 0}
+
+    monkeypatch.setattr(pages, "_compute_results", _compute)
+    monkeypatch.setattr(pages, "_read_cached_results", lambda *_: {"cached": True})
     monkeypatch.setattr(pages, "_write_cached_results", lambda *_: None)
     monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("fail")))
 
@@ -939,3 +780,269 @@ def test_run_update_analysis_default_path(app, monkeypatch):
         result = pages._run_update_analysis()
 
     assert "year_2026" in result
+    # Update Analysis reconciles the summary instead of reading it, and
+    # hands over the cached results so their distributions can be reused.
+    assert refreshes == [(True, {"cached": True})]
+
+
+def test_update_analysis_runs_in_background(app, client, monkeypatch):
+    # Outside UPDATE_INLINE the routes queue the job and return at once.
+    release = threading.Event()
+    runs = []
+    app.config["UPDATE_INLINE"] = False
+    app.config["PULL_RUNNING_CHECK"] = lambda: False
+    app.config["UPDATE_HANDLER"] = lambda: runs.append(1) or release.wait(5)
+
+    resp = client.post("/update-analysis")
+    assert resp.status_code == 202
+    assert resp.get_json()["job"]["state"] == "running"
+    resp = client.post("/projects/module-3/update-analysis")
+    assert "status=analysis_queued" in resp.headers["Location"]
+    status = client.get("/projects/module-3/update-status").get_json()
+    assert status["pending"] is True
+    release.set()
+    assert pages.UPDATE_WORKER.wait(5)
+    assert runs == [1, 1]
+    assert client.get("/projects/module-3/update-status").get_json()["state"] == "idle"
+    assert "running in the background" in client.get(
+        "/projects/module-3?status=analysis_queued"
+    ).get_data(as_text=True)
+
+
+def test_page_serves_last_good_results_while_updating(app, client, monkeypatch):
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    old = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    with app.app_context():
+        stale = {**old, "year_2026": {**old["year_2026"], "fall_2026_count": 4141}}
+        pages._write_cached_results(stale, (1, 1, None))
+    release = threading.Event()
+    app.config["UPDATE_INLINE"] = False
+    app.config["DATA_VERSION"] = lambda: (2, 2, None)
+    app.config["COMPUTE_RESULTS"] = lambda: release.wait(5) and {**old, "total_applicants": 42}
+    app.config["COMPUTE_DISTRIBUTIONS"] = lambda: {}
+    monkeypatch.setattr(pages, "generate_pdf_report", lambda *a, **k: None)
+
+    # New data: the stale results render at once while the worker recomputes.
+    html = client.get("/projects/module-3").get_data(as_text=True)
+    assert "4141" in html
+    release.set()
+    assert pages.UPDATE_WORKER.wait(5)
+    with app.app_context():
+        assert pages._read_cached_results((2, 2, None))["total_applicants"] == 42
+    result_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "progress, expected",
+    [
+        (None, None),
+        ({"inserted": 0, "processed": 4}, None),
+        ({"inserted": "x"}, None),
+        # 10 inserts over 5 pages in 10 s: 40 more inserts = 20 pages = 40 s.
+        ({"inserted": 10, "processed": 5, "target": 50, "elapsed_seconds": 10}, 40.0),
+    ],
+)
+def test_eta_seconds(progress, expected):
+    assert pages._eta_seconds(progress) == expected
+
+
+def test_pull_events_streams_changes(app, client, monkeypatch):
+    state = {"running": True}
+    progress = {"inserted": 10, "processed": 5, "target": 50, "elapsed_seconds": 10}
+    app.config["PROGRESS_INTERVAL"] = 0.01
+    app.config["SSE_HEARTBEAT"] = 0.2
+    app.config["PULL_RUNNING_CHECK"] = lambda: state["running"]
+    app.config["LLM_READY_CHECK"] = lambda: True
+    monkeypatch.setattr(pages, "_read_progress", lambda: progress)
+
+    resp = client.get("/projects/module-3/pull-events")
+    assert resp.mimetype == "text/event-stream"
+    chunks = (chunk.decode("utf-8") for chunk in resp.response)
+    assert next(chunks) == "retry: 5000\n\n"
+    event = next(chunks)
+    assert event.startswith("event: progress\ndata: ")
+    data = json.loads(event.split("data: ", 1)[1])
+    assert data["running"] is True
+    assert data["eta_seconds"] == 40.0
+    assert data["progress"]["inserted"] == 10
+
+    state["running"] = False
+    data = json.loads(next(chunks).split("data: ", 1)[1])
+    assert data["running"] is False and data["eta_seconds"] is None
+    # No change within the heartbeat: a keep-alive comment.
+    assert next(chunks) == ": keep-alive\n\n"
+    resp.close()
+    watcher = app.extensions["m3_progress_watcher"]
+    assert watcher.subscribers == 0
+    # Every tab shares the app's one watcher.
+    with app.test_request_context():
+        assert pages._progress_watcher() is watcher
+
+
+def test_module_3_project_revalidates_with_etag(app, client, monkeypatch):
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    results = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    with app.app_context():
+        pages._write_cached_results({**results, "distributions": {}}, (1, 1, None))
+    state = {"running": False}
+    app.config["DATA_VERSION"] = lambda: (1, 1, None)
+    app.config["PULL_RUNNING_CHECK"] = lambda: state["running"]
+    app.config["LLM_READY_CHECK"] = lambda: True
+    monkeypatch.setattr(pages, "get_latest_db_id", lambda: 7)
+
+    first = client.get("/projects/module-3")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert first.last_modified is not None
+
+    again = client.get("/projects/module-3", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == etag
+
+    # A pull starting changes the page, so the old validator no longer matches.
+    state["running"] = True
+    changed = client.get("/projects/module-3", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    result_cache.clear()
+
+
+def test_with_validators_ignores_bad_timestamp(app):
+    resp = pages._with_validators(app.response_class(), "abc", "not-a-time")
+    assert resp.headers["ETag"] == '"abc"'
+    assert resp.last_modified is None
+
+
+def test_json_endpoints_answer_304(app, client):
+    app.config["PULL_RUNNING_CHECK"] = lambda: False
+    app.config["LLM_READY_CHECK"] = lambda: True
+    for url in ("/projects/module-3/pull-status", "/projects/module-3/update-status"):
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+        etag = first.headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_report_pdf_validators(app, client, temp_paths):
+    app.config["REPORT_PATH"] = str(temp_paths / "report.pdf")
+    assert client.get("/projects/module-3/report.pdf").status_code == 404
+
+    (temp_paths / "report.pdf").write_bytes(b"%PDF-1.4 test")
+    first = client.get("/projects/module-3/report.pdf")
+    assert first.status_code == 200
+    assert first.mimetype == "application/pdf"
+    assert first.get_data() == b"%PDF-1.4 test"
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+    again = client.get("/projects/module-3/report.pdf", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    first.close()
+    again.close()
+
+
+def test_module_3_project_reuses_page_snapshot(app, client, monkeypatch):
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    results = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    with app.app_context():
+        pages._write_cached_results({**results, "distributions": {}}, (1, 1, None))
+    state = {"running": False}
+    app.config["PAGE_CACHE"] = True
+    app.config["DATA_VERSION"] = lambda: (1, 1, None)
+    app.config["PULL_RUNNING_CHECK"] = lambda: state["running"]
+    app.config["LLM_READY_CHECK"] = lambda: True
+    app.config["UPDATE_HANDLER"] = lambda: None
+    calls = []
+    monkeypatch.setattr(pages, "get_latest_db_id", lambda: calls.append("db") or 7)
+    renders = []
+    real_render = pages.render_template
+    monkeypatch.setattr(
+        pages, "render_template", lambda *a, **k: renders.append(1) or real_render(*a, **k)
+    )
+
+    first = client.get("/projects/module-3").get_data(as_text=True)
+    assert client.get("/projects/module-3").get_data(as_text=True) == first
+    assert calls == ["db"] and len(renders) == 1
+
+    # A different status message renders again from the same snapshot.
+    client.get("/projects/module-3?status=pull_cancelled")
+    assert calls == ["db"] and len(renders) == 2
+
+    # An analysis update invalidates the snapshot.
+    client.post("/update-analysis")
+    client.get("/projects/module-3")
+    assert calls == ["db", "db"]
+
+    # While a pull runs, each view rebuilds the snapshot.
+    state["running"] = True
+    client.get("/projects/module-3")
+    client.get("/projects/module-3")
+    assert len(calls) == 4
+    result_cache.clear()
+
+
+def test_cached_page_views_skip_pull_queries(app, client, monkeypatch):
+    from M3_material import query_data, result_cache
+
+    result_cache.clear()
+    results = query_data.assemble_results(
+        {scope: query_data._empty_primitives() for scope in query_data.SCOPES}
+    )
+    with app.app_context():
+        pages._write_cached_results({**results, "distributions": {}}, (1, 1, None))
+    state = {"running": False}
+    checks, queries, calls = [], [], []
+    app.config["PAGE_CACHE"] = True
+    app.config["PULL_STATE_TTL"] = 60
+    app.config["DATA_VERSION"] = lambda: (1, 1, None)
+    app.config["PULL_RUNNING_CHECK"] = lambda: checks.append(1) or state["running"]
+    app.config["LLM_READY_CHECK"] = lambda: True
+    monkeypatch.setattr(pages, "get_latest_db_id", lambda: calls.append("db") or 7)
+    real_pull_jobs = pages._pull_jobs
+    monkeypatch.setattr(
+        pages, "_pull_jobs", lambda fn: queries.append(fn.__name__) or real_pull_jobs(fn)
+    )
+
+    client.get("/projects/module-3")
+    client.get("/projects/module-3")
+    assert len(checks) == 1 and calls == ["db"]
+    assert queries == ["peek_finished", "last_job"]
+
+    # Starting a pull in this worker drops the held state; views during the
+    # pull reuse it (and the snapshot) until it expires.
+    state["running"] = True
+    with app.test_request_context():
+        pages._pull_changed()
+    client.get("/projects/module-3")
+    client.get("/projects/module-3")
+    assert len(checks) == 2 and calls == ["db", "db"]
+    assert queries == ["peek_finished", "last_job", "last_job"]
+
+    # Once the state expires, the finished pull's notice is taken once.
+    state["running"] = False
+    _insert_job("target_reached", inserted=5)
+    app.extensions["m3_pull_state"].expire()
+    done = client.get("/projects/module-3").get_data(as_text=True)
+    assert "Pull is completed with 5 records" in done
+    assert queries[3:] == ["peek_finished", "take_finished", "last_job"]
+    after = client.get("/projects/module-3").get_data(as_text=True)
+    assert "Pull is completed" not in after
+    assert len(checks) == 3 and len(queries) == 6 and calls == ["db", "db", "db"]
+    result_cache.clear()
+
+
+def test_invalidate_page_without_app_context():
+    pages._invalidate_page()
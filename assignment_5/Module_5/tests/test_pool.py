@@ -0,0 +1,180 @@
+"""
+Tests for the process-wide connection pool in db.pool.
+
+The built-in pool is exercised against the real test database; the
+psycopg_pool branch is checked with a stand-in class since that package is
+optional.
+"""
+
+import threading
+from pathlib import Path
+
+import psycopg
+import pytest
+
+from db import pool
+from db.db_config import get_db_config
+
+pytestmark = pytest.mark.db
+
+
+@pytest.fixture()
+def fresh_pool():
+    # Start and finish each test with no shared pool.
+    pool.close_pool()
+    yield
+    pool.close_pool()
+
+
+def test_connection_reuses_pooled_connection(fresh_pool):
+    with pool.connection() as conn:
+        backend = conn.info.backend_pid
+    with pool.connection(autocommit=True) as conn:
+        assert conn.info.backend_pid == backend
+        assert conn.autocommit is True
+
+    stats = pool.get_stats()
+    assert stats["pool_size"] == 1
+    assert stats["pool_available"] == 1
+    assert stats["requests_num"] == 2
+    assert stats["requests_waiting"] == 0
+    assert stats["checkouts"] >= 2
+    assert stats["checkout_max_ms"] >= 0
+
+
+def test_connection_commits_and_rolls_back(fresh_pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TEMP TABLE pool_probe (id INT)")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO pool_probe VALUES (1)")
+            raise RuntimeError("boom")
+    with pool.connection() as conn:
+        # Same backend (temp table visible), rolled-back insert not visible.
+        assert conn.execute("SELECT COUNT(*) FROM pool_probe").fetchone()[0] == 0
+
+
+def test_closed_connection_is_discarded(fresh_pool):
+    with pool.connection() as conn:
+        conn.close()
+    assert pool.get_stats()["pool_size"] == 0
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_getconn_replaces_dead_idle_connection():
+    simple = pool.SimplePool(get_db_config(), max_size=1)
+    dead = simple.getconn()
+    simple.putconn(dead)
+    # Kill the idle connection's backend, as a server restart would.
+    with psycopg.connect(**get_db_config(), autocommit=True) as admin:
+        admin.execute("SELECT pg_terminate_backend(%s)", (dead.info.backend_pid,))
+
+    conn = simple.getconn()
+    assert conn is not dead
+    assert dead.closed
+    assert conn.execute("SELECT 1").fetchone()[0] == 1
+    assert simple.get_stats()["pool_size"] == 1
+    simple.putconn(conn)
+    simple.close()
+
+
+def test_check_connection_rejects_closed_and_keeps_autocommit():
+    conn = psycopg.connect(**get_db_config())
+    pool.SimplePool.check_connection(conn)
+    assert conn.autocommit is False
+    conn.close()
+    with pytest.raises(psycopg.OperationalError):
+        pool.SimplePool.check_connection(conn)
+
+
+def test_putconn_discards_connection_that_cannot_roll_back(monkeypatch):
+    simple = pool.SimplePool(get_db_config())
+    conn = simple.getconn()
+    conn.execute("SELECT 1")
+
+    def _fail():
+        raise psycopg.OperationalError("gone")
+
+    monkeypatch.setattr(conn, "rollback", _fail)
+    simple.putconn(conn)
+    assert simple.get_stats()["pool_size"] == 0
+    assert conn.closed
+
+
+def test_putconn_rolls_back_open_transaction():
+    simple = pool.SimplePool(get_db_config())
+    conn = simple.getconn()
+    conn.execute("SELECT 1")
+    simple.putconn(conn)
+    assert conn.info.transaction_status == psycopg.pq.TransactionStatus.IDLE
+    assert simple.get_stats()["pool_available"] == 1
+    simple.close()
+    assert conn.closed
+
+
+def test_getconn_waits_then_times_out():
+    simple = pool.SimplePool(get_db_config(), max_size=1, timeout=0.05)
+    held = simple.getconn()
+    with pytest.raises(TimeoutError):
+        simple.getconn()
+
+    # A waiter is woken as soon as the connection comes back.
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(simple.getconn(timeout=5)))
+    waiter.start()
+    simple.putconn(held)
+    waiter.join()
+    assert got == [held]
+    assert simple.get_stats()["requests_wait_ms"] > 0
+    simple.putconn(held)
+    simple.close()
+
+
+def test_getconn_connect_failure_releases_slot(monkeypatch):
+    simple = pool.SimplePool(get_db_config(), max_size=1)
+    monkeypatch.setattr(pool.psycopg, "connect", lambda **_: (_ for _ in ()).throw(OSError("down")))
+    with pytest.raises(OSError):
+        simple.getconn()
+    assert simple.get_stats()["pool_size"] == 0
+
+
+def test_pool_recreated_after_fork(fresh_pool, monkeypatch):
+    first = pool.get_pool()
+    assert pool.get_pool() is first
+    monkeypatch.setattr(pool.os, "getpid", lambda: -1)
+    assert pool.get_pool() is not first
+    first.close()
+
+
+def test_create_pool_prefers_psycopg_pool(monkeypatch):
+    created = {}
+
+    class FakeConnectionPool:
+        @staticmethod
+        def check_connection(conn):
+            pass
+
+        def __init__(self, conninfo, **kwargs):
+            created.update(conninfo=conninfo, **kwargs)
+
+    monkeypatch.setattr(pool, "ConnectionPool", FakeConnectionPool)
+    monkeypatch.setattr(pool, "get_db_config", lambda: {"conninfo": "dbname=x", "connect_timeout": 5})
+    assert isinstance(pool._create_pool(), FakeConnectionPool)
+    assert created["conninfo"] == "dbname=x"
+    assert created["kwargs"] == {"connect_timeout": 5}
+    assert created["max_size"] == pool.POOL_MAX_SIZE
+    assert created["check"] is FakeConnectionPool.check_connection
+
+
+def test_pool_fallback_imports(monkeypatch):
+    # Execute pool.py with no package context to cover the fallback import.
+    import runpy
+    import sys
+    import types
+
+    fake_db = types.ModuleType("db_config")
+    fake_db.get_db_config = lambda: {}
+    monkeypatch.setitem(sys.modules, "db_config", fake_db)
+    root = Path(__file__).resolve().parents[1]
+    runpy.run_path(str(root / "src" / "db" / "pool.py"), run_name="pool_test")
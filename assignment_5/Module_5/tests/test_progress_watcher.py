@@ -0,0 +1,58 @@
+"""
+Tests for the shared pull-progress watcher in M3_material.progress_watcher.
+"""
+
+import time
+
+import pytest
+
+from M3_material.progress_watcher import StateWatcher
+
+pytestmark = pytest.mark.web
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_subscribers_share_one_poller_and_see_changes():
+    state = {"inserted": 0}
+    calls = []
+
+    def source():
+        calls.append(1)
+        return dict(state)
+
+    watcher = StateWatcher(source, interval=0.01)
+    first, second = watcher.changes(heartbeat=5), watcher.changes(heartbeat=5)
+    assert next(first) == {"inserted": 0}
+    assert next(second) == {"inserted": 0}
+    assert watcher.subscribers == 2
+
+    state["inserted"] = 3
+    assert next(first) == {"inserted": 3}
+    assert next(second) == {"inserted": 3}
+
+    # Unchanged polls wake nobody; closing both streams stops the poller.
+    first.close()
+    second.close()
+    assert watcher.subscribers == 0
+    _wait_until(lambda: watcher._thread is None)
+    polled = len(calls)
+    time.sleep(0.05)
+    assert len(calls) == polled
+
+
+def test_heartbeat_and_source_errors():
+    def source():
+        raise OSError("disk gone")
+
+    watcher = StateWatcher(source, interval=0.01)
+    changes = watcher.changes(heartbeat=0.05)
+    assert next(changes) == {"error": "OSError: disk gone"}
+    # Nothing changes: a None keep-alive after the heartbeat interval.
+    assert next(changes) is None
+    changes.close()
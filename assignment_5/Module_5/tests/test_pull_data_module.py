@@ -13,6 +13,7 @@ import pytest
 import psycopg
 
 from M2_material import pull_data
+from M3_material import query_data
 from db.db_config import get_db_config
 from db.migrate import migrate
 
@@ -26,12 +27,51 @@ def pull_paths(monkeypatch, tmp_path):
     monkeypatch.setattr(pull_data, "STATE_PATH", str(tmp_path / "last_scraped_id.txt"))
     monkeypatch.setattr(pull_data, "DATA_PATH", str(tmp_path / "data.jsonl"))
     monkeypatch.setattr(pull_data, "LAST_ENTRIES_PATH", str(tmp_path / "last_entries.json"))
-    monkeypatch.setattr(pull_data, "DONE_PATH", str(tmp_path / "pull.done"))
     monkeypatch.setattr(pull_data, "LATEST_SURVEY_PATH", str(tmp_path / "latest_survey_id.txt"))
-    monkeypatch.setattr(pull_data, "PROGRESS_PATH", str(tmp_path / "progress.json"))
     return tmp_path
 
 
+@pytest.fixture()
+def job_statuses(monkeypatch):
+    # main() tests use stand-in connections: take the pull lock and record
+    # the pull_jobs statuses instead of writing them.
+    statuses = []
+
+    def _init(conn, target, job_id=None):
+        statuses.append("running")
+        return job_id or 1
+
+    def _update(conn, job_id, status, *args, **kwargs):
+        statuses.append(status)
+        return False
+
+    monkeypatch.setattr(pull_data, "acquire_pull_lock", lambda conn: True)
+    monkeypatch.setattr(pull_data, "_init_pull_job", _init)
+    monkeypatch.setattr(pull_data, "_update_pull_job", _update)
+    return statuses
+
+
+@pytest.fixture(autouse=True)
+def _no_analytics_refresh(monkeypatch):
+    # main() reconciles the analytics summary through the shared pool; the
+    # main() tests replace psycopg.connect with stand-ins, so skip it there.
+    calls = []
+    monkeypatch.setattr(pull_data, "reconcile_analytics_summary", lambda: calls.append(1))
+    monkeypatch.setattr(query_data, "reconcile_analytics_summary", lambda: calls.append(1))
+    return calls
+
+
+def test_reconcile_analytics_failure_is_logged(monkeypatch, capsys):
+    events = []
+    monkeypatch.setattr(
+        pull_data, "reconcile_analytics_summary", lambda: (_ for _ in ()).throw(RuntimeError("db down"))
+    )
+    monkeypatch.setattr(pull_data, "_log_event", lambda event, **kw: events.append((event, kw)))
+    pull_data._reconcile_analytics()
+    assert "Analytics refresh failed: db down" in capsys.readouterr().out
+    assert events == [("analytics_refresh_failed", {"error": "db down"})]
+
+
 def test_extract_entry_id():
     assert pull_data._extract_entry_id("https://www.thegradcafe.com/result/123") == 123
     assert pull_data._extract_entry_id("bad") is None
@@ -95,6 +135,22 @@ def test_get_max_entry_id_from_db():
             assert pull_data._get_max_entry_id_from_db(conn) == 555
 
 
+def test_result_id_column_ignores_non_numeric_and_oversized_urls():
+    # result_id is derived from the URL; unparseable or overflowing IDs stay NULL.
+    migrate()
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            for url in (
+                "https://www.thegradcafe.com/result/42",
+                "https://www.thegradcafe.com/result/99999999999",
+                "https://example.com/other",
+            ):
+                cur.execute("INSERT INTO applicants (url) VALUES (%s)", (url,))
+            cur.execute("SELECT url, result_id FROM applicants ORDER BY p_id")
+            assert [row[1] for row in cur.fetchall()] == [42, None, None]
+        assert pull_data._get_max_entry_id_from_db(conn) == 42
+
+
 def test_get_max_entry_id_from_db_error():
     # If the cursor fails, _get_max_entry_id_from_db should return None.
     class BadConn:
@@ -137,6 +193,63 @@ def test_insert_new_records_and_url_exists():
         assert duplicates == 1
 
 
+def test_insert_new_records_single_statement_batch(monkeypatch):
+    # One statement per batch: existing, repeated and new URLs are counted from RETURNING.
+    migrate()
+    existing = "https://www.thegradcafe.com/result/801"
+    fresh = "https://www.thegradcafe.com/result/802"
+    records = [
+        {"url": existing, "program": "A"},
+        {"url": fresh, "program": "B"},
+        {"url": fresh, "program": "B again"},
+        {"url": None, "program": "No URL"},
+    ]
+
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO applicants (url) VALUES (%s)", (existing,))
+
+        statements = []
+        real_cursor = conn.cursor
+
+        class CountingCursor:
+            def __init__(self):
+                self._cur = real_cursor()
+
+            def execute(self, stmt, params=None):
+                statements.append(stmt)
+                return self._cur.execute(stmt, params)
+
+            def fetchall(self):
+                return self._cur.fetchall()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc, tb):
+                self._cur.close()
+                return False
+
+        deltas = []
+        monkeypatch.setattr(pull_data, "apply_analytics_delta", lambda _conn, p_ids: deltas.append(p_ids))
+        conn.cursor = CountingCursor
+        inserted, duplicates = pull_data.insert_new_records(conn, records)
+        conn.cursor = real_cursor
+
+        assert (inserted, duplicates) == (2, 2)
+        assert len(statements) == 1
+        # Only the inserted rows are handed to the analytics delta.
+        assert [len(p_ids) for p_ids in deltas] == [2]
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM applicants")
+            assert cur.fetchone()[0] == 3
+
+
+def test_insert_new_records_empty_batch():
+    # Empty batches do not touch the connection.
+    assert pull_data.insert_new_records(None, []) == (0, 0)
+
+
 def test_ensure_table_calls_migrate(monkeypatch):
     # ensure_table should call migrate().
     called = {"count": 0}
@@ -150,6 +263,40 @@ def test_url_exists_none():
     assert pull_data.url_exists(None, None) is False
 
 
+def test_load_existing_ids_window():
+    # Only IDs inside [start, end) are returned; an open end means "no upper bound".
+    migrate()
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            for entry_id in (9, 10, 15, 20):
+                cur.execute(
+                    "INSERT INTO applicants (url) VALUES (%s)",
+                    (f"https://www.thegradcafe.com/result/{entry_id}",),
+                )
+            cur.execute("INSERT INTO applicants (url) VALUES ('https://example.com/other')")
+        assert pull_data._load_existing_ids(conn, 10, 20) == {10, 15}
+        assert pull_data._load_existing_ids(conn, 10, None) == {10, 15, 20}
+
+
+def test_is_known_entry_and_remember_entries(monkeypatch):
+    # Standard result URLs are answered from the set; others fall back to the DB.
+    existing = {101}
+    calls = []
+    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: calls.append(url) or True)
+
+    assert pull_data._is_known_entry(None, existing, "https://www.thegradcafe.com/result/101") is True
+    assert pull_data._is_known_entry(None, existing, "https://www.thegradcafe.com/result/102") is False
+    assert calls == []
+    assert pull_data._is_known_entry(None, existing, "https://example.com/odd") is True
+    assert calls == ["https://example.com/odd"]
+
+    pull_data._remember_entries(existing, [
+        {"url": "https://www.thegradcafe.com/result/102"},
+        {"url": None},
+    ])
+    assert existing == {101, 102}
+
+
 def test_write_last_entries(pull_paths):
     migrate()
     with psycopg.connect(**get_db_config(), autocommit=True) as conn:
@@ -164,22 +311,12 @@ def test_write_last_entries(pull_paths):
     assert (pull_paths / "last_entries.json").exists()
 
 
-def test_write_progress_and_log_event(pull_paths, capsys):
-    pull_data._write_progress("running", 1, 0, 2, 10, started_at=0, last_attempted=5)
-    data = json.loads((pull_paths / "progress.json").read_text())
-    assert data["status"] == "running"
-
+def test_log_event(capsys):
     pull_data._log_event("test_event", foo="bar")
     out = capsys.readouterr().out
     assert "test_event" in out
 
 
-def test_write_progress_oserror(monkeypatch):
-    # If writing progress fails, errors should be swallowed.
-    monkeypatch.setattr(pull_data.os, "makedirs", lambda *a, **k: (_ for _ in ()).throw(OSError("fail")))
-    pull_data._write_progress("running", 0, 0, 0, 1, started_at=0)
-
-
 def test_log_event_fallback(monkeypatch, capsys):
     # If JSON serialization fails, fallback logging should be used.
     monkeypatch.setattr(pull_data.json, "dumps", lambda *_: (_ for _ in ()).throw(ValueError("bad")))
@@ -192,7 +329,17 @@ def test_pull_job_init_and_update():
     migrate()
     with psycopg.connect(**get_db_config(), autocommit=True) as conn:
         job_id = pull_data._init_pull_job(conn, target=3)
-        pull_data._update_pull_job(conn, job_id, "done", 1, 0, 2, last_attempted=999, error=None)
+        assert pull_data._update_pull_job(conn, job_id, "done", 1, 0, 2, last_attempted=999, error=None) is False
+        # The target only changes when one is passed.
+        pull_data._update_pull_job(conn, job_id, "running", 1, 0, 2, target=2)
+        pull_data._update_pull_job(conn, job_id, "running", 1, 0, 2)
+        assert conn.execute("SELECT target FROM pull_jobs WHERE id = %s", (job_id,)).fetchone() == (2,)
+        # A claimed row is reused; an unknown id falls back to a new row.
+        assert pull_data._init_pull_job(conn, 5, job_id=job_id) == job_id
+        assert pull_data._init_pull_job(conn, 5, job_id=12345) != 12345
+        with conn.cursor() as cur:
+            cur.execute("UPDATE pull_jobs SET cancel_requested = TRUE WHERE id = %s", (job_id,))
+        assert pull_data._update_pull_job(conn, job_id, "done", 1, 0, 2, last_attempted=999) is True
 
         with conn.cursor() as cur:
             cur.execute("SELECT status, inserted, processed FROM pull_jobs WHERE id = %s", (job_id,))
@@ -303,7 +450,7 @@ def test_standardize_len_mismatch_single_row(monkeypatch):
         pull_data._standardize_with_llm_batch([{"program": "CS", "university": "Test"}])
 
 
-def test_main_no_new_entries(monkeypatch, pull_paths):
+def test_main_no_new_entries(monkeypatch, pull_paths, _no_analytics_refresh, job_statuses):
     # Simulate last_id >= latest_id so the pull exits early.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 10)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 10)
@@ -319,23 +466,22 @@ def test_main_no_new_entries(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "no_new_entries"
+    assert job_statuses[-1] == "no_new_entries"
+    # The summary is reconciled once before the done file is written.
+    assert _no_analytics_refresh == [1]
 
 
-def test_main_timeout_no_pages(monkeypatch, pull_paths):
+def test_main_timeout_no_pages(monkeypatch, pull_paths, job_statuses):
     # Simulate no pages and a timeout stop reason.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: None)
     monkeypatch.setattr(pull_data, "_read_last_scraped_id", lambda: None)
     monkeypatch.setattr(pull_data, "_infer_last_id_from_file", lambda: None)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
     monkeypatch.setattr(pull_data, "scrape_data", lambda *a, **k: iter([]))
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: "timeout")
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 999)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -348,17 +494,16 @@ def test_main_timeout_no_pages(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "timeout"
+    assert job_statuses[-1] == "timeout"
 
 
-def test_main_reaches_target(monkeypatch, pull_paths):
+def test_main_reaches_target(monkeypatch, pull_paths, job_statuses):
     # Simulate one page scraped and target reached.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 900)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 1000)
     monkeypatch.setattr(pull_data, "scrape_data", lambda *a, **k: iter([{"url": "https://www.thegradcafe.com/result/901", "html": "<div></div>", "date_added": "2026-01-01"}]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: False)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "_standardize_with_llm_batch", lambda rows: rows)
     monkeypatch.setattr(pull_data, "normalize_record", lambda r: {
         "program": "Test",
@@ -381,9 +526,6 @@ def test_main_reaches_target(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 901)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "TARGET_NEW_RECORDS", 1)
@@ -398,22 +540,36 @@ def test_main_reaches_target(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "target_reached"
+    assert job_statuses[-1] == "target_reached"
+
+
+def test_main_handles_exception(monkeypatch, pull_paths, job_statuses):
+    # Force an exception after the job starts so the error handler sets status=error.
+    monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
+    monkeypatch.setattr(pull_data, "seed_base_dataset", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+
+    class DummyConn:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(pull_data.psycopg, "connect", lambda **kwargs: DummyConn())
+    # Ensure argparse doesn't try to parse pytest args.
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
+
+    pull_data.main()
+    assert job_statuses == ["running", "error"]
 
 
-def test_main_handles_exception(monkeypatch, pull_paths):
-    # Force an exception so the error handler sets status=error.
+def test_main_connect_failure_records_nothing(monkeypatch, pull_paths, job_statuses, capsys):
     def _raise(**kwargs):
         raise RuntimeError("boom")
 
     monkeypatch.setattr(pull_data.psycopg, "connect", _raise)
-    # Ensure argparse doesn't try to parse pytest args.
-    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py", "--job-id", "7"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "error"
+    assert job_statuses == []
+    assert "Pull failed: boom" in capsys.readouterr().out
 
 
 def test_standardize_initial_availability_check(monkeypatch):
@@ -459,19 +615,17 @@ def test_standardize_initial_availability_check(monkeypatch):
         (None, "no_new_data"),
     ],
 )
-def test_main_no_pages_status_variants(monkeypatch, pull_paths, stop_reason, expected):
+def test_main_no_pages_status_variants(monkeypatch, pull_paths, stop_reason, expected, job_statuses):
     # When no pages are yielded, status should depend on stop_reason.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: None)
     monkeypatch.setattr(pull_data, "_read_last_scraped_id", lambda: None)
     monkeypatch.setattr(pull_data, "_infer_last_id_from_file", lambda: None)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
     monkeypatch.setattr(pull_data, "scrape_data", lambda *a, **k: iter([]))
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: stop_reason)
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 999)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -483,11 +637,10 @@ def test_main_no_pages_status_variants(monkeypatch, pull_paths, stop_reason, exp
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == expected
+    assert job_statuses[-1] == expected
 
 
-def test_main_success_with_duplicates_and_leftover_batch(monkeypatch, pull_paths):
+def test_main_success_with_duplicates_and_leftover_batch(monkeypatch, pull_paths, job_statuses):
     # Exercise duplicate handling, leftover batch insert, and success status.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 105)
@@ -496,7 +649,7 @@ def test_main_success_with_duplicates_and_leftover_batch(monkeypatch, pull_paths
         {"url": "https://www.thegradcafe.com/result/102", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: url.endswith("/101"))
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: {101})
     monkeypatch.setattr(pull_data, "_standardize_with_llm_batch", lambda rows: rows)
     monkeypatch.setattr(pull_data, "normalize_record", lambda r: r | {
         "comments": "c",
@@ -517,9 +670,6 @@ def test_main_success_with_duplicates_and_leftover_batch(monkeypatch, pull_paths
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 102)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "TARGET_NEW_RECORDS", 5)
@@ -533,11 +683,10 @@ def test_main_success_with_duplicates_and_leftover_batch(monkeypatch, pull_paths
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "success"
+    assert job_statuses[-1] == "success"
 
 
-def test_main_no_more_entries_after_placeholder_with_no_inserts(monkeypatch, pull_paths):
+def test_main_no_more_entries_after_placeholder_with_no_inserts(monkeypatch, pull_paths, job_statuses):
     # placeholder_streak after pages but no inserts should yield no_more_entries.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
@@ -545,13 +694,10 @@ def test_main_no_more_entries_after_placeholder_with_no_inserts(monkeypatch, pul
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: True)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: {101})
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: "placeholder_streak")
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -563,12 +709,11 @@ def test_main_no_more_entries_after_placeholder_with_no_inserts(monkeypatch, pul
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "no_more_entries"
+    assert job_statuses[-1] == "no_more_entries"
 
 
 @pytest.mark.parametrize("stop_reason, expected", [("timeout", "timeout"), ("error_streak", "fetch_failed")])
-def test_main_stop_reason_timeout_and_error(monkeypatch, pull_paths, stop_reason, expected):
+def test_main_stop_reason_timeout_and_error(monkeypatch, pull_paths, stop_reason, expected, job_statuses):
     # When pages were seen and stop_reason is timeout/error_streak, set status accordingly.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
@@ -576,13 +721,10 @@ def test_main_stop_reason_timeout_and_error(monkeypatch, pull_paths, stop_reason
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: True)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: {101})
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: stop_reason)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -594,10 +736,9 @@ def test_main_stop_reason_timeout_and_error(monkeypatch, pull_paths, stop_reason
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == expected
+    assert job_statuses[-1] == expected
 
-def test_main_partial_new_entries_placeholder(monkeypatch, pull_paths):
+def test_main_partial_new_entries_placeholder(monkeypatch, pull_paths, job_statuses):
     # Stop reason placeholder_streak with inserted records => partial_new_entries.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
@@ -605,7 +746,7 @@ def test_main_partial_new_entries_placeholder(monkeypatch, pull_paths):
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: False)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "_standardize_with_llm_batch", lambda rows: rows)
     monkeypatch.setattr(pull_data, "normalize_record", lambda r: r | {
         "comments": "c",
@@ -626,9 +767,6 @@ def test_main_partial_new_entries_placeholder(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: "placeholder_streak")
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "TARGET_NEW_RECORDS", 5)
@@ -642,11 +780,10 @@ def test_main_partial_new_entries_placeholder(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "partial_new_entries"
+    assert job_statuses[-1] == "partial_new_entries"
 
 
-def test_main_latest_id_no_new_entries_after_loop(monkeypatch, pull_paths):
+def test_main_latest_id_no_new_entries_after_loop(monkeypatch, pull_paths, job_statuses):
     # last_attempted >= latest_id with no inserts => no_new_entries.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 101)
@@ -654,13 +791,10 @@ def test_main_latest_id_no_new_entries_after_loop(monkeypatch, pull_paths):
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: True)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: {101})
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -672,11 +806,10 @@ def test_main_latest_id_no_new_entries_after_loop(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "no_new_entries"
+    assert job_statuses[-1] == "no_new_entries"
 
 
-def test_main_latest_id_partial_new_entries_after_loop(monkeypatch, pull_paths):
+def test_main_latest_id_partial_new_entries_after_loop(monkeypatch, pull_paths, job_statuses):
     # last_attempted >= latest_id with inserts => partial_new_entries.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 101)
@@ -684,7 +817,7 @@ def test_main_latest_id_partial_new_entries_after_loop(monkeypatch, pull_paths):
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: False)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "_standardize_with_llm_batch", lambda rows: rows)
     monkeypatch.setattr(pull_data, "normalize_record", lambda r: r | {
         "comments": "c",
@@ -705,9 +838,6 @@ def test_main_latest_id_partial_new_entries_after_loop(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "TARGET_NEW_RECORDS", 5)
@@ -721,11 +851,10 @@ def test_main_latest_id_partial_new_entries_after_loop(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "partial_new_entries"
+    assert job_statuses[-1] == "partial_new_entries"
 
 
-def test_main_no_new_data_after_loop(monkeypatch, pull_paths):
+def test_main_no_new_data_after_loop(monkeypatch, pull_paths, job_statuses):
     # Inserted_total == 0 with no stop_reason => no_new_data.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 100)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
@@ -733,13 +862,10 @@ def test_main_no_new_data_after_loop(monkeypatch, pull_paths):
         {"url": "https://www.thegradcafe.com/result/101", "html": "<div></div>", "date_added": "2026-01-01"},
     ]))
     monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"], "program": "CS", "university": "Test"}])
-    monkeypatch.setattr(pull_data, "url_exists", lambda conn, url: True)
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: {101})
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 101)
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "_write_last_scraped_id", lambda v: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
-    monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: None)
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
@@ -751,74 +877,88 @@ def test_main_no_new_data_after_loop(monkeypatch, pull_paths):
     monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "no_new_data"
+    assert job_statuses[-1] == "no_new_data"
 
 
-def test_main_lock_path_write_error(monkeypatch, pull_paths, tmp_path):
-    # If the lock file cannot be written, the pull should proceed without it.
-    lock_path = tmp_path / "pull.lock"
-
-    monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 10)
-    monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 10)
+def test_main_fails_claim_when_another_pull_holds_the_lock(monkeypatch, pull_paths, job_statuses, _no_analytics_refresh):
+    # A second pull fails its own claimed job and leaves everything else alone.
+    failed = []
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
-    monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
+    monkeypatch.setattr(pull_data, "acquire_pull_lock", lambda conn: False)
+    monkeypatch.setattr(pull_data, "fail_claim", lambda conn, job_id, error: failed.append((job_id, error)))
+    monkeypatch.setattr(pull_data, "seed_base_dataset", lambda: pytest.fail("must not run"))
 
     class DummyConn:
         def close(self):
             pass
 
     monkeypatch.setattr(pull_data.psycopg, "connect", lambda **kwargs: DummyConn())
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py", "--job-id", "7"])
+
+    pull_data.main()
+    assert failed == [(7, "another pull holds the pull lock")]
+    assert job_statuses == []
+    assert _no_analytics_refresh == []
 
-    real_open = builtins.open
+    # Started from the command line there is no claim to fail.
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
+    pull_data.main()
+    assert len(failed) == 1 and job_statuses == []
+
+
+def test_main_stops_when_cancel_requested(monkeypatch, pull_paths, job_statuses):
+    monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: 900)
+    monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: 1000)
+    pages = iter([{"url": "https://www.thegradcafe.com/result/901"}, {"url": "https://www.thegradcafe.com/result/902"}])
+    monkeypatch.setattr(pull_data, "scrape_data", lambda *a, **k: pages)
+    monkeypatch.setattr(pull_data, "clean_data", lambda pages: [{"url": pages[0]["url"]}])
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
+    monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: 901)
+    monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
+    entries = []
+    monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: entries.append(1))
 
-    def _open(path, mode="r", *args, **kwargs):
-        if str(path) == str(lock_path) and "w" in mode:
-            raise OSError("lock write fail")
-        return real_open(path, mode, *args, **kwargs)
+    def _update(conn, job_id, status, *args, **kwargs):
+        job_statuses.append(status)
+        # The web app asks the pull to stop while it reports the first page.
+        return status == "running" and len(job_statuses) > 2
 
-    monkeypatch.setattr(builtins, "open", _open)
-    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py", "--lock", str(lock_path)])
+    monkeypatch.setattr(pull_data, "_update_pull_job", _update)
+
+    class DummyConn:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(pull_data.psycopg, "connect", lambda **kwargs: DummyConn())
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py", "--job-id", "7"])
 
     pull_data.main()
-    done = json.loads((pull_paths / "pull.done").read_text())
-    assert done["status"] == "no_new_entries"
+    assert job_statuses[-1] == "cancelled"
+    assert entries == [1]
+    # The second page was never fetched.
+    assert next(pages)["url"].endswith("902")
 
 
-def test_main_finally_error_paths(monkeypatch, pull_paths, tmp_path):
-    # Force errors in the finally block: DONE_PATH write, update job, lock remove, and conn close.
+def test_main_finally_error_paths(monkeypatch, pull_paths, tmp_path, job_statuses):
+    # Force errors in the finally block: update job and conn close.
     monkeypatch.setattr(pull_data, "_get_max_entry_id_from_db", lambda conn: None)
     monkeypatch.setattr(pull_data, "_read_last_scraped_id", lambda: None)
     monkeypatch.setattr(pull_data, "_infer_last_id_from_file", lambda: None)
     monkeypatch.setattr(pull_data, "get_latest_survey_id", lambda: None)
     monkeypatch.setattr(pull_data, "scrape_data", lambda *a, **k: iter([]))
+    monkeypatch.setattr(pull_data, "_load_existing_ids", lambda conn, start, end: set())
     monkeypatch.setattr(pull_data, "get_last_stop_reason", lambda: None)
     monkeypatch.setattr(pull_data, "get_last_attempted_id", lambda: None)
-    monkeypatch.setattr(pull_data, "_write_progress", lambda *a, **k: None)
-    monkeypatch.setattr(pull_data, "_init_pull_job", lambda *a, **k: 1)
     monkeypatch.setattr(pull_data, "_update_pull_job", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("update fail")))
     monkeypatch.setattr(pull_data, "ensure_table", lambda conn: None)
     monkeypatch.setattr(pull_data, "write_last_entries", lambda *a, **k: None)
 
-    lock_path = tmp_path / "pull.lock"
-    lock_path.write_text("123")
-
     class DummyConn:
         def close(self):
             raise RuntimeError("close fail")
 
     monkeypatch.setattr(pull_data.psycopg, "connect", lambda **kwargs: DummyConn())
-
-    real_open = builtins.open
-
-    def _open(path, mode="r", *args, **kwargs):
-        if str(path) == str(pull_data.DONE_PATH) and "w" in mode:
-            raise OSError("done write fail")
-        return real_open(path, mode, *args, **kwargs)
-
-    monkeypatch.setattr(builtins, "open", _open)
-    monkeypatch.setattr(pull_data.os, "remove", lambda *_: (_ for _ in ()).throw(OSError("remove fail")))
-    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py", "--lock", str(lock_path)])
+    monkeypatch.setattr(pull_data.sys, "argv", ["pull_data.py"])
 
     pull_data.main()
 
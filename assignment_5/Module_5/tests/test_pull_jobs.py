@@ -0,0 +1,118 @@
+"""
+Tests for pull coordination through the advisory lock and pull_jobs.
+"""
+
+import psycopg
+import pytest
+
+from db import pull_jobs
+from db.db_config import get_db_config
+
+pytestmark = pytest.mark.db
+
+
+def _connect():
+    return psycopg.connect(**get_db_config(), autocommit=True)
+
+
+def _rows(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, status, cancel_requested, notified, error FROM pull_jobs ORDER BY id")
+        return cur.fetchall()
+
+
+def test_claim_pull_and_running_state():
+    with _connect() as conn:
+        assert pull_jobs.pull_running(conn) is False
+        job_id = pull_jobs.claim_pull(conn, 50)
+        assert job_id is not None
+        assert _rows(conn) == [(job_id, "starting", False, False, None)]
+        # A fresh claim counts as running and blocks a second claim.
+        assert pull_jobs.pull_running(conn) is True
+        assert pull_jobs.claim_pull(conn, 50) is None
+
+        # Once the grace period has passed the claim is treated as dead.
+        conn.execute("UPDATE pull_jobs SET started_at = NOW() - INTERVAL '1 hour'")
+        assert pull_jobs.pull_running(conn) is False
+        second = pull_jobs.claim_pull(conn, 50)
+        assert [row[1:4] for row in _rows(conn)] == [
+            ("abandoned", False, True),
+            ("starting", False, False),
+        ]
+        assert _rows(conn)[1][0] == second
+
+
+def test_claim_pull_refused_while_lock_held():
+    with _connect() as holder, _connect() as conn:
+        assert pull_jobs.acquire_pull_lock(holder, wait=0) is True
+        assert pull_jobs.pull_running(conn) is True
+        assert pull_jobs.claim_pull(conn, 10) is None
+        assert _rows(conn) == []
+
+
+def test_acquire_pull_lock_waits_then_gives_up():
+    with _connect() as holder, _connect() as conn:
+        assert pull_jobs.acquire_pull_lock(holder) is True
+        assert pull_jobs.acquire_pull_lock(conn, wait=0.05, poll=0.01) is False
+    # Closing the holder's connection released the lock.
+    with _connect() as conn:
+        assert pull_jobs.acquire_pull_lock(conn, wait=0) is True
+
+
+def test_fail_claim_and_last_job():
+    with _connect() as conn:
+        assert pull_jobs.last_job(conn) is None
+        job_id = pull_jobs.claim_pull(conn, 5)
+        pull_jobs.fail_claim(conn, job_id, "spawn failed")
+        job = pull_jobs.last_job(conn)
+        assert job["status"] == "error" and job["error"] == "spawn failed"
+        # A failed claim does not block the next one.
+        assert pull_jobs.claim_pull(conn, 5) is not None
+
+
+def test_request_cancel():
+    with _connect() as conn:
+        assert pull_jobs.request_cancel(conn) is False
+        conn.execute("INSERT INTO pull_jobs (status) VALUES ('running'), ('success')")
+        assert pull_jobs.request_cancel(conn) is True
+        rows = _rows(conn)
+        assert rows[0][1:4] == ("running", True, True)
+        assert rows[1][1:4] == ("success", False, False)
+
+
+def test_finished_notice_is_taken_once():
+    with _connect() as conn:
+        assert pull_jobs.peek_finished(conn) is None
+        assert pull_jobs.take_finished(conn) is None
+        conn.execute(
+            "INSERT INTO pull_jobs (status, inserted, duplicates) "
+            "VALUES ('no_new_data', 0, 0), ('target_reached', 7, 2), ('running', 1, 0)"
+        )
+        assert pull_jobs.peek_finished(conn) == "target_reached"
+        assert pull_jobs.take_finished(conn) == {
+            "status": "target_reached",
+            "inserted": 7,
+            "duplicates": 2,
+        }
+        assert pull_jobs.peek_finished(conn) is None
+        assert pull_jobs.take_finished(conn) is None
+
+
+def test_read_progress():
+    with _connect() as conn:
+        assert pull_jobs.read_progress(conn) is None
+        conn.execute(
+            "INSERT INTO pull_jobs (status, inserted, duplicates, processed, target, "
+            "last_attempted, started_at, updated_at) "
+            "VALUES ('running', 3, 1, 4, 10, 123, NOW() - INTERVAL '90 seconds', NOW())"
+        )
+        progress = pull_jobs.read_progress(conn)
+    assert progress == {
+        "status": "running",
+        "inserted": 3,
+        "duplicates": 1,
+        "processed": 4,
+        "target": 10,
+        "last_attempted": 123,
+        "elapsed_seconds": 90,
+    }
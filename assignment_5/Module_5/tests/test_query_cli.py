@@ -1,13 +1,17 @@
 """
 Tests for the query_cli entry point.
 
-We monkeypatch the query functions to avoid hitting the database.
+The prose test monkeypatches the query functions to avoid the database; the
+report modes run against the test database.
 """
 
-import pytest
+import json
 from pathlib import Path
 
+import pytest
+
 import M3_material.query_cli as query_cli
+from db.import_extra_data import COLUMNS
 
 pytestmark = pytest.mark.analysis
 
@@ -31,7 +35,7 @@ def test_query_cli_main_output(monkeypatch, capsys):
     monkeypatch.setattr(query_cli, "additional_question_1", lambda *_: 25.0)
     monkeypatch.setattr(query_cli, "additional_question_2", lambda *_: 150.0)
 
-    query_cli.main()
+    query_cli.main([])
     out = capsys.readouterr().out
 
     # Validate a few representative lines.
@@ -60,8 +64,58 @@ def test_query_cli_script_fallback_imports(monkeypatch):
     fake_q.count_top_phd_acceptances_2026_llm = lambda *_: 0
     fake_q.additional_question_1 = lambda *_: 0.0
     fake_q.additional_question_2 = lambda *_: 0.0
+    fake_q.build_analysis_results = lambda: {}
+    fake_q.count_total_applicants = lambda: 0
+    fake_q.explain_statement = lambda *_: {}
+    fake_q.fetch_primitives = lambda: {}
+    fake_q.metric_statements = lambda: {}
 
     monkeypatch.setitem(sys.modules, "query_data", fake_q)
+    monkeypatch.setattr(sys, "argv", ["query_cli.py"])
 
     root = Path(__file__).resolve().parents[1]
     runpy.run_path(str(root / "src" / "M3_material" / "query_cli.py"), run_name="__main__")
+
+
+def test_query_cli_json_and_report(insert_records, tmp_path, capsys):
+    record = dict.fromkeys(COLUMNS)
+    record.update(url="https://www.thegradcafe.com/result/1", term="Fall", date_added="2026-02-01")
+    insert_records([record])
+    report_path = tmp_path / "report.json"
+    query_cli.main(["--json", "--report", str(report_path)])
+    printed = json.loads(capsys.readouterr().out)
+    assert printed["results"]["year_2026"]["fall_2026_count"] == 1
+    assert json.loads(report_path.read_text())["results"] == printed["results"]
+
+
+def test_query_cli_bench_percentiles(monkeypatch, capsys):
+    ticks = iter(range(100))
+    monkeypatch.setattr(query_cli.time, "perf_counter", lambda: next(ticks) / 1000)
+    monkeypatch.setattr(query_cli, "_metric_functions", lambda: {"probe": lambda: None})
+    monkeypatch.setattr(query_cli, "build_analysis_results", lambda: {})
+
+    report = query_cli.main(["--bench", "4"])
+    # Each run spans one tick (1 ms) of the fake clock.
+    assert report["bench"]["probe"] == {"runs": 4, "p50_ms": 1.0, "p95_ms": 1.0, "max_ms": 1.0}
+    assert "probe" in capsys.readouterr().out
+
+
+def test_query_cli_metric_functions_call_cohort_scope(monkeypatch):
+    calls = []
+
+    def count_jhu_masters_cs(use_term_filter):
+        calls.append(use_term_filter)
+
+    monkeypatch.setattr(query_cli, "count_jhu_masters_cs", count_jhu_masters_cs)
+    query_cli._metric_functions()["count_jhu_masters_cs"]()
+    assert calls == [True]
+    assert query_cli._percentile([1, 2, 3, 4], 0.5) == 2
+
+
+def test_query_cli_explain(capsys):
+    report = query_cli.main(["--explain"])
+    assert set(report["explain"]) == set(query_cli.metric_statements())
+    plan = report["explain"]["all_metrics"]
+    assert "Execution Time" in plan
+    assert "Shared Hit Blocks" in json.dumps(plan)  # BUFFERS was captured
+    assert "latest_db_id" in capsys.readouterr().out
@@ -10,10 +10,10 @@ pytestmark = pytest.mark.db
 
 
 def test_get_connection_raises_runtime_error(monkeypatch):
-    # Force psycopg.connect to raise so get_connection wraps the error.
+    # Force the pool checkout to raise so get_connection wraps the error.
     def _raise(*args, **kwargs):
         raise Exception("boom")
 
-    monkeypatch.setattr(query_data.psycopg, "connect", _raise)
+    monkeypatch.setattr(query_data, "connection", _raise)
     with pytest.raises(RuntimeError):
         query_data.get_connection()
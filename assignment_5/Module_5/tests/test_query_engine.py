@@ -0,0 +1,587 @@
+"""
+Parity tests for the single-scan analytics engine in query_data and the
+NumPy columnar engine in M3_material.columnar.
+
+A varied synthetic dataset is scored twice: by build_analysis_results (one
+FILTER-aggregate query) and by the per-metric SQL the dashboard used before
+the engine existed. Every value must match exactly.
+"""
+
+import random
+
+import psycopg
+import pytest
+
+from db.db_config import get_db_config
+from M2_material import pull_data
+from M3_material import columnar, query_data
+
+pytestmark = pytest.mark.analysis
+
+JHU_NAMES = [
+    "Johns Hopkins University",
+    "John Hopkins",
+    "JHU",
+    "Johns Hopkins Univeristy",
+    "Stanford University",
+    "MIT",
+    "Georgetown University",
+    "Carnegie Mellon University",
+    "Some College",
+]
+
+
+def _records(count=400, seed=7):
+    rng = random.Random(seed)
+
+    def maybe(value, chance=0.8):
+        return value if rng.random() < chance else None
+
+    records = []
+    for i in range(count):
+        university = rng.choice(JHU_NAMES)
+        year = rng.choice([2024, 2025, 2026, 2026, 2027])
+        records.append(
+            {
+                "program": maybe(f"{rng.choice(['Computer Science', 'Physics'])}, {university}"),
+                "comments": None,
+                "date_added": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "acceptance_date": maybe(f"{year}-{rng.randint(1, 12):02d}-15", 0.3),
+                "url": f"https://www.thegradcafe.com/result/{700000 + i}",
+                "status": maybe(rng.choice(["accepted", "Accepted", "rejected", "waitlisted"])),
+                "term": maybe(rng.choice(["Fall", "fall", "Spring", "Summer"])),
+                "us_or_international": maybe(rng.choice(["American", "International", "Other"])),
+                # Two-decimal values make .xx5 averages (rounding edges) likely.
+                "gpa": maybe(rng.randint(250, 400) / 100),
+                "gre": maybe(float(rng.randint(140, 170))),
+                "gre_v": maybe(float(rng.randint(140, 170))),
+                "gre_aw": maybe(rng.randint(6, 12) / 2),
+                "degree": maybe(rng.choice(["Masters", "PhD", "MS"])),
+                "llm_generated_program": maybe(rng.choice(["Computer Science", "Physics"])),
+                "llm_generated_university": maybe(university),
+            }
+        )
+    return records
+
+
+def _scalar(cur, query, params):
+    cur.execute(query, params)
+    return cur.fetchone()[0]
+
+
+def _avg(cur, query, params):
+    value = _scalar(cur, query, params)
+    return float(value) if value else None
+
+
+def _legacy_scope(cur, use_term_filter):
+    # The per-metric SQL that build_analysis_results ran before the engine.
+    clause, params = query_data._term_filter(use_term_filter)
+    base = f"FROM applicants WHERE {clause}"
+    total = _scalar(cur, f"SELECT COUNT(*) {base}", params)
+    intl = _scalar(
+        cur, f"SELECT COUNT(*) {base} AND us_or_international NOT IN ('American', 'Other')", params
+    )
+    accepted = _scalar(cur, f"SELECT COUNT(*) {base} AND status ILIKE %s", params + ["accept%"])
+    with_gpa = _scalar(cur, f"SELECT COUNT(*) {base} AND gpa IS NOT NULL", params)
+    cur.execute(
+        "SELECT AVG(gpa)::numeric(5,2), AVG(gre)::numeric(5,2), "
+        "AVG(gre_v)::numeric(5,2), AVG(gre_aw)::numeric(5,2) "
+        f"{base} AND (gpa IS NOT NULL OR gre IS NOT NULL "
+        "OR gre_v IS NOT NULL OR gre_aw IS NOT NULL)",
+        params,
+    )
+    row = cur.fetchone()
+    return {
+        "count": total,
+        "percent_international": round(intl / total * 100, 2) if total else 0.0,
+        "average_metrics": {
+            "avg_gpa": float(row[0]) if row[0] else None,
+            "avg_gre": float(row[1]) if row[1] else None,
+            "avg_gre_v": float(row[2]) if row[2] else None,
+            "avg_gre_aw": float(row[3]) if row[3] else None,
+        },
+        "avg_gpa_american_fall_2026": _avg(
+            cur,
+            f"SELECT AVG(gpa)::numeric(5,2) {base} "
+            "AND us_or_international='American' AND gpa IS NOT NULL",
+            params,
+        ),
+        "acceptance_rate_fall_2026": round(accepted / total * 100, 2) if total else 0.0,
+        "avg_gpa_acceptances_fall_2026": _avg(
+            cur,
+            f"SELECT AVG(gpa)::numeric(5,2) {base} AND status ILIKE %s AND gpa IS NOT NULL",
+            params + ["accept%"],
+        ),
+        "jhu_masters_cs": _scalar(
+            cur,
+            f"SELECT COUNT(*) {base} AND degree ILIKE %s AND llm_generated_program ILIKE %s "
+            "AND (llm_generated_university ILIKE ANY(%s) OR program ILIKE ANY(%s))",
+            params + ["%Master%", "%Computer Science%", query_data.JHU_PATTERNS, query_data.JHU_PATTERNS],
+        ),
+        "top_phd_acceptances_2026_raw": _scalar(
+            cur,
+            f"SELECT COUNT(*) {base} AND status ILIKE %s AND degree ILIKE %s "
+            "AND llm_generated_program ILIKE %s AND program ILIKE ANY(%s)",
+            params + ["accept%", "%PhD%", "%Computer Science%", query_data.TOP_UNI_PATTERNS],
+        ),
+        "top_phd_acceptances_2026_llm": _scalar(
+            cur,
+            f"SELECT COUNT(*) {base} AND status ILIKE %s AND degree ILIKE %s "
+            "AND llm_generated_program ILIKE %s AND llm_generated_university = ANY(%s)",
+            params + ["accept%", "%PhD%", "%Computer Science%", query_data.TOP_UNI_NAMES],
+        ),
+        "additional_question_1": round(with_gpa / total * 100, 2) if total else 0.0,
+        "additional_question_2": _avg(
+            cur,
+            f"SELECT AVG(gre)::numeric(5,2) {base} "
+            "AND us_or_international NOT IN ('American','Other') AND gre IS NOT NULL",
+            params,
+        ),
+    }
+
+
+def _legacy_results():
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            year = _legacy_scope(cur, True)
+            all_time = _legacy_scope(cur, False)
+    return {
+        "total_applicants": all_time["count"],
+        "year_2026": {"fall_2026_count": year.pop("count"), **year},
+        "all_time": {"total_entries": all_time.pop("count"), **all_time},
+    }
+
+
+@pytest.mark.parametrize("seed", [7, 11, 2026])
+def test_engine_matches_per_metric_sql(insert_records, seed):
+    insert_records(_records(seed=seed))
+    assert query_data.build_analysis_results() == _legacy_results()
+
+
+def test_engine_matches_on_empty_table():
+    assert query_data.build_analysis_results() == _legacy_results()
+
+
+def test_refresh_runs_one_aggregate_query(insert_records, monkeypatch):
+    insert_records(_records(count=20))
+    scans = []
+    real = query_data._run_primitives
+
+    def _counting(*args, **kwargs):
+        scans.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(query_data, "_run_primitives", _counting)
+    assert query_data.refresh_analytics_summary() == _legacy_results()
+    assert len(scans) == 1
+
+
+def test_build_analysis_results_reads_published_summary(insert_records, monkeypatch):
+    insert_records(_records(count=20))
+    published = query_data.refresh_analytics_summary()
+    # Rows added after the refresh are not visible until the next refresh.
+    insert_records(_records(count=25, seed=99))
+    monkeypatch.setattr(
+        query_data, "_run_primitives", lambda *a, **k: pytest.fail("page load scanned applicants")
+    )
+    calls = []
+    real = query_data.get_connection
+
+    def _counting():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(query_data, "get_connection", _counting)
+    assert query_data.build_analysis_results() == published
+    assert len(calls) == 1
+
+
+def test_build_analysis_results_publishes_when_missing(insert_records):
+    insert_records(_records(count=20))
+    assert query_data.read_analytics_summary() is None
+    assert query_data.build_analysis_results() == _legacy_results()
+    assert set(query_data.read_analytics_summary()) == set(query_data.SCOPES)
+
+
+def test_pull_inserts_update_summary_incrementally(insert_records, monkeypatch):
+    insert_records(_records(count=200, seed=5))
+    query_data.refresh_analytics_summary()
+    delta_rows = []
+    real = query_data._run_primitives
+
+    def _recording(cur, scopes=tuple(query_data.SCOPES), names=None, p_ids=None):
+        delta_rows.append(p_ids)
+        return real(cur, scopes, names, p_ids)
+
+    monkeypatch.setattr(query_data, "_run_primitives", _recording)
+    batch = _records(count=260, seed=6)[200:]
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        assert pull_data.insert_new_records(conn, batch) == (60, 0)
+        # Re-sent rows are duplicates and add nothing.
+        assert pull_data.insert_new_records(conn, batch[:10]) == (0, 10)
+
+    # Only the 60 new rows were aggregated, and the summary matches a rescan.
+    assert [len(p_ids) for p_ids in delta_rows] == [60]
+    assert query_data.build_analysis_results() == _legacy_results()
+
+
+def test_delta_without_published_summary_is_skipped(insert_records):
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        assert query_data.apply_analytics_delta(conn, []) is False
+        pull_data.insert_new_records(conn, _records(count=5))
+    assert query_data.read_analytics_summary() is None
+    assert query_data.build_analysis_results() == _legacy_results()
+
+
+def test_summary_for_other_primitives_is_unpublished(insert_records):
+    insert_records(_records(count=20))
+    query_data.refresh_analytics_summary()
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        conn.execute("UPDATE analytics_summary SET primitives = primitives - 'total'")
+    assert query_data.read_analytics_summary() is None
+
+
+def test_reconcile_recomputes_only_when_stale(insert_records, monkeypatch):
+    insert_records(_records(count=20))
+    published, refreshed = query_data.reconcile_analytics_summary()
+    assert published == _legacy_results() and refreshed is True
+    # Rows loaded behind the summary's back show up at the next reconcile.
+    insert_records(_records(count=40, seed=3)[20:])
+    assert query_data.reconcile_analytics_summary() == (published, False)
+    assert query_data.reconcile_analytics_summary(max_age=0) == (_legacy_results(), True)
+
+
+def test_wrappers_match_engine(insert_records):
+    insert_records(_records(count=60))
+    results = query_data.build_analysis_results()
+    year = results["year_2026"]
+    assert query_data.count_total_applicants() == results["total_applicants"]
+    assert query_data.count_fall_2026_entries(True) == year["fall_2026_count"]
+    assert query_data.percent_international_students(True) == year["percent_international"]
+    assert query_data.average_metrics_all_applicants(True) == year["average_metrics"]
+    assert query_data.avg_gpa_american_fall_2026(False) == results["all_time"]["avg_gpa_american_fall_2026"]
+    assert query_data.acceptance_rate_fall_2026(True) == year["acceptance_rate_fall_2026"]
+    assert query_data.avg_gpa_acceptances_fall_2026(True) == year["avg_gpa_acceptances_fall_2026"]
+    assert query_data.count_jhu_masters_cs(True) == year["jhu_masters_cs"]
+    assert (
+        query_data.count_top_phd_acceptances_2026_raw_university(True)
+        == year["top_phd_acceptances_2026_raw"]
+    )
+    assert query_data.count_top_phd_acceptances_2026_llm(True) == year["top_phd_acceptances_2026_llm"]
+    assert query_data.additional_question_1(True) == year["additional_question_1"]
+    assert query_data.additional_question_2(True) == year["additional_question_2"]
+
+
+@pytest.mark.parametrize(
+    "total, count, expected",
+    [
+        (0.0, 0, None),
+        (0.0, 3, None),  # an average of exactly 0.00 renders as None, like before
+        (3.125, 1, 3.13),  # half rounds away from zero
+        (10.0, 3, 3.33),
+    ],
+)
+def test_average_rounding(total, count, expected):
+    assert query_data._average(total, count) == expected
+
+
+def test_wrapper_queries_only_needed_primitives(monkeypatch):
+    queried = []
+    real = query_data._metrics_query
+
+    def _recording(scopes, names=None, p_ids=None):
+        stmt, params, columns = real(scopes, names, p_ids)
+        queried.append(columns)
+        return stmt, params, columns
+
+    monkeypatch.setattr(query_data, "_metrics_query", _recording)
+    assert query_data.count_total_applicants() == 0
+    assert query_data.acceptance_rate_fall_2026(True) == 0.0
+    assert queried == [
+        [("all_time", "total")],
+        [("year_2026", "total"), ("year_2026", "accepted")],
+    ]
+
+
+@pytest.mark.parametrize(
+    "total, delta, expected",
+    [(None, 2.5, 2.5), (4.0, None, 4.0), (None, None, None), (3, 2, 5)],
+)
+def test_merge_treats_null_sums_as_empty(total, delta, expected):
+    assert query_data._merge(total, delta) == expected
+
+
+@pytest.mark.parametrize("seed", [7, 11, 2026])
+def test_columnar_engine_matches_sql(insert_records, seed):
+    insert_records(_records(seed=seed))
+    snapshot = columnar.ColumnarSnapshot()
+    assert snapshot.refresh() == 400
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+
+def test_columnar_primitives_match_sql_primitives(insert_records):
+    insert_records(_records(seed=3))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    expected = query_data.fetch_primitives()
+    actual = snapshot.primitives()
+    for scope, values in expected.items():
+        assert set(actual[scope]) == set(values)
+        for name, value in values.items():
+            assert actual[scope][name] == pytest.approx(value), (scope, name)
+
+
+def test_columnar_empty_table_matches_sql():
+    snapshot = columnar.ColumnarSnapshot()
+    assert snapshot.refresh() == 0
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+
+def test_columnar_refresh_appends_past_watermark(insert_records):
+    insert_records(_records(count=100, seed=8))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    first_watermark = snapshot.watermark
+    before = snapshot.columns
+    insert_records(_records(count=150, seed=9)[100:])
+    assert snapshot.refresh() == 50
+    assert snapshot.watermark > first_watermark
+    assert len(snapshot) == 150
+    # The refresh swapped in a new bundle; a reader's old one is unchanged.
+    assert len(before) == 100 and before.watermark == first_watermark
+    assert snapshot.refresh() == 0
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+
+def _execute(statement, params=None):
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        conn.execute(statement, params)
+
+
+def test_columnar_refresh_reloads_when_rows_change_below_watermark(insert_records):
+    insert_records(_records(count=100, seed=8))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    _execute("DELETE FROM applicants WHERE p_id IN (10, 20)")
+    assert snapshot.refresh() == 98
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+    # A row that commits with a p_id under the watermark (out of order).
+    row = _records(count=101, seed=8)[100]
+    _execute(
+        "INSERT INTO applicants (p_id, url, status, gpa) VALUES (10, %s, 'Accepted', 3.5)",
+        (row["url"],),
+    )
+    assert snapshot.refresh() == 99
+    assert 10 in snapshot.columns.p_id
+    assert snapshot.refresh() == 0
+
+
+def test_columnar_refresh_reloads_truncated_table(insert_records):
+    insert_records(_records(count=100, seed=8))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    # Same p_ids and row count, different rows: only the filenode tells.
+    _execute("TRUNCATE applicants RESTART IDENTITY")
+    insert_records(_records(count=100, seed=13))
+    assert snapshot.refresh() == 100
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+
+def test_columnar_refresh_reloads_after_max_age(insert_records):
+    insert_records(_records(count=50, seed=8))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    _execute("UPDATE applicants SET gpa = 4.0")
+    # Updates are invisible to the watermark until the next full load.
+    assert snapshot.refresh() == 0
+    assert snapshot.refresh(max_age=0) == 50
+    assert query_data.assemble_results(snapshot.primitives()) == _legacy_results()
+
+
+def test_columnar_ad_hoc_filter(insert_records):
+    insert_records(_records(count=200, seed=12))
+    snapshot = columnar.ColumnarSnapshot()
+    snapshot.refresh()
+    columns = snapshot.columns
+    mask = columns.ilike("degree", "%PhD%") & ~columns.equals("term", "Spring")
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        expected = conn.execute(
+            "SELECT COUNT(*), COUNT(gpa) FROM applicants "
+            "WHERE degree ILIKE '%%PhD%%' AND NOT (term IS NOT NULL AND term = 'Spring')"
+        ).fetchone()
+    scoped = columns.primitives(mask)["all_time"]
+    assert (scoped["total"], scoped["gpa_n"]) == expected
+
+
+def test_like_regex_wildcards():
+    assert columnar._like_regex("a_c%").fullmatch("ABCdef")
+    assert not columnar._like_regex("a.c").fullmatch("abc")
+
+
+def test_build_analysis_results_numpy_backend(insert_records, monkeypatch):
+    insert_records(_records(count=80, seed=4))
+    columnar.reset_snapshot()
+    monkeypatch.setattr(query_data, "ANALYTICS_BACKEND", "numpy")
+    try:
+        assert query_data.build_analysis_results() == _legacy_results()
+        # The process-wide snapshot is reused and topped up.
+        assert columnar.get_snapshot() is columnar.get_snapshot()
+    finally:
+        columnar.reset_snapshot()
+    with pytest.raises(ValueError):
+        query_data.build_analysis_results(backend="duckdb")
+
+
+def _legacy_cohort(monkeypatch, term, year):
+    # The per-metric SQL with the hard-coded cohort swapped for (term, year).
+    monkeypatch.setattr(query_data, "FALL_TERM", term)
+    monkeypatch.setattr(query_data, "YEAR_START", f"{year}-01-01")
+    monkeypatch.setattr(query_data, "YEAR_END", f"{year}-12-31")
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            return _legacy_scope(cur, True)
+
+
+def test_cohort_results_match_per_cohort_sql(insert_records, monkeypatch):
+    insert_records(_records(seed=21))
+    cohorts = [("Fall", 2026), ("Fall", 2025), ("Spring", 2026), ("summer", 2024), ("Fall", 2030)]
+    fetched = []
+    real = query_data.fetch_cohort_primitives
+    monkeypatch.setattr(
+        query_data, "fetch_cohort_primitives", lambda c: fetched.append(list(c)) or real(c)
+    )
+    results = query_data.cohort_results(cohorts)
+    assert fetched == [cohorts]  # one grouped scan for every cohort
+
+    legacy_all_time = _legacy_results()["all_time"]
+    for term, year in cohorts:
+        assert results[(term, year)] == _legacy_cohort(monkeypatch, term, year), (term, year)
+    monkeypatch.undo()
+    all_time = query_data._finish_scope(query_data.fetch_cohort_primitives(cohorts)["all_time"])
+    assert {"total_entries": all_time.pop("count"), **all_time} == legacy_all_time
+
+
+def test_cohort_results_cached_per_data_version(insert_records, monkeypatch):
+    insert_records(_records(count=50, seed=22))
+    query_data._COHORT_CACHE.clear()
+    fetched = []
+    real = query_data.fetch_cohort_primitives
+    monkeypatch.setattr(
+        query_data, "fetch_cohort_primitives", lambda c: fetched.append(list(c)) or real(c)
+    )
+    first = query_data.cohort_results()
+    assert query_data.cohort_results([query_data.DEFAULT_COHORT, ("Fall", 2025)]) != {}
+    assert fetched == [[query_data.DEFAULT_COHORT], [("Fall", 2025)]]
+
+    # Cached until applicants changes; then recomputed for the new version.
+    assert query_data.cohort_results() == first
+    insert_records(_records(count=80, seed=23)[50:])
+    query_data.cohort_results()
+    assert fetched[-1] == [query_data.DEFAULT_COHORT]
+    assert all(key[0] == query_data.data_version() for key in query_data._COHORT_CACHE)
+
+
+def test_data_version_follows_rows_and_summary_only(insert_records):
+    assert query_data.data_version() == (None, None)
+    insert_records(_records(count=10))
+    inserted = query_data.data_version()
+    assert inserted[0] is not None and inserted[1] is None
+
+    query_data.refresh_analytics_summary()
+    refreshed = query_data.data_version()
+    assert refreshed[0] == inserted[0] and refreshed[1] is not None
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        # A pull batch folding rows in moves the summary timestamp...
+        assert query_data.apply_analytics_delta(conn, [inserted[0]]) is True
+        folded = query_data.data_version()
+        assert folded[1] > refreshed[1]
+        # ...but pull heartbeats leave the version alone.
+        conn.execute("INSERT INTO pull_jobs (status) VALUES ('running')")
+        conn.execute("UPDATE pull_jobs SET updated_at = NOW() + INTERVAL '1 minute'")
+    assert query_data.data_version() == folded
+
+
+def _percentile_cont(values, fraction):
+    # PostgreSQL's linear interpolation between the closest ranks.
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    if lower + 1 == len(values):
+        return values[lower]
+    return values[lower] + (values[lower + 1] - values[lower]) * (position - lower)
+
+
+def _expected_distribution(column, values):
+    _, low, high, buckets = query_data.DISTRIBUTION_COLUMNS[column]
+    values = sorted(v for v in values if v is not None)
+    width = (high - low) / buckets
+    counts = [0] * buckets
+    for value in values:
+        if low <= value <= high:
+            counts[min(int((value - low) / width), buckets - 1)] += 1
+    return {
+        "n": len(values),
+        "percentiles": [
+            round(_percentile_cont(values, f), 2) if values else None
+            for f in query_data.PERCENTILES
+        ],
+        "counts": counts,
+        "below": sum(v < low for v in values),
+        "above": sum(v > high for v in values),
+    }
+
+
+def _status_key(status):
+    status = (status or "").lower()
+    for key in query_data.STATUS_GROUPS:
+        if status.startswith(key[:4]):
+            return key
+    return "other"
+
+
+def test_distributions_match_python(insert_records):
+    records = _records(seed=31)
+    # Out-of-range scores (old GRE scale, GPA above 4) land in "above".
+    records[0].update(gre=320.0, gpa=4.3)
+    records[1].update(gre_aw=None, gpa=None)
+    insert_records(records)
+    clause, params = query_data._term_filter(True)
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        rows = conn.execute(
+            f"SELECT COALESCE({clause}, FALSE), status, gpa, gre, gre_v, gre_aw FROM applicants",
+            params,
+        ).fetchall()
+
+    dists = query_data.fetch_distributions()
+    groups = {}
+    for in_cohort, status, *scores in rows:
+        keys = [("all_time", None), ("all_time", _status_key(status))]
+        if in_cohort:
+            keys += [("year_2026", None), ("year_2026", _status_key(status))]
+        for key in keys:
+            groups.setdefault(key, []).append(scores)
+    assert set(dists["all_time"]["by_status"]) == {k for s, k in groups if k and s == "all_time"}
+    for (scope, status), members in groups.items():
+        got = dists[scope]["all"] if status is None else dists[scope]["by_status"][status]
+        for index, column in enumerate(query_data.DISTRIBUTION_COLUMNS):
+            expected = _expected_distribution(column, [m[index] for m in members])
+            dist = got[column]
+            assert dist["n"] == expected["n"]
+            assert list(dist["percentiles"].values()) == expected["percentiles"]
+            assert dist["histogram"]["counts"] == expected["counts"], (scope, status, column)
+            assert dist["histogram"]["below"] == expected["below"]
+            assert dist["histogram"]["above"] == expected["above"]
+    assert dists["all_time"]["all"]["gre"]["histogram"]["above"] == 1
+    assert dists["all_time"]["all"]["gpa"]["histogram"]["edges"][-1] == 4.0
+    assert list(dists["all_time"]["all"]["gpa"]["percentiles"]) == ["p10", "p25", "p50", "p75", "p90"]
+
+
+def test_distributions_on_empty_table():
+    dists = query_data.fetch_distributions()
+    for scope in query_data.SCOPES:
+        assert dists[scope]["by_status"] == {}
+        gpa = dists[scope]["all"]["gpa"]
+        assert gpa["n"] == 0
+        assert set(gpa["percentiles"].values()) == {None}
+        assert gpa["histogram"]["counts"] == [0] * 8
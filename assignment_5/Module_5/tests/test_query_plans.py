@@ -0,0 +1,147 @@
+"""
+Query-plan tests for the analytics indexes.
+
+Loads 1M synthetic rows, then runs the dashboard's cohort queries through a
+cursor that EXPLAINs each statement before executing it, and checks that no
+plan falls back to a sequential scan over applicants.
+
+Loading the rows takes tens of seconds, so these tests only run when
+RUN_PLAN_TESTS=1 is set.
+"""
+
+import os
+
+import psycopg
+import pytest
+from psycopg import sql
+
+from db.db_config import get_db_config
+from M3_material import query_data
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(
+        os.getenv("RUN_PLAN_TESTS") != "1", reason="set RUN_PLAN_TESTS=1 to run plan tests"
+    ),
+]
+
+ROW_COUNT = 1_000_000
+
+
+class ExplainingCursor:
+    # Cursor proxy that records the JSON plan of each statement, then runs it.
+    def __init__(self, cur, plans):
+        self._cur = cur
+        self._plans = plans
+
+    def execute(self, stmt, params=None):
+        self._cur.execute(sql.SQL("EXPLAIN (FORMAT JSON) ") + stmt, params)
+        self._plans.append(self._cur.fetchone()[0][0]["Plan"])
+        self._cur.execute(stmt, params)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class ExplainingConnection:
+    def __init__(self, conn, plans):
+        self._conn = conn
+        self._plans = plans
+
+    def cursor(self):
+        return ExplainingCursor(self._conn.cursor(), self._plans)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def _node_types(plan):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from _node_types(child)
+
+
+def _load_rows():
+    # Spread rows over 2000-2026 so the 2026 cohort is a small slice, the way
+    # the real table grows year over year.
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO applicants (
+                    program, url, date_added, acceptance_date, status, term,
+                    us_or_international, gpa, gre, gre_v, gre_aw, degree,
+                    llm_generated_program, llm_generated_university
+                )
+                SELECT
+                    CASE WHEN i %% 50 = 0 THEN 'Johns Hopkins University, Computer Science'
+                         ELSE 'Program ' || (i %% 997) || ', University ' || (i %% 211) END,
+                    'https://www.thegradcafe.com/result/' || i,
+                    DATE '2000-01-01' + (i %% 9855),
+                    CASE WHEN i %% 3 = 0 THEN DATE '2000-01-01' + (i %% 9855) + 30 END,
+                    (ARRAY['accepted', 'rejected', 'waitlisted', 'interview'])[1 + i %% 4],
+                    (ARRAY['Fall', 'Spring', 'Summer'])[1 + i %% 3],
+                    (ARRAY['American', 'International', 'Other'])[1 + i %% 3],
+                    2.5 + (i %% 150) / 100.0,
+                    140 + i %% 31,
+                    140 + i %% 29,
+                    3 + (i %% 7) / 2.0,
+                    (ARRAY['Masters', 'PhD'])[1 + i %% 2],
+                    'Computer Science',
+                    'University ' || (i %% 211)
+                FROM generate_series(1, %s) AS i
+                """,
+                (ROW_COUNT,),
+            )
+            cur.execute("ANALYZE applicants")
+
+
+@pytest.fixture()
+def explained(monkeypatch):
+    # Route query_data through the EXPLAIN proxy and collect plans per call.
+    plans = []
+    conn = psycopg.connect(**get_db_config(), autocommit=True)
+    monkeypatch.setattr(
+        query_data, "get_connection", lambda: ExplainingConnection(conn, plans)
+    )
+    yield plans
+    conn.close()
+
+
+def test_cohort_queries_use_indexes_at_scale(explained):
+    _load_rows()
+    cohort_queries = [
+        query_data.count_fall_2026_entries,
+        query_data.percent_international_students,
+        query_data.average_metrics_all_applicants,
+        query_data.avg_gpa_american_fall_2026,
+        query_data.acceptance_rate_fall_2026,
+        query_data.avg_gpa_acceptances_fall_2026,
+        query_data.count_jhu_masters_cs,
+        query_data.count_top_phd_acceptances_2026_raw_university,
+        query_data.count_top_phd_acceptances_2026_llm,
+        query_data.additional_question_1,
+        query_data.additional_question_2,
+    ]
+    for query in cohort_queries:
+        explained.clear()
+        query(True)
+        assert explained, query.__name__
+        for plan in explained:
+            nodes = list(_node_types(plan))
+            assert "Seq Scan" not in nodes, (query.__name__, nodes)
+
+    # The latest-ID lookup reads the result_id index end instead of the table.
+    explained.clear()
+    assert query_data.get_latest_db_id() == ROW_COUNT
+    assert "Seq Scan" not in list(_node_types(explained[0]))
+
@@ -68,6 +68,22 @@ def test_generate_pdf_report(tmp_path):
     assert data.startswith(b"%PDF")
 
 
+def test_generate_pdf_report_with_distributions(tmp_path):
+    from M3_material import query_data
+
+    dists = {"year_2026": {"all": query_data._empty_distributions(), "by_status": {}}}
+    dists["year_2026"]["by_status"]["accepted"] = query_data._empty_distributions()
+    out_path = tmp_path / "report.pdf"
+    reporting.generate_pdf_report(
+        {"total_applicants": 0, "year_2026": {}, "all_time": {}, "distributions": dists},
+        str(out_path),
+    )
+    data = out_path.read_bytes()
+    assert b"Score Distributions \\(2026 Cohort\\)" in data
+    assert b"Score Distributions \\(All Entries\\)" not in data
+    assert b"Median \\(accepted\\)" in data
+
+
 def test_generate_pdf_report_cwd_path():
     # Writing to a filename without a directory should succeed.
     reporting.generate_pdf_report({"total_applicants": 0, "year_2026": {}, "all_time": {}}, "tmp_report.pdf")
@@ -0,0 +1,93 @@
+"""
+Tests for the data-version-keyed analysis cache in M3_material.result_cache.
+"""
+
+import json
+
+import pytest
+
+from M3_material import result_cache
+
+pytestmark = pytest.mark.analysis
+
+RESULTS = {"year_2026": {}, "all_time": {}, "total_applicants": 3}
+
+
+@pytest.fixture(autouse=True)
+def _empty_tier():
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+def test_read_hits_only_for_matching_version(tmp_path):
+    path = str(tmp_path / "cache.json")
+    stored = result_cache.write(path, RESULTS, (10, 3, None))
+    assert stored["_meta"]["data_version"] == [10, 3, None]
+    # Served from the in-process tier without parsing the file.
+    assert result_cache.read(path, (10, 3, None)) is stored
+
+    result_cache.clear()
+    assert result_cache.read(path, [10, 3, None])["total_applicants"] == 3
+    # A pull that added rows changes the token: the cache misses.
+    assert result_cache.read(path, (11, 4, None)) is None
+    # Without a token any valid cache is served.
+    assert result_cache.read(path)["total_applicants"] == 3
+
+
+def test_read_rejects_missing_or_malformed_files(tmp_path):
+    path = tmp_path / "cache.json"
+    assert result_cache.read(str(path), (1, 1, None)) is None
+    path.write_text("not json")
+    assert result_cache.read(str(path)) is None
+    path.write_text(json.dumps({"year_2026": {}}))
+    assert result_cache.read(str(path)) is None
+    # A directory stats fine but cannot be opened.
+    assert result_cache.read(str(tmp_path)) is None
+
+
+def test_read_sees_files_replaced_by_other_writers(tmp_path):
+    path = tmp_path / "cache.json"
+    result_cache.write(str(path), RESULTS, (1, 1, None))
+    # Another process publishes new results for new data.
+    other = {**RESULTS, "total_applicants": 9, "_meta": {"data_version": [2, 2, None]}}
+    result_cache.atomic_write_json(str(path), other)
+    assert result_cache.read(str(path), (2, 2, None))["total_applicants"] == 9
+    assert result_cache.read(str(path), (1, 1, None)) is None
+
+
+def test_torn_file_serves_last_good_copy(tmp_path):
+    path = tmp_path / "cache.json"
+    stored = result_cache.write(str(path), RESULTS, (1, 1, None))
+    path.write_text('{"year_2026": {}, "all_ti')
+    assert result_cache.read(str(path), (1, 1, None)) is stored
+
+
+def test_writes_are_compact_unless_indented(tmp_path):
+    path = tmp_path / "cache.json"
+    result_cache.write(str(path), RESULTS, (1, 1, None))
+    assert "\n" not in path.read_text() and ": " not in path.read_text()
+    result_cache.atomic_write_json(str(path), {"a": [1]}, indent=2)
+    assert path.read_text() == '{\n  "a": [\n    1\n  ]\n}'
+    result_cache.atomic_write_text(str(tmp_path / "id.txt"), "42")
+    assert (tmp_path / "id.txt").read_text() == "42"
+
+
+def test_atomic_write_leaves_previous_file_on_failure(tmp_path):
+    path = tmp_path / "cache.json"
+    result_cache.atomic_write_json(str(path), {"ok": 1})
+    circular = []
+    circular.append(circular)
+    with pytest.raises(ValueError):
+        result_cache.atomic_write_json(str(path), circular)
+    assert json.loads(path.read_text()) == {"ok": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+
+
+def test_atomic_write_cleanup_tolerates_missing_temp(tmp_path, monkeypatch):
+    from db import atomic_io
+
+    monkeypatch.setattr(atomic_io.os, "replace", lambda *a: (_ for _ in ()).throw(OSError("x")))
+    monkeypatch.setattr(atomic_io.os, "remove", lambda *a: (_ for _ in ()).throw(OSError("y")))
+    with pytest.raises(OSError):
+        result_cache.atomic_write_json(str(tmp_path / "cache.json"), {})
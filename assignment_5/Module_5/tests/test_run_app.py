@@ -79,6 +79,7 @@ def test_start_llm_server_launches(monkeypatch, tmp_path):
     run.LLM_PROCESS = None
     run._start_llm_server()
     assert isinstance(run.LLM_PROCESS, DummyProc)
+    assert run.LLM_OWNER_PID == run.os.getpid()
 
 
 def test_start_llm_server_reports_failed_launch(monkeypatch, tmp_path, capsys):
@@ -101,52 +102,6 @@ def test_start_llm_server_reports_failed_launch(monkeypatch, tmp_path, capsys):
     assert "failed to start" in out.lower()
 
 
-def test_wait_for_llm_ready_true(monkeypatch):
-    # Return a mock response with status 200 to simulate readiness.
-    class DummyResp:
-        status = 200
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-        def read(self):
-            return b""
-
-    monkeypatch.setattr(run.urllib.request, "urlopen", lambda *args, **kwargs: DummyResp())
-    assert run._wait_for_llm_ready(timeout_seconds=1) is True
-
-
-def test_wait_for_llm_ready_false_on_error(monkeypatch):
-    # Force urlopen to raise an error so the readiness loop fails fast.
-    def _raise(*args, **kwargs):
-        raise run.urllib.error.URLError("fail")
-
-    monkeypatch.setattr(run.urllib.request, "urlopen", _raise)
-    # Use a zero timeout to avoid sleeping during the test.
-    assert run._wait_for_llm_ready(timeout_seconds=0) is False
-
-
-def test_wait_for_llm_ready_sleeps_on_exception(monkeypatch):
-    # Exercise the exception + sleep branch once.
-    def _raise(*args, **kwargs):
-        raise run.urllib.error.URLError("fail")
-
-    sleep_calls = {"count": 0}
-
-    monkeypatch.setattr(run.urllib.request, "urlopen", _raise)
-    monkeypatch.setattr(run.time, "sleep", lambda *_: sleep_calls.update(count=sleep_calls["count"] + 1))
-
-    # First call sets deadline, second enters loop, third exits.
-    times = iter([0.0, 0.0, 2.0])
-    monkeypatch.setattr(run.time, "time", lambda: next(times))
-
-    assert run._wait_for_llm_ready(timeout_seconds=1) is False
-    assert sleep_calls["count"] == 1
-
-
 def test_stop_llm_server_terminates(monkeypatch):
     # Provide a fake process to ensure terminate() is called.
     calls = {"terminated": 0}
@@ -159,30 +114,60 @@ def test_stop_llm_server_terminates(monkeypatch):
             calls["terminated"] += 1
 
     run.LLM_PROCESS = DummyProc()
+    run.LLM_OWNER_PID = run.os.getpid()
+    run._stop_llm_server()
+    assert calls["terminated"] == 1
+
+    # A forked web worker exiting must not stop the LLM its parent launched.
+    run.LLM_OWNER_PID = -1
     run._stop_llm_server()
     assert calls["terminated"] == 1
 
 
+def test_main_serves_without_waiting_for_llm(monkeypatch):
+    # Production mode launches the LLM and hands straight over to the server.
+    calls = []
+    monkeypatch.setattr(run, "_start_llm_server", lambda: calls.append("llm"))
+    monkeypatch.setattr(run.serving, "serve", lambda *a: calls.append(a))
+
+    run.main(["--port", "9000", "--workers", "3", "--threads", "2", "--server", "prefork"])
+    assert calls == ["llm", (run.app, run.WEB_HOST, 9000, 3, 2, "prefork")]
+
+
+def test_main_dev_mode(monkeypatch):
+    # --dev runs the debug server; the LLM starts only in the reloader child.
+    calls = []
+    monkeypatch.setattr(run, "_start_llm_server", lambda: calls.append("llm"))
+    monkeypatch.setattr(run.app, "run", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(run.serving, "serve", lambda *a: pytest.fail("must not serve"))
+
+    monkeypatch.delenv("WERKZEUG_RUN_MAIN", raising=False)
+    run.main(["--dev"])
+    monkeypatch.setenv("WERKZEUG_RUN_MAIN", "true")
+    run.main(["--dev", "--port", "9001"])
+    assert calls == [
+        {"debug": True, "host": run.WEB_HOST, "port": run.WEB_PORT},
+        "llm",
+        {"debug": True, "host": run.WEB_HOST, "port": 9001},
+    ]
+
+
 def test_run_main_block(monkeypatch):
     # Execute run.py as __main__ to cover the entrypoint logic.
     import runpy
     import os
     import socket
-    import urllib.request
-    import time as time_mod
-    import flask
+    import sys
 
-    # Avoid real server start and long waits.
-    monkeypatch.setattr(flask.Flask, "run", lambda *a, **k: None)
+    import serving
+
+    served = []
+    # Avoid a real server start and LLM launch.
+    monkeypatch.setattr(serving, "serve", lambda *a: served.append(a))
     monkeypatch.setattr(socket, "create_connection", lambda *a, **k: (_ for _ in ()).throw(OSError("closed")))
     monkeypatch.setattr(os.path, "isdir", lambda *_: False)
-
-    # Force /ready checks to fail quickly.
-    monkeypatch.setattr(urllib.request, "urlopen", lambda *a, **k: (_ for _ in ()).throw(run.urllib.error.URLError("fail")))
-    t0 = time_mod.time()
-    times = iter([t0, t0 + 200])
-    monkeypatch.setattr(time_mod, "time", lambda: next(times))
-    monkeypatch.setattr(time_mod, "sleep", lambda *_: None)
+    monkeypatch.setattr(sys, "argv", ["run.py"])
 
     root = Path(__file__).resolve().parents[1]
     runpy.run_path(str(root / "src" / "run.py"), run_name="__main__")
+    assert len(served) == 1
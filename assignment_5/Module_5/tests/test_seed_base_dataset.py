@@ -1,17 +1,65 @@
 """
 Tests for the base dataset seeding helper.
 
-These are focused unit tests that avoid real database access by mocking
-psycopg connections and file checks.
+The guard-clause tests avoid the database entirely; the fingerprint tests
+seed small JSONL files into the real test database.
 """
 
+import json
+import os
+
 import pytest
+import psycopg
 
 from db import import_extra_data
+from db.db_config import get_db_config
 
 pytestmark = pytest.mark.db
 
 
+def _raw(entry_id, **overrides):
+    # Minimal raw GradCafe-style record; normalize_records fills the rest.
+    record = {
+        "url": f"https://www.thegradcafe.com/result/{entry_id}",
+        "program": "Computer Science, Test University",
+        "applicant_status": "Accepted",
+    }
+    record.update(overrides)
+    return record
+
+
+def _write_jsonl(path, records, mode="w"):
+    with open(path, mode, encoding="utf-8") as file_handle:
+        for record in records:
+            file_handle.write(json.dumps(record) + "\n")
+
+
+def _applicant_count():
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM applicants")
+            return cur.fetchone()[0]
+
+
+def _fingerprint(path):
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            return import_extra_data._read_seed_fingerprint(cur, os.path.abspath(path))
+
+
+@pytest.fixture()
+def seeding(monkeypatch):
+    # Return a helper that enables seeding inside pytest and re-arms the
+    # per-process flag, simulating a fresh process for each call.
+    def _seed(path):
+        monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+        import_extra_data._BASE_SEEDED = False
+        return import_extra_data.seed_base_dataset(str(path))
+
+    monkeypatch.setattr(import_extra_data, "_BASE_SEEDED", False)
+    return _seed
+
+
 def test_seed_base_dataset_skips_when_already_seeded(monkeypatch):
     monkeypatch.setattr(import_extra_data, "_BASE_SEEDED", True)
     monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
@@ -25,64 +73,118 @@ def test_seed_base_dataset_skips_missing_path(monkeypatch):
     assert import_extra_data.seed_base_dataset("missing.jsonl") == 0
 
 
-def test_seed_base_dataset_no_records(monkeypatch):
-    monkeypatch.setattr(import_extra_data, "_BASE_SEEDED", False)
-    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
-    monkeypatch.setattr(import_extra_data.os.path, "exists", lambda *_: True)
-    monkeypatch.setattr(import_extra_data, "load_records", lambda *_: [{"url": None}])
-    monkeypatch.setattr(import_extra_data, "normalize_records", lambda records: records)
+def test_seed_base_dataset_records_fingerprint(seeding, tmp_path):
+    path = tmp_path / "base.jsonl"
+    # Records without a URL are skipped but still counted in the fingerprint.
+    _write_jsonl(path, [_raw(1), _raw(2), {"program": "No URL"}])
+
+    assert seeding(path) == 2
+    assert import_extra_data._BASE_SEEDED is True
+    assert _applicant_count() == 2
+
+    stored = _fingerprint(path)
+    assert stored["size_bytes"] == path.stat().st_size
+    assert stored["row_count"] == 3
+    assert stored["content_hash"] == import_extra_data._hash_source(str(path))[0]
 
-    called = {"connect": 0}
 
-    def _connect(**_):
-        called["connect"] += 1
-        raise AssertionError("connect should not be called when no records exist")
+def test_seed_base_dataset_skips_unchanged_file(seeding, tmp_path, monkeypatch):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1)])
+    assert seeding(path) == 1
 
-    monkeypatch.setattr(import_extra_data.psycopg, "connect", _connect)
-    assert import_extra_data.seed_base_dataset("data.jsonl") == 0
+    # A matching size/mtime must not even read the file.
+    def _fail(*_):
+        raise AssertionError("unchanged source should not be read")
+
+    monkeypatch.setattr(import_extra_data, "_hash_source", _fail)
+    monkeypatch.setattr(import_extra_data, "load_records", _fail)
+    assert seeding(path) == 0
     assert import_extra_data._BASE_SEEDED is True
-    assert called["connect"] == 0
 
 
-def test_seed_base_dataset_inserts_records(monkeypatch):
-    monkeypatch.setattr(import_extra_data, "_BASE_SEEDED", False)
-    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
-    monkeypatch.setattr(import_extra_data.os.path, "exists", lambda *_: True)
-    monkeypatch.setattr(import_extra_data, "load_records", lambda *_: ["raw"])
-    records = [{"url": "https://example.com/result/1"}]
-    monkeypatch.setattr(import_extra_data, "normalize_records", lambda *_: records)
-    monkeypatch.setattr(import_extra_data, "get_db_config", lambda: {})
+def test_seed_base_dataset_touched_file_only_updates_fingerprint(seeding, tmp_path, monkeypatch):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1)])
+    assert seeding(path) == 1
 
-    class DummyCursor:
-        def __init__(self):
-            self.executed = None
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 60))
 
-        def executemany(self, stmt, rows):
-            self.executed = (stmt, rows)
+    def _fail(*_):
+        raise AssertionError("identical content should not be parsed")
 
-        def __enter__(self):
-            return self
+    monkeypatch.setattr(import_extra_data, "load_records", _fail)
+    assert seeding(path) == 0
+    stored = _fingerprint(path)
+    assert stored["mtime"] == path.stat().st_mtime
+    assert stored["row_count"] == 1
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
 
-    class DummyConn:
-        def __init__(self, cursor):
-            self._cursor = cursor
+def test_seed_base_dataset_loads_only_appended_tail(seeding, tmp_path, monkeypatch):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1), _raw(2)])
+    assert seeding(path) == 2
 
-        def cursor(self):
-            return self._cursor
+    _write_jsonl(path, [_raw(3)], mode="a")
 
-        def __enter__(self):
-            return self
+    def _fail(*_):
+        raise AssertionError("appended files should not be fully reloaded")
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    monkeypatch.setattr(import_extra_data, "load_records", _fail)
+    assert seeding(path) == 1
+    assert _applicant_count() == 3
+    assert _fingerprint(path)["row_count"] == 3
 
-    cursor = DummyCursor()
-    monkeypatch.setattr(import_extra_data.psycopg, "connect", lambda **_: DummyConn(cursor))
 
-    count = import_extra_data.seed_base_dataset("data.jsonl")
-    assert count == 1
-    assert import_extra_data._BASE_SEEDED is True
-    assert cursor.executed is not None
+def test_seed_base_dataset_bad_tail_falls_back_to_full_load(seeding, tmp_path, monkeypatch):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1)])
+    assert seeding(path) == 1
+
+    with open(path, "a", encoding="utf-8") as file_handle:
+        file_handle.write("not json\n")
+    monkeypatch.setattr(import_extra_data, "load_records", lambda *_: [_raw(1), _raw(2)])
+
+    assert seeding(path) == 2
+    assert _applicant_count() == 2
+    assert _fingerprint(path)["row_count"] == 2
+
+
+def test_seed_base_dataset_rewritten_file_reloads(seeding, tmp_path):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1)])
+    assert seeding(path) == 1
+
+    # Same length, different bytes: the prefix no longer matches.
+    _write_jsonl(path, [_raw(2)])
+    assert seeding(path) == 1
+    assert _applicant_count() == 2
+
+
+def test_seed_base_dataset_reloads_after_table_emptied(seeding, tmp_path):
+    path = tmp_path / "base.jsonl"
+    _write_jsonl(path, [_raw(1)])
+    assert seeding(path) == 1
+
+    with psycopg.connect(**get_db_config(), autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE applicants RESTART IDENTITY")
+
+    assert seeding(path) == 1
+    assert _applicant_count() == 1
+
+
+def test_hash_source_prefix_longer_than_file(tmp_path):
+    path = tmp_path / "small.jsonl"
+    path.write_bytes(b"abc")
+    full, prefix = import_extra_data._hash_source(str(path), prefix_size=10)
+    assert full == prefix
+
+
+def test_load_jsonl_tail_skips_blank_lines(tmp_path):
+    from db.normalize import load_jsonl_tail
+
+    path = tmp_path / "tail.jsonl"
+    path.write_text('{"a": 1}\n\n{"b": 2}\n')
+    assert load_jsonl_tail(str(path), len('{"a": 1}\n')) == [{"b": 2}]
@@ -0,0 +1,242 @@
+"""
+Tests for the production WSGI serving helpers (src/serving.py).
+
+Forks, signals and sockets are monkeypatched so no worker processes start;
+one test serves real HTTP from a pre-bound socket like a forked worker does.
+"""
+
+import socket
+import threading
+import urllib.request
+
+import pytest
+from flask import Flask
+
+import serving
+
+pytestmark = pytest.mark.web
+
+
+class _Exit(Exception):
+    """Stands in for os._exit so the worker code returns to the test."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def _raise_exit(code):
+    raise _Exit(code)
+
+
+def test_init_worker_resets_process_state(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serving.pool, "get_pool", lambda: calls.append("pool"))
+    monkeypatch.setattr(serving.result_cache, "clear", lambda: calls.append("results"))
+    monkeypatch.setattr(serving.columnar, "reset_snapshot", lambda: calls.append("columnar"))
+    monkeypatch.setattr(serving.pages.LLM_MONITOR, "ready", lambda: calls.append("llm"))
+    app = Flask(__name__)
+    app.extensions.update(
+        m3_page_cache=object(), m3_progress_watcher=object(), m3_pull_state=object(), other=1
+    )
+
+    serving.init_worker(app)
+    assert calls == ["pool", "results", "columnar", "llm"]
+    assert app.extensions == {"other": 1}
+
+
+def test_pick_server(monkeypatch):
+    monkeypatch.setattr(serving, "BaseApplication", None)
+    with pytest.raises(ValueError):
+        serving.pick_server("uwsgi", 2)
+    with pytest.raises(RuntimeError):
+        serving.pick_server("gunicorn", 2)
+    assert serving.pick_server("auto", 2) == "prefork"
+    assert serving.pick_server("auto", 1) == "threaded"
+    assert serving.pick_server("threaded", 4) == "threaded"
+
+    monkeypatch.setattr(serving, "BaseApplication", object)
+    assert serving.pick_server("auto", 1) == "gunicorn"
+    assert serving.pick_server("prefork", 2) == "prefork"
+    # No fork (e.g. Windows): the prefork falls back to one threaded process.
+    monkeypatch.delattr(serving.os, "fork")
+    assert serving.pick_server("prefork", 2) == "threaded"
+
+
+def test_run_gunicorn_configures_workers(monkeypatch):
+    ran = []
+
+    class DummyConfig:
+        def __init__(self):
+            self.settings = {}
+
+        def set(self, key, value):
+            self.settings[key] = value
+
+    class DummyBase:
+        def __init__(self):
+            self.cfg = DummyConfig()
+            self.load_config()
+
+        def run(self):
+            ran.append((self.cfg.settings, self.load()))
+
+    monkeypatch.setattr(serving, "BaseApplication", DummyBase)
+    initialised = []
+    monkeypatch.setattr(serving, "init_worker", initialised.append)
+    app = Flask(__name__)
+
+    serving._run_gunicorn(app, "127.0.0.1", 9000, 3, 4)
+    settings, loaded = ran[0]
+    assert loaded is app
+    assert settings["bind"] == "127.0.0.1:9000"
+    assert (settings["workers"], settings["worker_class"], settings["threads"]) == (3, "gthread", 4)
+    # gunicorn calls post_fork in each new worker.
+    settings["post_fork"](None, None)
+    assert initialised == [app]
+
+
+def test_run_threaded_serves_from_shared_socket(monkeypatch):
+    # A worker serves the listening socket its parent bound.
+    app = Flask(__name__)
+    app.add_url_rule("/ping", "ping", lambda: "pong")
+    servers = []
+    make_server = serving.make_server
+
+    def _make_server(*args, **kwargs):
+        servers.append(make_server(*args, **kwargs))
+        return servers[-1]
+
+    monkeypatch.setattr(serving, "make_server", _make_server)
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        port = listener.getsockname()[1]
+        thread = threading.Thread(
+            target=serving._run_threaded,
+            args=(app, "127.0.0.1", port),
+            kwargs={"fd": listener.fileno()},
+            daemon=True,
+        )
+        thread.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ping", timeout=5) as resp:
+                assert resp.read() == b"pong"
+        finally:
+            servers[0].shutdown()
+            thread.join(5)
+    assert servers[0].multithread
+    assert serving._QuietHandler.log_request(None, 200) is None
+
+
+def test_worker_main_exits_with_status(monkeypatch, capsys):
+    signals = {}
+    monkeypatch.setattr(serving.signal, "signal", signals.__setitem__)
+    monkeypatch.setattr(serving.os, "_exit", _raise_exit)
+    calls = []
+    monkeypatch.setattr(serving, "init_worker", calls.append)
+    monkeypatch.setattr(serving, "_run_threaded", lambda *a, **k: calls.append((a, k)))
+
+    class Listener:
+        def fileno(self):
+            return 7
+
+    with pytest.raises(_Exit) as exc:
+        serving._worker_main("app", "h", 1, Listener())
+    assert exc.value.code == 0
+    assert calls == ["app", (("app", "h", 1), {"fd": 7})]
+    assert signals == {serving.signal.SIGINT: serving.signal.SIG_IGN,
+                       serving.signal.SIGTERM: serving.signal.SIG_DFL}
+
+    # A worker that fails prints the traceback and exits non-zero.
+    monkeypatch.setattr(serving, "_run_threaded", lambda *a, **k: (_ for _ in ()).throw(OSError("bad fd")))
+    with pytest.raises(_Exit) as exc:
+        serving._worker_main("app", "h", 1, Listener())
+    assert exc.value.code == 1
+    assert "bad fd" in capsys.readouterr().err
+
+
+class _Listener:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _patch_prefork(monkeypatch, forks, wait):
+    listener = _Listener()
+    handlers = {}
+    monkeypatch.setattr(serving.socket, "create_server", lambda *a, **k: listener)
+    monkeypatch.setattr(serving.signal, "signal", handlers.__setitem__)
+    monkeypatch.setattr(serving.os, "fork", lambda: next(forks))
+    monkeypatch.setattr(serving.os, "waitpid", lambda *_: wait(handlers))
+    return listener
+
+
+def test_prefork_replaces_failed_workers_and_stops(monkeypatch, capsys):
+    killed, sleeps = [], []
+
+    def _kill(pid, _sig):
+        if pid == 102:
+            raise ProcessLookupError(pid)
+        killed.append(pid)
+
+    waits = iter([
+        lambda handlers: (101, 256),
+        # SIGTERM arrives while the parent waits on its children.
+        lambda handlers: handlers[serving.signal.SIGTERM](serving.signal.SIGTERM, None) or (102, 0),
+        lambda handlers: (103, 15),
+    ])
+    monkeypatch.setattr(serving.os, "kill", _kill)
+    monkeypatch.setattr(serving.time, "sleep", sleeps.append)
+    listener = _patch_prefork(monkeypatch, iter([101, 102, 103]), lambda h: next(waits)(h))
+
+    serving._run_prefork("app", "127.0.0.1", 9000, 2)
+    assert killed == [103]
+    assert sleeps == [serving.RESPAWN_DELAY]
+    assert listener.closed
+    out = capsys.readouterr().out
+    assert "2 workers (prefork)" in out
+    assert "Worker 101 exited with status 256" in out
+    assert "Worker 103" not in out
+
+
+def test_prefork_child_runs_worker(monkeypatch):
+    started = []
+
+    def _worker_main(*args):
+        started.append(args)
+        raise _Exit(0)
+
+    monkeypatch.setattr(serving, "_worker_main", _worker_main)
+    listener = _patch_prefork(monkeypatch, iter([0]), lambda h: pytest.fail("child must not wait"))
+    with pytest.raises(_Exit):
+        serving._run_prefork("app", "h", 1, 2)
+    assert started == [("app", "h", 1, listener)]
+
+
+def test_prefork_stops_when_children_are_gone(monkeypatch):
+    def _wait(_handlers):
+        raise ChildProcessError
+
+    listener = _patch_prefork(monkeypatch, iter([11, 12]), _wait)
+    serving._run_prefork("app", "h", 1, 2)
+    assert listener.closed
+
+
+def test_serve_dispatches(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(serving, "BaseApplication", object)
+    monkeypatch.setattr(serving, "_run_gunicorn", lambda *a: calls.append(("gunicorn", a)))
+    monkeypatch.setattr(serving, "_run_prefork", lambda *a: calls.append(("prefork", a)))
+    monkeypatch.setattr(serving, "_run_threaded", lambda *a: calls.append(("threaded", a)))
+    monkeypatch.setattr(serving, "init_worker", lambda app: calls.append(("init", app)))
+
+    assert serving.serve("app", "h", 1, 2, 3) == "gunicorn"
+    assert serving.serve("app", "h", 1, 2, server="prefork") == "prefork"
+    assert serving.serve("app", "h", 1, 2, server="threaded") == "threaded"
+    assert calls == [
+        ("gunicorn", ("app", "h", 1, 2, 3)),
+        ("prefork", ("app", "h", 1, 2)),
+        ("init", "app"),
+        ("threaded", ("app", "h", 1)),
+    ]
+    assert "threaded, one process" in capsys.readouterr().out